@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""Cost of drawing detections with ``draw_detections``.
+
+Draws N boxes of random classes and scores onto 1280- and 1920-wide frames,
+as the annotated stream does once per frame, and reports the mean time per
+frame. Scores are redrawn every frame, like live detections; the classes
+stay the same.
+
+Compares the cached :class:`AnnotationRenderer` path with the previous one,
+kept below as ``legacy_draw_detections``: per box it recomputed the style,
+measured every label twice with ``cv2.getTextSize``, reseeded NumPy through
+``id_to_color`` and allocated a fresh blend buffer for every chip.
+
+Usage, from the repository root::
+
+    python -m benchmarks.bench_annotate --boxes 5 50 --iterations 200
+"""
+
+import argparse
+import time
+from typing import NamedTuple
+
+import cv2
+import numpy as np
+
+from rpi_surveillance.backend.inference.common.fallback import get_labels, id_to_color
+from rpi_surveillance.backend.inference.detections import Detections
+from rpi_surveillance.backend.inference.object_detection_postprocess import (
+    CHIP_ALPHA,
+    FONT,
+    HALO_COLOR,
+    draw_detections,
+)
+
+RESOLUTIONS = [(1280, 720), (1920, 1080)]
+
+
+class _Style(NamedTuple):
+    thickness: int
+    font_scale: float
+    pad: int
+
+
+def _style_for(image: np.ndarray) -> _Style:
+    factor = min(2.0, max(0.65, image.shape[0] / 720.0))
+    return _Style(
+        thickness=max(1, round(2 * factor)),
+        font_scale=0.55 * factor,
+        pad=max(3, round(6 * factor)),
+    )
+
+
+def _readable_text_color(background: tuple) -> tuple:
+    blue, green, red = background[:3]
+    luma = 0.114 * blue + 0.587 * green + 0.299 * red
+    return (0, 0, 0) if luma > 150 else (255, 255, 255)
+
+
+def _blend_rect(
+    image: np.ndarray, pt1: tuple, pt2: tuple, color: tuple, alpha: float
+) -> None:
+    height, width = image.shape[:2]
+    x1, x2 = sorted((max(0, min(pt1[0], width)), max(0, min(pt2[0], width))))
+    y1, y2 = sorted((max(0, min(pt1[1], height)), max(0, min(pt2[1], height))))
+    if x2 <= x1 or y2 <= y1:
+        return
+    roi = image[y1:y2, x1:x2]
+    cv2.addWeighted(np.full_like(roi, color), alpha, roi, 1 - alpha, 0, dst=roi)
+
+
+def _chip_size(text: str, style: _Style) -> tuple[int, int]:
+    (text_w, text_h), baseline = cv2.getTextSize(text, FONT, style.font_scale, 1)
+    return text_w + 2 * style.pad, text_h + baseline + 2 * style.pad
+
+
+def _draw_chip(
+    image: np.ndarray, text: str, top_left: tuple, bg_color: tuple, style: _Style
+) -> tuple[int, int, int, int]:
+    chip_w, chip_h = _chip_size(text, style)
+    height, width = image.shape[:2]
+    x1 = max(0, min(top_left[0], width - chip_w))
+    y1 = max(0, min(top_left[1], height - chip_h))
+    x2, y2 = x1 + chip_w, y1 + chip_h
+    _blend_rect(image, (x1, y1), (x2, y2), bg_color, CHIP_ALPHA)
+    (_, text_h), _ = cv2.getTextSize(text, FONT, style.font_scale, 1)
+    origin = (x1 + style.pad, y1 + style.pad + text_h)
+    cv2.putText(
+        image,
+        text,
+        origin,
+        FONT,
+        style.font_scale,
+        _readable_text_color(bg_color),
+        1,
+        cv2.LINE_AA,
+    )
+    return x1, y1, x2, y2
+
+
+def legacy_draw_detection(
+    image: np.ndarray, box: list, label: str, score: float, color: tuple
+) -> None:
+    height, width = image.shape[:2]
+    xmin, ymin, xmax, ymax = (int(coord) for coord in box)
+    xmin, xmax = max(0, min(xmin, width - 1)), max(0, min(xmax, width - 1))
+    ymin, ymax = max(0, min(ymin, height - 1)), max(0, min(ymax, height - 1))
+    if xmax - xmin < 2 or ymax - ymin < 2:
+        return
+    style = _style_for(image)
+    color = tuple(int(channel) for channel in color[:3])
+    cv2.rectangle(
+        image, (xmin, ymin), (xmax, ymax), HALO_COLOR, style.thickness + 1, cv2.LINE_AA
+    )
+    cv2.rectangle(
+        image,
+        (xmin, ymin),
+        (xmax, ymax),
+        color,
+        max(1, style.thickness - 1),
+        cv2.LINE_AA,
+    )
+    length = max(8, int(min(xmax - xmin, ymax - ymin) * 0.22))
+    for x, step_x in ((xmin, 1), (xmax, -1)):
+        for y, step_y in ((ymin, 1), (ymax, -1)):
+            for stroke_color, stroke in (
+                (HALO_COLOR, style.thickness + 3),
+                (color, style.thickness + 1),
+            ):
+                cv2.line(
+                    image,
+                    (x, y),
+                    (x + step_x * length, y),
+                    stroke_color,
+                    stroke,
+                    cv2.LINE_AA,
+                )
+                cv2.line(
+                    image,
+                    (x, y),
+                    (x, y + step_y * length),
+                    stroke_color,
+                    stroke,
+                    cv2.LINE_AA,
+                )
+    title = f"{label}  {score:.0f}%"
+    _, chip_h = _chip_size(title, style)
+    chip_y = ymin - chip_h if ymin - chip_h >= 0 else ymin
+    x1, _, x2, y2 = _draw_chip(image, title, (xmin, chip_y), color, style)
+    bar_h = max(3, style.thickness + 1)
+    filled = int((x2 - x1) * min(max(score, 0.0), 100.0) / 100.0)
+    _blend_rect(image, (x1, y2 - bar_h), (x2, y2), HALO_COLOR, 0.75)
+    _blend_rect(image, (x1, y2 - bar_h), (x1 + filled, y2), (255, 255, 255), 1.0)
+
+
+def legacy_draw_detections(
+    detections: Detections, img_out: np.ndarray, labels
+) -> np.ndarray:
+    rows = zip(
+        detections.boxes.tolist(),
+        detections.classes.tolist(),
+        detections.scores.tolist(),
+    )
+    for box, class_id, score in rows:
+        color = tuple(id_to_color(class_id).tolist())
+        legacy_draw_detection(img_out, box, labels[class_id], score * 100.0, color)
+    return img_out
+
+
+def random_detections(
+    rng: np.random.Generator, count: int, width: int, height: int, classes: np.ndarray
+) -> Detections:
+    top_left = rng.uniform(0, 1, (count, 2)) * (width * 0.8, height * 0.8)
+    size = rng.uniform(0.05, 0.2, (count, 2)) * (width, height)
+    boxes = np.concatenate([top_left, top_left + size], axis=1)
+    scores = np.sort(rng.uniform(0.35, 0.99, count))[::-1]
+    return Detections(boxes, classes, scores)
+
+
+def measure(
+    draw, width: int, height: int, count: int, iterations: int, labels: list
+) -> float:
+    """Return ms per annotated frame."""
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    classes = rng.integers(0, len(labels), count)
+    frames = [random_detections(rng, count, width, height, classes) for _ in range(32)]
+    canvas = image.copy()
+    for detections in frames[:5]:
+        draw(detections, canvas, labels)
+    elapsed = 0.0
+    for index in range(iterations):
+        np.copyto(canvas, image)
+        started = time.perf_counter()
+        draw(frames[index % len(frames)], canvas, labels)
+        elapsed += time.perf_counter() - started
+    return elapsed / iterations * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--boxes", type=int, nargs="+", default=[5, 50])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    labels = get_labels(None)
+    print(
+        f"{'width':>5} {'boxes':>5} {'legacy ms':>10} {'cached ms':>10} {'speedup':>8}"
+    )
+    for width, height in RESOLUTIONS:
+        for count in args.boxes:
+            before = measure(
+                legacy_draw_detections, width, height, count, args.iterations, labels
+            )
+            after = measure(
+                draw_detections, width, height, count, args.iterations, labels
+            )
+            print(
+                f"{width:>5} {count:>5} {before:>10.2f} {after:>10.2f} "
+                f"{before / after:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Throughput of the detection pipeline with and without micro-batching.
+
+N camera sources each keep one detection request outstanding, as streaming
+viewers with ``detect=true`` do. The accelerator is the simulated backend: a
+job costs a fixed overhead plus a per-frame cost for every frame of the
+configured batch, so batching pays off by sharing the overhead, as it does on
+the Hailo. Everything else -- letterboxing, batching, the stage threads and
+postprocessing -- is the real :class:`ObjectDetector`/:class:`DetectionPipeline`.
+
+Usage, from the repository root::
+
+    python -m benchmarks.bench_batching --sources 2 4 8 --batch-size 4 --max-wait-ms 5
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+import numpy as np
+
+from rpi_surveillance.backend.frame import Frame
+from rpi_surveillance.backend.inference.detector import (
+    DetectionPipeline,
+    ObjectDetector,
+)
+
+
+def run(
+    sources: int,
+    batch_size: int,
+    max_wait: float,
+    duration: float,
+    overhead_ms: float,
+    per_frame_ms: float,
+) -> tuple[float, float, float]:
+    """Return (frames/s, p50 latency ms, p95 latency ms) for ``sources`` cameras."""
+    detector = ObjectDetector(
+        backend="simulated",
+        backend_params={
+            "batch_size": batch_size,
+            "latency_ms": overhead_ms,
+            "per_frame_ms": per_frame_ms,
+            "jitter_ms": 0.0,
+        },
+    )
+    pipeline = DetectionPipeline(detector, max_wait=max_wait)
+    image = np.random.default_rng(0).integers(0, 255, (720, 1280, 3), dtype=np.uint8)
+    latencies: list[float] = []
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def source():
+        seq = 0
+        while time.monotonic() < stop_at:
+            seq += 1
+            started = time.monotonic()
+            pipeline.submit(Frame(seq, image.copy())).result()
+            with lock:
+                latencies.append(time.monotonic() - started)
+
+    threads = [threading.Thread(target=source) for _ in range(sources)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    pipeline.close()
+    detector.close()
+    latencies.sort()
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    return len(latencies) / elapsed, statistics.median(latencies) * 1000, p95 * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sources", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per run")
+    parser.add_argument(
+        "--overhead-ms",
+        type=float,
+        default=12.0,
+        help="simulated fixed cost of one accelerator job",
+    )
+    parser.add_argument(
+        "--per-frame-ms",
+        type=float,
+        default=4.0,
+        help="simulated cost of each frame in a job",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'sources':>7} {'batch':>5} {'fps':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'speedup':>8}"
+    )
+    for sources in args.sources:
+        baseline = None
+        for batch_size in sorted({1, args.batch_size}):
+            fps, p50, p95 = run(
+                sources,
+                batch_size,
+                args.max_wait_ms / 1000,
+                args.duration,
+                args.overhead_ms,
+                args.per_frame_ms,
+            )
+            baseline = baseline or fps
+            print(
+                f"{sources:>7} {batch_size:>5} {fps:>8.1f} {p50:>8.1f} {p95:>8.1f} "
+                f"{fps / baseline:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
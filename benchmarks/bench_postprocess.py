@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Cost of ``extract_detections`` on raw per-class model output.
+
+Compares the vectorised implementation with the previous one, kept below as
+``legacy_extract_detections``: a Python loop over every class and box with a
+per-box denormalisation and a sort of Python tuples. Raw results are
+Hailo-NMS shaped (one ``(N, 5)`` array per COCO class) with a given number of
+boxes spread over random classes, half of them below the score threshold.
+
+Usage, from the repository root::
+
+    python -m benchmarks.bench_postprocess --detections 0 10 100 --iterations 2000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from rpi_surveillance.backend.inference.object_detection_postprocess import (
+    extract_detections,
+)
+
+NUM_CLASSES = 80
+CONFIG = {"visualization_params": {"score_thres": 0.35, "max_boxes_to_draw": 50}}
+
+
+def legacy_extract_detections(image: np.ndarray, detections: list, config_data) -> dict:
+    visualization_params = config_data["visualization_params"]
+    score_threshold = visualization_params.get("score_thres", 0.5)
+    max_boxes = visualization_params.get("max_boxes_to_draw", 50)
+
+    img_height, img_width = image.shape[:2]
+    size = max(img_height, img_width)
+    padding_length = int(abs(img_height - img_width) / 2)
+
+    def denormalize_and_rm_pad(box):
+        box = [int(x * size) for x in box]
+        for i in range(4):
+            if i % 2 == 0:
+                if img_height != size:
+                    box[i] -= padding_length
+            else:
+                if img_width != size:
+                    box[i] -= padding_length
+        return [box[1], box[0], box[3], box[2]]
+
+    all_detections = []
+    for class_id, detection in enumerate(detections):
+        for det in detection:
+            bbox, score = det[:4], det[4]
+            if score >= score_threshold:
+                all_detections.append((score, class_id, denormalize_and_rm_pad(bbox)))
+    all_detections.sort(reverse=True, key=lambda x: x[0])
+    top_detections = all_detections[:max_boxes]
+    scores, class_ids, boxes = zip(*top_detections) if top_detections else ([], [], [])
+    return {
+        "detection_boxes": list(boxes),
+        "detection_classes": list(class_ids),
+        "detection_scores": list(scores),
+        "num_detections": len(top_detections),
+    }
+
+
+def raw_result(count: int, seed: int = 0) -> list[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    corners = rng.uniform(0.0, 1.0, (count, 2, 2))
+    rows = np.column_stack(
+        [corners.min(axis=1), corners.max(axis=1), rng.uniform(0.1, 0.6, count)]
+    ).astype(np.float32)
+    class_ids = rng.integers(0, NUM_CLASSES, count)
+    return [rows[class_ids == class_id] for class_id in range(NUM_CLASSES)]
+
+
+def measure(extract, image: np.ndarray, result: list, iterations: int) -> float:
+    """Return microseconds per call."""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        extract(image, result, CONFIG)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--detections", type=int, nargs="+", default=[0, 10, 100])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    image = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    print(
+        f"{'raw boxes':>9} {'kept':>5} {'legacy us':>10} {'numpy us':>9} {'speedup':>8}"
+    )
+    for count in args.detections:
+        result = raw_result(count)
+        legacy = legacy_extract_detections(image, result, CONFIG)
+        current = extract_detections(image, result, CONFIG)
+        assert np.array_equal(
+            np.reshape(legacy["detection_boxes"], (-1, 4)), current.boxes
+        ), "implementations disagree"
+        before = measure(legacy_extract_detections, image, result, args.iterations)
+        after = measure(extract_detections, image, result, args.iterations)
+        print(
+            f"{count:>9} {len(current):>5} {before:>10.1f} {after:>9.1f} "
+            f"{before / after:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
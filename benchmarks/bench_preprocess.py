@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Cost of turning a camera frame into a model input.
+
+Compares the previous path -- a full-frame BGR to RGB copy followed by
+``default_preprocess`` (bicubic resize into a freshly allocated canvas) --
+with the pooled :class:`Letterboxer`, per source resolution. Reports the mean
+time per frame and the peak memory allocated while letterboxing
+(``tracemalloc`` sees numpy's and OpenCV's array allocations).
+
+Usage, from the repository root::
+
+    python -m benchmarks.bench_preprocess --iterations 200 --model-size 640
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from rpi_surveillance.backend.inference.common.fallback import default_preprocess
+from rpi_surveillance.backend.inference.preprocess import Letterboxer
+
+RESOLUTIONS = [(1920, 1080), (1280, 720)]
+
+
+def previous_path(size: int):
+    def letterbox(image_bgr: np.ndarray) -> np.ndarray:
+        return default_preprocess(
+            cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB), size, size
+        )
+
+    return letterbox, lambda buffer: None
+
+
+def pooled_path(size: int, interpolation: str):
+    letterboxer = Letterboxer(size, size, interpolation)
+    return letterboxer, letterboxer.release
+
+
+def measure(
+    letterbox, release, image: np.ndarray, iterations: int
+) -> tuple[float, float]:
+    """Return (ms per frame, peak bytes allocated)."""
+    for _ in range(5):
+        release(letterbox(image))
+    started = time.perf_counter()
+    for _ in range(iterations):
+        release(letterbox(image))
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    for _ in range(iterations):
+        release(letterbox(image))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Peak over the loop, not the total: each frame's arrays are freed before the next.
+    return elapsed / iterations * 1000, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--model-size", type=int, default=640)
+    args = parser.parse_args()
+
+    paths = {
+        "default_preprocess": lambda: previous_path(args.model_size),
+        "letterboxer linear": lambda: pooled_path(args.model_size, "linear"),
+        "letterboxer area": lambda: pooled_path(args.model_size, "area"),
+    }
+    print(f"{'source':>10} {'path':>20} {'ms/frame':>9} {'peak KiB':>9} {'speedup':>8}")
+    for width, height in RESOLUTIONS:
+        image = np.random.default_rng(0).integers(
+            0, 255, (height, width, 3), dtype=np.uint8
+        )
+        baseline = None
+        for name, make in paths.items():
+            ms, peak = measure(*make(), image, args.iterations)
+            baseline = baseline or ms
+            print(
+                f"{width:>5}x{height:<4} {name:>20} {ms:>9.2f} {peak / 1024:>9.0f} "
+                f"{baseline / ms:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
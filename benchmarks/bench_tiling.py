@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Latency of tiled detection against a single full-frame letterbox.
+
+Runs frames one at a time through a :class:`DetectionPipeline`, either as one
+letterboxed full frame or as a grid of overlapping tiles submitted together
+(as a camera with ``tiling_params`` enabled does), and reports the median and
+p95 latency per frame, the size of each tile and how far it is scaled on its
+way into the model. Each run uses a batch size equal to its number of model
+inputs, so all tiles of a frame go to the accelerator as one job.
+
+The accelerator is the simulated backend by default (a job costs a fixed
+overhead plus a per-frame cost for every frame of the batch, as on the
+Hailo); ``--backend onnx`` runs the configured CPU model instead.
+Letterboxing, the tile batch, postprocessing and the cross-tile NMS are the
+real code.
+
+Usage, from the repository root::
+
+    python -m benchmarks.bench_tiling --grids 2x1 2x2 3x2 --overlap 0.2
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from rpi_surveillance.backend.frame import Frame
+from rpi_surveillance.backend.inference.detector import (
+    DetectionPipeline,
+    ObjectDetector,
+    tile_regions,
+)
+
+RESOLUTIONS = [(1920, 1080), (1280, 720)]
+
+
+def measure(
+    args: argparse.Namespace, image: np.ndarray, regions: list | None
+) -> tuple[float, float]:
+    """Return (p50 ms, p95 ms) per frame."""
+    backend_params = {"batch_size": len(regions) if regions else 1}
+    if args.backend == "simulated":
+        backend_params.update(
+            latency_ms=args.overhead_ms, per_frame_ms=args.per_frame_ms, jitter_ms=0.0
+        )
+    detector = ObjectDetector(backend=args.backend, backend_params=backend_params)
+    pipeline = DetectionPipeline(detector)
+    for seq in range(3):
+        pipeline.submit(Frame(seq, image), regions).result()
+    latencies = []
+    for seq in range(args.iterations):
+        started = time.perf_counter()
+        pipeline.submit(Frame(seq, image), regions).result()
+        latencies.append(time.perf_counter() - started)
+    pipeline.close()
+    detector.close()
+    latencies.sort()
+    return statistics.median(latencies) * 1000, latencies[
+        int(0.95 * (len(latencies) - 1))
+    ] * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--grids",
+        nargs="+",
+        default=["2x1", "2x2", "3x2"],
+        help="tile grids as COLUMNSxROWS",
+    )
+    parser.add_argument("--overlap", type=float, default=0.2)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--backend", default="simulated")
+    parser.add_argument(
+        "--model-size",
+        type=int,
+        default=640,
+        help="model input side, for the scale column",
+    )
+    parser.add_argument(
+        "--overhead-ms",
+        type=float,
+        default=12.0,
+        help="simulated fixed cost of one accelerator job",
+    )
+    parser.add_argument(
+        "--per-frame-ms",
+        type=float,
+        default=4.0,
+        help="simulated cost of each frame in a job",
+    )
+    args = parser.parse_args()
+
+    model_size = args.model_size
+    grids = [tuple(int(n) for n in grid.lower().split("x")) for grid in args.grids]
+
+    print(
+        f"{'source':>10} {'grid':>5} {'tiles':>5} {'tile px':>9} {'scale':>6} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'cost':>6}"
+    )
+    for width, height in RESOLUTIONS:
+        image = np.random.default_rng(0).integers(
+            0, 255, (height, width, 3), dtype=np.uint8
+        )
+        full, full_p95 = measure(args, image, None)
+        scale = min(model_size / width, model_size / height)
+        print(
+            f"{width:>5}x{height:<4} {'full':>5} {1:>5} {f'{width}x{height}':>9} "
+            f"{scale:>6.2f} {full:>8.1f} {full_p95:>8.1f} {1:>5.2f}x"
+        )
+        for columns, rows in grids:
+            regions = list(tile_regions(width, height, columns, rows, args.overlap))
+            xmin, ymin, xmax, ymax = regions[0]
+            tile_width, tile_height = xmax - xmin, ymax - ymin
+            scale = min(1.0, model_size / tile_width, model_size / tile_height)
+            p50, p95 = measure(args, image, regions)
+            print(
+                f"{width:>5}x{height:<4} {f'{columns}x{rows}':>5} {len(regions):>5} "
+                f"{f'{tile_width}x{tile_height}':>9} {scale:>6.2f} "
+                f"{p50:>8.1f} {p95:>8.1f} "
+                f"{p50 / full:>5.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
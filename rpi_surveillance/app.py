@@ -21,9 +21,9 @@ logging.basicConfig(
 
 from nicegui import app, ui
 
-from rpi_surveillance.config import get_storage_secret
+from rpi_surveillance.config import get_detector_warmup, get_storage_secret
 from rpi_surveillance.backend.camera import RECORDINGS_DIR
-from rpi_surveillance.backend.server import API_PREFIX, camera_api
+from rpi_surveillance.backend.server import API_PREFIX, camera_api, detector_injector
 from rpi_surveillance.ui.live_view import create_live_view_page
 from rpi_surveillance.ui.login import logout, setup_auth_middleware
 from rpi_surveillance.ui.record_viewer import create_record_viewer_page
@@ -33,6 +33,12 @@ PORT = 9000
 
 # Mount the camera REST API onto NiceGUI's FastAPI application.
 app.include_router(camera_api)
+# Stop detection worker processes and free their shared memory on exit.
+app.on_shutdown(detector_injector.close)
+# Opt-in (DETECTOR_WARMUP=1): load and warm the detector in the background so
+# the first detection request doesn't pay for it. Progress: GET /api/detector.
+if get_detector_warmup():
+    app.on_startup(detector_injector.start_warm_up)
 
 # Serve recordings directory so browser can access videos and images
 app.add_media_files('/media', str(RECORDINGS_DIR))
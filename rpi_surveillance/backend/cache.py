@@ -0,0 +1,101 @@
+"""Per-frame result caches shared by every consumer of a camera.
+
+Results derived from a captured frame (an encoded JPEG, a detection pass) are
+keyed by camera id, the frame's sequence number and the parameters they were
+computed with. Only the newest few sequence numbers of each camera are kept,
+so memory stays bounded no matter how long the server runs or how many
+clients connect.
+"""
+
+import threading
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from typing import Any
+
+from rpi_surveillance.backend.camera import FRAME_RING_SIZE
+
+
+class SequenceCache:
+    """Memoise per-frame results for the newest ``depth`` frames of each camera.
+
+    :meth:`get_or_compute` is single-flight: when several clients ask for the
+    same key at once, one computes it and the others wait for its result.
+    """
+
+    def __init__(self, depth: int = FRAME_RING_SIZE):
+        self.depth = depth
+        # camera id -> seq -> params -> Future
+        self._entries: dict[str, dict[int, dict[Hashable, Future]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(
+        self,
+        camera_id: str,
+        seq: int,
+        params: Hashable,
+        compute: Callable[[], Any],
+        timeout: float | None = None,
+    ) -> Any:
+        """Return the cached result for ``params`` on frame ``seq``, computing it once.
+
+        ``timeout`` bounds how long a caller waits for somebody else's
+        computation; it raises ``TimeoutError`` and leaves that computation running.
+        """
+        with self._lock:
+            frames = self._entries.setdefault(camera_id, {})
+            results = frames.get(seq)
+            if results is None:
+                results = frames[seq] = {}
+                # A slow consumer may still ask about an older frame, so evict
+                # by sequence number rather than by insertion order.
+                while len(frames) > self.depth:
+                    del frames[min(frames)]
+            future = results.get(params)
+            owner = future is None
+            if owner:
+                future = results[params] = Future()
+                self.misses += 1
+            else:
+                self.hits += 1
+        if not owner:
+            return future.result(timeout)
+        try:
+            future.set_result(compute())
+        except BaseException as e:
+            # Don't cache the failure: the next caller gets to try again.
+            with self._lock:
+                results = self._entries.get(camera_id, {}).get(seq)
+                if results is not None and results.get(params) is future:
+                    del results[params]
+            future.set_exception(e)
+            raise
+        return future.result()
+
+    def get(self, camera_id: str, seq: int, params: Hashable) -> Any | None:
+        """Return a finished result without computing it, or ``None``."""
+        with self._lock:
+            future = self._entries.get(camera_id, {}).get(seq, {}).get(params)
+        if future is None or not future.done() or future.exception() is not None:
+            return None
+        return future.result()
+
+    def newest(self, camera_id: str, params: Hashable) -> tuple[int, Any] | None:
+        """Return ``(seq, result)`` for the newest finished result for ``params``."""
+        with self._lock:
+            frames = self._entries.get(camera_id, {})
+            candidates = sorted(
+                ((seq, results.get(params)) for seq, results in frames.items()),
+                key=lambda item: item[0],
+                reverse=True,
+            )
+        for seq, future in candidates:
+            if future is not None and future.done() and future.exception() is None:
+                return seq, future.result()
+        return None
+
+    def discard(self, camera_id: str) -> None:
+        """Forget a camera's results, e.g. when its handler is replaced."""
+        with self._lock:
+            self._entries.pop(camera_id, None)
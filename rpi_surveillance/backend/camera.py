@@ -1,24 +1,38 @@
 from datetime import datetime
+from enum import StrEnum
 import logging
 import os
 from pathlib import Path
 import subprocess
 import threading
 import time
+from collections.abc import Callable
+import weakref
 from urllib.parse import urlsplit, urlunsplit
 
 import cv2
 import numpy as np
 from pydantic import BaseModel
+
+from rpi_surveillance.backend.frame import JPEG_QUALITY, Frame
+from rpi_surveillance.backend.gatekeeper import Gatekeeper
+from rpi_surveillance.backend.inference.detections import Detections
+
 try:
     from picamera2 import Picamera2
 except Exception:  # pragma: no cover - only present on a Raspberry Pi
     Picamera2 = None
 
 
-JPEG_QUALITY = 80
-JPEG_ENCODE_PARAMS = [int(cv2.IMWRITE_JPEG_QUALITY), JPEG_QUALITY]
 TARGET_RESOLUTION = (1920, 1080)
+# Frames kept by each camera's broker. Consumers more than this many frames
+# behind the producer lose the oldest ones (and count them as dropped).
+FRAME_RING_SIZE = 4
+# Readers only decode frames somebody is waiting for, so the buffered frame can
+# be old when nobody has been watching. Snapshots older than this wait for a
+# freshly decoded one instead.
+FRESH_FRAME_AGE = 0.5
+RECORD_FPS = 15
 DEFAULT_RTSP_URL = "rtsp://192.168.1.100:8554/stream"
 RECORDINGS_DIR = Path("/home/brani/recordings")
 RECORDINGS_DIR.mkdir(parents=True, exist_ok=True)
@@ -30,13 +44,15 @@ def _redact_url(url: str) -> str:
         parts = urlsplit(url)
         if parts.password:
             netloc = parts.netloc.replace(f":{parts.password}@", ":****@", 1)
-            return urlunsplit((parts.scheme, netloc, parts.path, parts.query, parts.fragment))
+            return urlunsplit(
+                (parts.scheme, netloc, parts.path, parts.query, parts.fragment))
     except Exception:
         pass
     return url
 
 
-def _fit_resolution(frame: np.ndarray, size: tuple[int, int] = TARGET_RESOLUTION) -> np.ndarray:
+def _fit_resolution(frame: np.ndarray,
+                    size: tuple[int, int] = TARGET_RESOLUTION) -> np.ndarray:
     """Resize ``frame`` to ``size`` (Full HD by default) if it differs."""
     h, w = frame.shape[:2]
     if (w, h) == size:
@@ -63,6 +79,16 @@ def _get_picam2():
         return _PICAM2
 
 
+def _media_path(kind: str, suffix: str, camera_id: str | None = None) -> str:
+    """Timestamped path in ``RECORDINGS_DIR``, tagged with the camera id if given.
+
+    The tag keeps files from cameras that capture in the same second apart.
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    tag = f"{camera_id}_" if camera_id else ""
+    return str(RECORDINGS_DIR / f"{kind}_{tag}{timestamp}.{suffix}")
+
+
 def _transform_image(image: np.ndarray) -> np.ndarray:
     return np.flip(image, axis=0)
 
@@ -77,9 +103,255 @@ class Settings(BaseModel):
 
 
 
+class DropPolicy(StrEnum):
+    """How a :class:`FrameSubscription` copes with frames it cannot keep up with."""
+
+    # Jump straight to the newest frame, skipping anything in between
+    # (live streams, detection).
+    LATEST = "latest"
+    # Deliver every frame still held by the ring, oldest first; only frames
+    # already overwritten are lost.
+    QUEUE = "queue"
+    # Fixed-rate consumer: hand out the newest frame on every tick, repeating it
+    # if the source has not produced a new one (the recorder, whose ffmpeg
+    # input assumes a constant frame rate).
+    REPEAT = "repeat"
+
+
+class FrameBroker:
+    """Single-producer, multi-consumer hand-off of one camera's frames.
+
+    Every frame is captured once and published into a small ring buffer as a
+    :class:`Frame` with a monotonically increasing sequence number. Consumers
+    (MJPEG streams, the recorder, detection, snapshots) read from the ring
+    instead of capturing on their own, each through a
+    :class:`FrameSubscription` with its own rate and :class:`DropPolicy`.
+
+    Frames are pushed by the handler's reader thread through :meth:`publish`;
+    consumers block on the broker's Condition until one arrives. The broker also
+    knows its open subscriptions and blocked waiters, so the reader can ask
+    :meth:`has_demand` and skip decoding frames that nobody is going to read.
+    """
+
+    def __init__(self, name: str = "camera", capacity: int = FRAME_RING_SIZE):
+        self.name = name
+        self._capacity = capacity
+        self._ring: list[Frame | None] = [None] * capacity
+        self._seq = 0
+        self._cond = threading.Condition()
+        # Weak, so a consumer that forgets to close its subscription does not
+        # keep the reader decoding forever.
+        self._subscriptions: weakref.WeakSet[FrameSubscription] = weakref.WeakSet()
+        self._waiting = 0
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the newest published frame (0 before the first)."""
+        return self._seq
+
+    def publish(self, image: np.ndarray, timestamp: float | None = None) -> Frame:
+        """Publish ``image`` to all consumers as the next :class:`Frame`."""
+        with self._cond:
+            self._seq += 1
+            frame = Frame(self._seq, image, timestamp)
+            self._ring[self._seq % self._capacity] = frame
+            self._cond.notify_all()
+            return frame
+
+    def clear(self) -> None:
+        """Forget buffered frames. Sequence numbers keep counting up, so a
+        consumer that outlives a camera restart never waits on a number the
+        fresh producer will not reach."""
+        with self._cond:
+            self._ring = [None] * self._capacity
+            self._cond.notify_all()
+
+    def _entry_after(self, last_seq: int, oldest_first: bool) -> Frame | None:
+        """Return the buffered frame a consumer at ``last_seq`` should get next."""
+        if self._seq <= last_seq:
+            return None
+        if oldest_first:
+            seq = max(last_seq + 1, self._seq - self._capacity + 1)
+            for candidate in range(seq, self._seq + 1):
+                entry = self._ring[candidate % self._capacity]
+                if entry is not None and entry.seq == candidate:
+                    return entry
+            return None
+        entry = self._ring[self._seq % self._capacity]
+        return entry if entry is not None and entry.seq == self._seq else None
+
+    def wait(self, last_seq: int = 0, timeout: float = 5.0,
+             oldest_first: bool = False) -> Frame:
+        """Block until a frame newer than ``last_seq`` is available.
+
+        Returns the newest such frame, or the oldest one still buffered when
+        ``oldest_first`` is set.
+
+        Raises:
+            TimeoutError: If no new frame arrives within ``timeout`` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            entry = self._entry_after(last_seq, oldest_first)
+            if entry is not None:
+                return entry
+            # A blocked consumer is demand in its own right; wake a reader that
+            # is idling in wait_for_demand().
+            self._waiting += 1
+            self._cond.notify_all()
+            try:
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(
+                            f"No new frame within {timeout}s from {self.name}")
+                    self._cond.wait(remaining)
+                    entry = self._entry_after(last_seq, oldest_first)
+                    if entry is not None:
+                        return entry
+            finally:
+                self._waiting -= 1
+
+    def latest(self, timeout: float = 10.0, max_age: float | None = None) -> Frame:
+        """Return the newest frame, waiting for one if nothing is buffered yet.
+
+        A buffered frame older than ``max_age`` seconds is not reused; the caller
+        waits for the next decoded frame instead.
+        """
+        with self._cond:
+            entry = self._entry_after(0, oldest_first=False)
+            if entry is not None and (max_age is None or entry.age <= max_age):
+                return entry
+            last_seq = self._seq
+        return self.wait(last_seq, timeout)
+
+    def subscribe(self, max_fps: float = 0.0,
+                  policy: DropPolicy = DropPolicy.LATEST) -> "FrameSubscription":
+        subscription = FrameSubscription(self, max_fps, policy)
+        with self._cond:
+            self._subscriptions.add(subscription)
+            self._cond.notify_all()
+        return subscription
+
+    def unsubscribe(self, subscription: "FrameSubscription") -> None:
+        with self._cond:
+            self._subscriptions.discard(subscription)
+
+    def _next_due_locked(self) -> float | None:
+        """Earliest time any subscription wants a frame (None if nobody does)."""
+        if self._waiting:
+            return 0.0
+        return min((sub.due_at for sub in self._subscriptions), default=None)
+
+    def has_demand(self, lookahead: float = 0.0) -> bool:
+        """Whether a frame arriving now (or within ``lookahead`` s) will be read.
+
+        The lookahead should be about one source frame interval: a subscription
+        due slightly after this frame would otherwise have to wait a whole
+        extra frame for the next one.
+        """
+        with self._cond:
+            due = self._next_due_locked()
+        return due is not None and due <= time.monotonic() + lookahead
+
+    def wait_for_demand(self, timeout: float, lookahead: float = 0.0) -> bool:
+        """Block until some consumer wants a frame, or ``timeout`` elapses.
+
+        For producers (like PiCamera2) that can simply not capture, rather than
+        having to drain a stream while idle.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                due = self._next_due_locked()
+                if due is not None and due <= now + lookahead:
+                    return True
+                if now >= deadline:
+                    return False
+                # Subscriptions become due as time passes without notifying, so
+                # sleep no later than the earliest due time.
+                wake = deadline if due is None else min(deadline, due - lookahead)
+                self._cond.wait(max(0.0, wake - now))
+
+
+class FrameSubscription:
+    """One consumer's cursor into a :class:`FrameBroker`.
+
+    Tracks the last sequence number handed out, paces reads to ``max_fps`` and
+    counts the frames skipped under the subscription's drop policy. An open
+    subscription is what keeps the camera's reader decoding, so close it (or use
+    it as a context manager) when the consumer goes away.
+    """
+
+    def __init__(self, broker: FrameBroker, max_fps: float = 0.0,
+                 policy: DropPolicy = DropPolicy.LATEST):
+        self.broker = broker
+        self.policy = DropPolicy(policy)
+        self.interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.last_seq = 0
+        self.dropped = 0
+        self._next_due = 0.0
+
+    @property
+    def due_at(self) -> float:
+        """Monotonic time at which this subscription next wants a frame."""
+        return self._next_due
+
+    def wait_time(self) -> float:
+        """Seconds until the next frame is due at this subscription's rate."""
+        return max(0.0, self._next_due - time.monotonic())
+
+    def set_max_fps(self, max_fps: float) -> None:
+        """Change the pacing; a frame the new rate makes due sooner is due sooner."""
+        interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        if self._next_due:
+            self._next_due += interval - self.interval
+        self.interval = interval
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+    def __enter__(self) -> "FrameSubscription":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def next(self, timeout: float = 5.0) -> Frame:
+        """Sleep until the next frame is due, then return it.
+
+        Async callers should ``await asyncio.sleep(sub.wait_time())`` first so
+        the pacing does not tie up a worker thread.
+
+        Raises:
+            TimeoutError: If the source produces nothing within ``timeout`` seconds.
+        """
+        delay = self.wait_time()
+        if delay > 0:
+            time.sleep(delay)
+        if self.policy is DropPolicy.REPEAT and self.last_seq:
+            frame = self.broker.latest(timeout)
+        else:
+            frame = self.broker.wait(self.last_seq, timeout,
+                                     oldest_first=self.policy is DropPolicy.QUEUE)
+        if self.last_seq and frame.seq > self.last_seq + 1:
+            self.dropped += frame.seq - self.last_seq - 1
+        self.last_seq = frame.seq
+        # Keep a steady cadence, but never bank time: after falling behind, the
+        # next frame is due immediately rather than in a catch-up burst.
+        now = time.monotonic()
+        if self._next_due:
+            self._next_due = max(self._next_due + self.interval, now)
+        else:
+            self._next_due = now + self.interval
+        return frame
+
+
 class PiCameraHandler:
-    def __init__(self):
+    def __init__(self, camera_id: str | None = None):
         self.logger = logging.getLogger(__name__)
+        self.camera_id = camera_id
         self.logger.info("Initializing camera")
         self.picam2 = _get_picam2()
         self._settings = Settings()
@@ -95,14 +367,66 @@ class PiCameraHandler:
         self._recording_thread: threading.Thread | None = None
         self._recording_path: str | None = None
         self._capture_lock = threading.Lock()
+        # Like the RTSP handler, a reader thread captures each sensor frame once
+        # and publishes it; consumers get the newest frame without waiting for a
+        # capture of their own, and real sequence numbers let them skip frames
+        # they have already seen.
+        self.frames = FrameBroker("picamera2")
+        self.frames_grabbed = 0
+        self.frames_decoded = 0
+        self._reader_thread: threading.Thread | None = None
+        self._running = False
+        self.gatekeeper: Gatekeeper | None = None
 
     def start(self):
         self.logger.info("Starting camera")
         self.picam2.start()
+        self._start_reader()
         return self
 
+    def _start_reader(self) -> None:
+        if self._reader_thread is not None:
+            return
+        self._running = True
+        self._reader_thread = threading.Thread(target=self._reader_loop, daemon=True)
+        self._reader_thread.start()
+
+    def _stop_reader(self) -> None:
+        """Stop the reader before the pipeline is stopped or reconfigured.
+
+        ``capture_array()`` on a stopped camera blocks indefinitely, so the
+        reader has to be out of it before ``picam2.stop()`` runs.
+        """
+        self._running = False
+        if self._reader_thread:
+            self._reader_thread.join(timeout=5)
+            self._reader_thread = None
+        self.frames.clear()
+
+    def _reader_loop(self):
+        """Capture frames while somebody wants them, paced by ``capture_array()``.
+
+        Unlike an RTSP socket, the sensor needs no draining, so with nobody
+        watching the reader simply waits for demand instead of capturing.
+        """
+        frame_interval = 1.0 / self._settings.framerate
+        while self._running:
+            if not self.frames.wait_for_demand(timeout=0.5, lookahead=frame_interval):
+                continue
+            try:
+                with self._capture_lock:
+                    frame = np.ascontiguousarray(self.picam2.capture_array())
+            except Exception as e:
+                self.logger.warning(f"PiCamera2 capture failed: {e}")
+                time.sleep(0.5)
+                continue
+            self.frames_grabbed += 1
+            self.frames_decoded += 1
+            self.frames.publish(frame)
+
     def stop(self):
         self.logger.info("Stopping camera")
+        self._stop_reader()
         try:
             self.picam2.stop()
         except Exception as e:
@@ -112,33 +436,51 @@ class PiCameraHandler:
     def close(self):
         """Stop the shared camera instance (kept alive for reuse across handlers)."""
         self.logger.info("Stopping camera and releasing pipeline")
+        self.stop_gatekeeper()
         self.stop_recording()
+        self._stop_reader()
         try:
             self.picam2.stop()
         except Exception as e:
             self.logger.warning(f"Error stopping camera during close: {e}")
         return self
 
-    def capture_image(self):
-        with self._capture_lock:
-            np_array = self.picam2.capture_array()
-            np_array = np.ascontiguousarray(np_array)
-        return np_array
+    def capture_frame(self, timeout: float = 10.0) -> Frame:
+        """Return the latest :class:`Frame`, waiting briefly for the camera."""
+        try:
+            return self.frames.latest(timeout, max_age=FRESH_FRAME_AGE)
+        except TimeoutError:
+            raise RuntimeError("No frame available from PiCamera2") from None
+
+    def capture_image(self, timeout: float = 10.0):
+        return self.capture_frame(timeout).image
 
-    def next_frame(self, last_seq: int = 0, timeout: float = 5.0) -> tuple[np.ndarray, int]:
-        """Grab a frame, mirroring :meth:`RTSPCameraHandler.next_frame`.
+    def next_frame(self, last_seq: int = 0,
+                   timeout: float = 5.0) -> tuple[np.ndarray, int]:
+        """Block until a frame newer than ``last_seq`` arrives.
 
-        PiCamera2 hands back a fresh capture on every call, so there is no
-        already-seen frame to skip and the sequence number merely counts up.
-        """
-        return self.capture_image(), last_seq + 1
+        Mirrors :meth:`RTSPCameraHandler.next_frame`: the sequence number is the
+        reader's real frame counter, so a stream can skip re-encoding a frame it
+        has already sent.
 
-    def save_image(self) -> str:
-        """Capture and save a single frame as JPEG."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = str(RECORDINGS_DIR / f"capture_{timestamp}.jpg")
-        frame = self.capture_image()
-        cv2.imwrite(filename, frame, JPEG_ENCODE_PARAMS)
+        Raises:
+            TimeoutError: If no new frame arrives within ``timeout`` seconds.
+        """
+        frame = self.frames.wait(last_seq, timeout)
+        return frame.image, frame.seq
+
+    def subscribe(self, max_fps: float = 0.0,
+                  policy: DropPolicy = DropPolicy.LATEST) -> FrameSubscription:
+        """Open a cursor into this camera's frames for one consumer."""
+        return self.frames.subscribe(max_fps, policy)
+
+    def save_image(self, jpeg: bytes | None = None) -> str:
+        """Save a JPEG snapshot: ``jpeg`` if given, else the current frame."""
+        filename = _media_path("capture", "jpg", self.camera_id)
+        if jpeg is None:
+            jpeg = self.capture_frame().jpeg(quality=JPEG_QUALITY)
+        with open(filename, "wb") as f:
+            f.write(jpeg)
         self.logger.info(f"Saved image to {filename}")
         return filename
 
@@ -146,14 +488,13 @@ class PiCameraHandler:
         """Start recording video to an MP4 file (H.264 via ffmpeg)."""
         if self._recording:
             return self._recording_path
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self._recording_path = str(RECORDINGS_DIR / f"video_{timestamp}.mp4")
+        self._recording_path = _media_path("video", "mp4", self.camera_id)
         frame = self.capture_image()
         h, w = frame.shape[:2]
         self._recording_proc = subprocess.Popen(
             ['ffmpeg', '-y',
              '-f', 'rawvideo', '-pix_fmt', 'bgr24',
-             '-s', f'{w}x{h}', '-r', '15',
+             '-s', f'{w}x{h}', '-r', str(RECORD_FPS),
              '-i', '-',
              '-c:v', 'libx264', '-preset', 'fast', '-crf', '23',
              '-pix_fmt', 'yuv420p',
@@ -167,15 +508,16 @@ class PiCameraHandler:
         return self._recording_path
 
     def _record_loop(self):
-        """Background thread: capture frames and pipe to ffmpeg."""
-        while self._recording:
-            try:
-                frame = self.capture_image()
-                self._recording_proc.stdin.write(frame.tobytes())
-            except Exception as e:
-                self.logger.error(f"Error recording frame: {e}")
-                break
-            time.sleep(1 / 15)
+        """Background thread: pipe frames to ffmpeg at a constant ``RECORD_FPS``."""
+        with self.subscribe(max_fps=RECORD_FPS,
+                            policy=DropPolicy.REPEAT) as subscription:
+            while self._recording:
+                try:
+                    frame = subscription.next(timeout=5.0)
+                    self._recording_proc.stdin.write(frame.image.tobytes())
+                except Exception as e:
+                    self.logger.error(f"Error recording frame: {e}")
+                    break
 
     def stop_recording(self) -> str | None:
         """Stop recording and finalise the video file."""
@@ -198,12 +540,31 @@ class PiCameraHandler:
         self.logger.info(f"Stopped recording, saved to {path}")
         return path
 
+    def start_gatekeeper(self, detect: Callable[[Frame], Detections],
+                         params: dict | None = None) -> Gatekeeper:
+        """Watch for motion at a few fps and run ``detect`` only while there is some."""
+        if self.gatekeeper is None:
+            self.gatekeeper = Gatekeeper(self, detect, params).start()
+            self.logger.info("Started gatekeeper")
+        return self.gatekeeper
+
+    def stop_gatekeeper(self) -> dict | None:
+        """Stop the gatekeeper and return its final :meth:`Gatekeeper.status`."""
+        if self.gatekeeper is None:
+            return None
+        gatekeeper, self.gatekeeper = self.gatekeeper, None
+        gatekeeper.stop()
+        self.logger.info("Stopped gatekeeper")
+        return gatekeeper.status()
+
     def restart_camera(self):
         """Restart the camera by stopping and starting it"""
         self.logger.info("Restarting camera")
         try:
+            self._stop_reader()
             self.picam2.stop()
             self.picam2.start()
+            self._start_reader()
             self.logger.info("Camera restarted successfully")
         except Exception as e:
             self.logger.error(f"Error restarting camera: {e}")
@@ -217,8 +578,15 @@ class PiCameraHandler:
         return self
 
     def update_settings(self, settings: Settings):
+        self._stop_reader()
+        try:
+            self.picam2.stop()
+        except Exception:
+            pass
+        self._settings = settings
         self.picam2.configure(self.picam2.create_preview_configuration(settings.to_dict()))
         self.picam2.start()
+        self._start_reader()
         return self
 
 
@@ -227,15 +595,17 @@ class RTSPCameraHandler:
 
     Exposes the same interface as :class:`PiCameraHandler` (``start``/``stop``/
     ``capture_image``/recording helpers), so the REST endpoints work unchanged.
-    A background thread continuously grabs frames and keeps only the latest one,
-    which avoids the growing latency you get when reading an RTSP stream on
-    demand. Frames are returned in BGR order (OpenCV's native layout), which is
-    exactly what ``cv2.imencode`` and the detector's ``BGR2RGB`` step expect.
+    A background thread continuously grabs frames and publishes them into a
+    :class:`FrameBroker`, which avoids the growing latency you get when reading
+    an RTSP stream on demand. Frames are returned in BGR order (OpenCV's native
+    layout), which is exactly what ``cv2.imencode`` and the detector's
+    ``BGR2RGB`` step expect.
     """
 
-    def __init__(self, url: str = DEFAULT_RTSP_URL):
+    def __init__(self, url: str = DEFAULT_RTSP_URL, camera_id: str | None = None):
         self.logger = logging.getLogger(__name__)
         self.url = url
+        self.camera_id = camera_id
         self.logger.info(f"Initializing RTSP camera: {_redact_url(url)}")
         self.cap: cv2.VideoCapture | None = None
         self.streaming_active = False
@@ -243,13 +613,14 @@ class RTSPCameraHandler:
         self._recording_proc: subprocess.Popen | None = None
         self._recording_thread: threading.Thread | None = None
         self._recording_path: str | None = None
-        # A Condition (rather than a plain Lock) lets consumers block until the
-        # reader thread publishes a frame, instead of polling for one.
-        self._frame_lock = threading.Condition()
-        self._latest_frame: np.ndarray | None = None
-        self._frame_seq = 0
+        # The reader thread publishes every frame once; consumers block on the
+        # broker's Condition until one arrives instead of polling for it.
+        self.frames = FrameBroker(_redact_url(url))
+        self.frames_grabbed = 0
+        self.frames_decoded = 0
         self._reader_thread: threading.Thread | None = None
         self._running = False
+        self.gatekeeper: Gatekeeper | None = None
 
     def _open_capture(self) -> cv2.VideoCapture:
         # Force TCP transport and a connection timeout (5s, in microseconds).
@@ -276,11 +647,30 @@ class RTSPCameraHandler:
         return self
 
     def _reader_loop(self):
-        """Continuously pull frames, reconnecting on failure."""
+        """Continuously drain the stream, decoding only the frames somebody wants.
+
+        ``grab()`` keeps reading packets off the socket (so latency does not
+        build up), but the H.264 decode in ``retrieve()`` and the resize only
+        run when a consumer is waiting or a subscription is due for a frame.
+        With nobody watching, the reader costs next to nothing.
+        """
+        frame_interval = 0.0
+        last_grab = None
         while self._running:
             if self.cap is None:
                 self.cap = self._open_capture()
-            ok, frame = self.cap.read()
+            ok = self.cap.grab()
+            frame = None
+            if ok:
+                now = time.monotonic()
+                if last_grab is not None:
+                    # Smoothed source frame interval, used as the demand lookahead.
+                    frame_interval += 0.1 * ((now - last_grab) - frame_interval)
+                last_grab = now
+                self.frames_grabbed += 1
+                if not self.frames.has_demand(lookahead=frame_interval):
+                    continue
+                ok, frame = self.cap.retrieve()
             if not ok or frame is None:
                 self.logger.warning("RTSP read failed; attempting to reconnect")
                 try:
@@ -288,14 +678,13 @@ class RTSPCameraHandler:
                 except Exception:
                     pass
                 self.cap = None
+                last_grab = None
                 time.sleep(0.5)
                 continue
             # Normalise to Full HD so all consumers see a consistent size.
             frame = _fit_resolution(frame)
-            with self._frame_lock:
-                self._latest_frame = frame
-                self._frame_seq += 1
-                self._frame_lock.notify_all()
+            self.frames_decoded += 1
+            self.frames.publish(frame)
 
     def stop(self):
         self.logger.info("Stopping RTSP camera")
@@ -309,32 +698,32 @@ class RTSPCameraHandler:
             except Exception as e:
                 self.logger.error(f"Error releasing RTSP capture: {e}")
             self.cap = None
-        with self._frame_lock:
-            self._latest_frame = None
-            # Reset so a stream reconnecting after a restart isn't waiting on a
-            # sequence number the fresh reader will never reach.
-            self._frame_seq = 0
-            self._frame_lock.notify_all()
+        self.frames.clear()
         return self
 
     def close(self):
         """Stop recording, tear down the reader thread and release the stream."""
         self.logger.info("Closing RTSP camera and releasing resources")
+        self.stop_gatekeeper()
         self.stop_recording()
         self.stop()
         return self
 
     def capture_image(self, timeout: float = 10.0):
         """Return the most recent frame, waiting briefly for the stream to warm up."""
-        deadline = time.monotonic() + timeout
-        with self._frame_lock:
-            while self._latest_frame is None:
-                if not self._frame_lock.wait(max(0.0, deadline - time.monotonic())):
-                    raise RuntimeError(
-                        f"No frame available from RTSP stream: {_redact_url(self.url)}")
-            return np.ascontiguousarray(self._latest_frame)
-
-    def next_frame(self, last_seq: int = 0, timeout: float = 5.0) -> tuple[np.ndarray, int]:
+        return self.capture_frame(timeout).image
+
+    def capture_frame(self, timeout: float = 10.0) -> Frame:
+        """Return the latest :class:`Frame`, waiting briefly for the stream."""
+        try:
+            return self.frames.latest(timeout, max_age=FRESH_FRAME_AGE)
+        except TimeoutError:
+            raise RuntimeError(
+                "No frame available from RTSP stream: "
+                f"{_redact_url(self.url)}") from None
+
+    def next_frame(self, last_seq: int = 0,
+                   timeout: float = 5.0) -> tuple[np.ndarray, int]:
         """Block until a frame newer than ``last_seq`` arrives.
 
         Returning the sequence number lets a stream skip re-encoding a frame it
@@ -344,20 +733,21 @@ class RTSPCameraHandler:
         Raises:
             TimeoutError: If no new frame arrives within ``timeout`` seconds.
         """
-        deadline = time.monotonic() + timeout
-        with self._frame_lock:
-            while self._latest_frame is None or self._frame_seq <= last_seq:
-                if not self._frame_lock.wait(max(0.0, deadline - time.monotonic())):
-                    raise TimeoutError(
-                        f"No new frame within {timeout}s from {_redact_url(self.url)}")
-            return np.ascontiguousarray(self._latest_frame), self._frame_seq
-
-    def save_image(self) -> str:
-        """Capture and save a single frame as JPEG."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = str(RECORDINGS_DIR / f"capture_{timestamp}.jpg")
-        frame = self.capture_image()
-        cv2.imwrite(filename, frame, JPEG_ENCODE_PARAMS)
+        frame = self.frames.wait(last_seq, timeout)
+        return frame.image, frame.seq
+
+    def subscribe(self, max_fps: float = 0.0,
+                  policy: DropPolicy = DropPolicy.LATEST) -> FrameSubscription:
+        """Open a cursor into this camera's frames for one consumer."""
+        return self.frames.subscribe(max_fps, policy)
+
+    def save_image(self, jpeg: bytes | None = None) -> str:
+        """Save a JPEG snapshot: ``jpeg`` if given, else the current frame."""
+        filename = _media_path("capture", "jpg", self.camera_id)
+        if jpeg is None:
+            jpeg = self.capture_frame().jpeg(quality=JPEG_QUALITY)
+        with open(filename, "wb") as f:
+            f.write(jpeg)
         self.logger.info(f"Saved image to {filename}")
         return filename
 
@@ -365,14 +755,13 @@ class RTSPCameraHandler:
         """Start recording video to an MP4 file (H.264 via ffmpeg)."""
         if self._recording:
             return self._recording_path
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self._recording_path = str(RECORDINGS_DIR / f"video_{timestamp}.mp4")
+        self._recording_path = _media_path("video", "mp4", self.camera_id)
         frame = self.capture_image()
         h, w = frame.shape[:2]
         self._recording_proc = subprocess.Popen(
             ['ffmpeg', '-y',
              '-f', 'rawvideo', '-pix_fmt', 'bgr24',
-             '-s', f'{w}x{h}', '-r', '15',
+             '-s', f'{w}x{h}', '-r', str(RECORD_FPS),
              '-i', '-',
              '-c:v', 'libx264', '-preset', 'fast', '-crf', '23',
              '-pix_fmt', 'yuv420p',
@@ -386,15 +775,16 @@ class RTSPCameraHandler:
         return self._recording_path
 
     def _record_loop(self):
-        """Background thread: capture frames and pipe to ffmpeg."""
-        while self._recording:
-            try:
-                frame = self.capture_image()
-                self._recording_proc.stdin.write(frame.tobytes())
-            except Exception as e:
-                self.logger.error(f"Error recording frame: {e}")
-                break
-            time.sleep(1 / 15)
+        """Background thread: pipe frames to ffmpeg at a constant ``RECORD_FPS``."""
+        with self.subscribe(max_fps=RECORD_FPS,
+                            policy=DropPolicy.REPEAT) as subscription:
+            while self._recording:
+                try:
+                    frame = subscription.next(timeout=5.0)
+                    self._recording_proc.stdin.write(frame.image.tobytes())
+                except Exception as e:
+                    self.logger.error(f"Error recording frame: {e}")
+                    break
 
     def stop_recording(self) -> str | None:
         """Stop recording and finalise the video file."""
@@ -417,6 +807,23 @@ class RTSPCameraHandler:
         self.logger.info(f"Stopped recording, saved to {path}")
         return path
 
+    def start_gatekeeper(self, detect: Callable[[Frame], Detections],
+                         params: dict | None = None) -> Gatekeeper:
+        """Watch for motion at a few fps and run ``detect`` only while there is some."""
+        if self.gatekeeper is None:
+            self.gatekeeper = Gatekeeper(self, detect, params).start()
+            self.logger.info("Started gatekeeper")
+        return self.gatekeeper
+
+    def stop_gatekeeper(self) -> dict | None:
+        """Stop the gatekeeper and return its final :meth:`Gatekeeper.status`."""
+        if self.gatekeeper is None:
+            return None
+        gatekeeper, self.gatekeeper = self.gatekeeper, None
+        gatekeeper.stop()
+        self.logger.info("Stopped gatekeeper")
+        return gatekeeper.status()
+
     def restart_camera(self):
         """Reconnect to the RTSP stream."""
         self.logger.info("Restarting RTSP camera")
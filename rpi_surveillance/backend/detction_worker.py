@@ -1,10 +1,490 @@
-import cv2
+"""Out-of-process detection workers.
+
+Detection postprocessing, drawing and JPEG encoding are CPU-bound Python and
+numpy work; inside the server process they compete for the GIL with the
+NiceGUI/FastAPI event loop. A :class:`DetectionWorkerPool` moves them into N
+:class:`DetectionWorker` processes, so they run on other cores.
+
+Frames are not pickled. The pool owns a :class:`FrameRing`, a block of
+``multiprocessing.shared_memory`` split into fixed-size frame slots: the
+server copies a frame into a free slot and sends only a small task tuple over
+the worker's task pipe; the worker maps the slot as a numpy array, and sends
+back the detections (a few small arrays) or the encoded JPEG over its result
+pipe. The slot is reused once the result has arrived, so the number of slots
+bounds the work in flight.
+
+Every worker has pipes of its own, so the pool knows which tasks each one
+holds. A worker that dies (crashes, or is killed) fails exactly those tasks,
+gives their slots back and is replaced by a fresh process; the others never
+notice.
+
+Each worker loads its own model on the configured backend. On a Hailo device,
+several processes share the accelerator only through the HailoRT multi-process
+service; with ``workers=1`` the single worker owns it.
+"""
+
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future, InvalidStateError
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection, wait
+from pathlib import Path
+
 import numpy as np
-import torch
-import torchvision
 
+from rpi_surveillance.backend.camera import TARGET_RESOLUTION
+from rpi_surveillance.backend.frame import JPEG_QUALITY, Frame, encode_jpeg
+from rpi_surveillance.backend.inference.detections import Detections
+from rpi_surveillance.backend.inference.detector import ObjectDetector, Region
+
+logger = logging.getLogger(__name__)
+
+# Frame slots per worker: one being processed, one queued, one being filled.
+SLOTS_PER_WORKER = 3
+# Seconds to wait for a free slot before giving up on a frame.
+SLOT_TIMEOUT = 10.0
+# Largest frame a slot holds, as (height, width, channels).
+SLOT_SHAPE = (TARGET_RESOLUTION[1], TARGET_RESOLUTION[0], 3)
+
+# Workers are spawned, not forked: the server process runs camera, encoder
+# and HailoRT threads that must not be duplicated into the children.
+_SPAWN = multiprocessing.get_context("spawn")
+
+
+class FrameRing:
+    """Fixed-size frame slots in one shared memory block.
 
-class DetectionWorker:
-    def __init__(self, model, device):
+    The creating process owns the block and unlinks it in :meth:`close`;
+    workers attach to it by name.
+    """
+
+    def __init__(
+        self,
+        slots: int,
+        slot_shape: tuple[int, int, int] = SLOT_SHAPE,
+        name: str | None = None,
+    ):
+        self.slots = slots
+        self.slot_shape = tuple(slot_shape)
+        self.slot_bytes = int(np.prod(self.slot_shape))
+        self._owner = name is None
+        if self._owner:
+            self._shm = shared_memory.SharedMemory(
+                create=True, size=slots * self.slot_bytes
+            )
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def view(self, slot: int, shape: tuple[int, ...]) -> np.ndarray:
+        """A zero-copy array over the first ``shape`` bytes of ``slot``."""
+        return np.ndarray(
+            shape, dtype=np.uint8, buffer=self._shm.buf, offset=slot * self.slot_bytes
+        )
+
+    def write(self, slot: int, image: np.ndarray) -> tuple[int, ...]:
+        """Copy ``image`` into ``slot`` and return its shape."""
+        if image.dtype != np.uint8 or image.nbytes > self.slot_bytes:
+            raise ValueError(
+                f"Frame {image.shape} {image.dtype} does not fit a "
+                f"{self.slot_shape} frame slot"
+            )
+        np.copyto(self.view(slot, image.shape), image)
+        return image.shape
+
+    def close(self) -> None:
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+class DetectionWorker(_SPAWN.Process):
+    """A worker process running detection and drawing on frames in a :class:`FrameRing`.
+
+    Args:
+        model: Model file for the backend; ``None`` uses the configured default.
+        device: Inference backend name (``"hailo"``, ``"onnx"``, ...); ``None``
+            uses ``inference_params.backend`` from the config.
+        ring_name: Shared memory name of the pool's :class:`FrameRing`.
+        slots: Number of slots in the ring.
+        slot_shape: Largest frame shape a slot holds.
+        tasks: Connection the worker receives task tuples on; ``None`` stops it.
+        results: Connection the worker sends ``(task_id, result, error)`` on; a
+            ``task_id`` of ``None`` reports that the worker failed to start.
+        config_path: Detector config file.
+    """
+
+    def __init__(
+        self,
+        model: str | Path | None,
+        device: str | None,
+        ring_name: str,
+        slots: int,
+        slot_shape: tuple[int, int, int],
+        tasks: Connection,
+        results: Connection,
+        config_path: str | Path | None = None,
+        name: str | None = None,
+    ):
+        super().__init__(name=name, daemon=True)
         self.model = model
         self.device = device
+        self.ring_name = ring_name
+        self.slots = slots
+        self.slot_shape = slot_shape
+        self.tasks = tasks
+        self.results = results
+        self.config_path = config_path
+
+    def run(self) -> None:
+        ring = FrameRing(self.slots, self.slot_shape, name=self.ring_name)
+        try:
+            detector = ObjectDetector(
+                self.model, config_path=self.config_path, backend=self.device
+            )
+        except Exception as e:
+            self.results.send((None, None, f"{type(e).__name__}: {e}"))
+            ring.close()
+            return
+        try:
+            while True:
+                try:
+                    task = self.tasks.recv()
+                except EOFError:  # the pool is gone
+                    break
+                if task is None:
+                    break
+                (
+                    task_id,
+                    op,
+                    slot,
+                    seq,
+                    timestamp,
+                    shape,
+                    regions,
+                    detections,
+                    width,
+                    quality,
+                ) = task
+                frame = None
+                try:
+                    frame = Frame(seq, ring.view(slot, shape), timestamp)
+                    if op == "detect":
+                        result = detector.infer_frame(frame, regions)
+                    else:
+                        result = encode_jpeg(
+                            detector.annotate(frame, detections, width), quality
+                        )
+                    self.results.send((task_id, result, None))
+                except Exception as e:
+                    self.results.send((task_id, None, f"{type(e).__name__}: {e}"))
+                # Drop every view of the slot before it is handed out again.
+                frame = None
+        finally:
+            detector.close()
+            ring.close()
+
+
+class DetectionWorkerPool:
+    """N :class:`DetectionWorker` processes fed through a shared :class:`FrameRing`.
+
+    Each task goes to the worker with the fewest outstanding tasks. Both
+    submit methods return a :class:`Future`; they block while every slot is in
+    use, which is the pool's backpressure. A collector thread waits on every
+    worker's result pipe and process sentinel at once, so a worker that exits
+    is noticed immediately and respawned.
+
+    Usage::
+
+        pool = DetectionWorkerPool(workers=2)
+        detections = pool.submit(frame).result()
+        jpeg = pool.render(frame, detections, width=640).result()
+        pool.close()
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        model: str | Path | None = None,
+        device: str | None = None,
+        config_path: str | Path | None = None,
+        slots: int | None = None,
+        slot_shape: tuple[int, int, int] = SLOT_SHAPE,
+    ):
+        self.ring = FrameRing(slots or workers * SLOTS_PER_WORKER, slot_shape)
+        self._model = model
+        self._device = device
+        self._config_path = config_path
+        self._free_slots: queue.Queue = queue.Queue()
+        for slot in range(self.ring.slots):
+            self._free_slots.put(slot)
+        # task id -> (future, slot, index of the worker holding it)
+        self._pending: dict[int, tuple[Future, int, int]] = {}
+        self._lock = threading.Lock()
+        self._task_ids = itertools.count()
+        self._error: str | None = None
+        self._closing = False
+        self.restarts = 0
+        self._workers: list[DetectionWorker | None] = [None] * workers
+        # Per worker: the parent's ends of its task and result pipes, and
+        # whether the collector still watches it.
+        self._task_conns: list[Connection | None] = [None] * workers
+        self._result_conns: list[Connection | None] = [None] * workers
+        self._watched = [True] * workers
+        self._send_locks = [threading.Lock() for _ in range(workers)]
+        for index in range(workers):
+            self._spawn(index)
+        # Wakes the collector when the pool closes.
+        self._wakeup_reader, self._wakeup = multiprocessing.Pipe(duplex=False)
+        self._collector = threading.Thread(
+            target=self._collect, name="detection-results", daemon=True
+        )
+        self._collector.start()
+
+    def _spawn(self, index: int) -> None:
+        """Start worker ``index`` with fresh pipes."""
+        task_reader, task_writer = _SPAWN.Pipe(duplex=False)
+        result_reader, result_writer = _SPAWN.Pipe(duplex=False)
+        worker = DetectionWorker(
+            self._model,
+            self._device,
+            self.ring.name,
+            self.ring.slots,
+            self.ring.slot_shape,
+            task_reader,
+            result_writer,
+            self._config_path,
+            name=f"detection-worker-{index}",
+        )
+        worker.start()
+        # The child holds its own copies now.
+        task_reader.close()
+        result_writer.close()
+        self._workers[index] = worker
+        self._task_conns[index] = task_writer
+        self._result_conns[index] = result_reader
+
+    @property
+    def size(self) -> int:
+        """Number of worker processes."""
+        return len(self._workers)
+
+    @property
+    def capacity(self) -> int:
+        """Frames that can be in the pool at once: one per slot."""
+        return self.ring.slots
+
+    def submit(self, frame: Frame, regions: list[Region] | None = None) -> Future:
+        """Detect objects in ``frame``, or in ``regions`` of it.
+
+        The future resolves to the frame's detections. The frame is copied into
+        the ring once; one worker runs all its regions.
+        """
+        return self._submit("detect", frame, regions=regions)
+
+    def render(
+        self,
+        frame: Frame,
+        detections: Detections,
+        width: int | None = None,
+        quality: int = JPEG_QUALITY,
+    ) -> Future:
+        """Draw ``detections`` on ``frame`` at ``width`` px; resolves to JPEG bytes."""
+        return self._submit("render", frame, detections, width, quality)
+
+    def _submit(
+        self,
+        op: str,
+        frame: Frame,
+        detections: Detections | None = None,
+        width: int | None = None,
+        quality: int = JPEG_QUALITY,
+        regions: list[Region] | None = None,
+    ) -> Future:
+        if self._error is not None:
+            raise RuntimeError(f"Detection workers failed to start: {self._error}")
+        future: Future = Future()
+        try:
+            slot = self._free_slots.get(timeout=SLOT_TIMEOUT)
+        except queue.Empty:
+            raise TimeoutError(
+                f"All {self.capacity} frame slots stayed busy for {SLOT_TIMEOUT}s"
+            ) from None
+        try:
+            shape = self.ring.write(slot, frame.image)
+        except Exception:
+            self._free_slots.put(slot)
+            raise
+        task_id = next(self._task_ids)
+        with self._lock:
+            if self._error is not None or self._closing:
+                self._free_slots.put(slot)
+                raise RuntimeError(
+                    f"Detection workers failed to start: {self._error}"
+                    if self._error is not None
+                    else "Detection worker pool closed"
+                )
+            loads = [0] * len(self._workers)
+            for _, _, holder in self._pending.values():
+                loads[holder] += 1
+            index = loads.index(min(loads))
+            self._pending[task_id] = (future, slot, index)
+            conn = self._task_conns[index]
+        try:
+            with self._send_locks[index]:
+                conn.send(
+                    (
+                        task_id,
+                        op,
+                        slot,
+                        frame.seq,
+                        frame.timestamp,
+                        shape,
+                        regions,
+                        detections,
+                        width,
+                        quality,
+                    )
+                )
+        except (OSError, ValueError):
+            # The worker died under us; unless the collector got there first,
+            # the task is still ours to fail.
+            with self._lock:
+                entry = self._pending.pop(task_id, None)
+            if entry is not None:
+                self._free_slots.put(slot)
+                raise RuntimeError(
+                    "Detection worker exited before taking the task"
+                ) from None
+        return future
+
+    def _collect(self) -> None:
+        while True:
+            with self._lock:
+                watched = [
+                    index for index in range(len(self._workers)) if self._watched[index]
+                ]
+                conns = {self._result_conns[index]: index for index in watched}
+                sentinels = {self._workers[index].sentinel: index for index in watched}
+            ready = wait([self._wakeup_reader, *conns, *sentinels])
+            if self._wakeup_reader in ready:
+                return
+            # Results first: a worker may have finished a task just before exiting.
+            for conn in (conn for conn in ready if conn in conns):
+                self._drain(conn)
+            for index in {
+                sentinels[sentinel] for sentinel in ready if sentinel in sentinels
+            }:
+                self._on_exit(index)
+
+    def _drain(self, conn: Connection) -> None:
+        """Handle every result waiting on ``conn``."""
+        try:
+            while conn.poll():
+                self._on_result(*conn.recv())
+        except (EOFError, OSError):
+            pass  # the worker is gone; its sentinel says so too
+
+    def _on_result(self, task_id: int | None, result, error: str | None) -> None:
+        if task_id is None:
+            # Every worker loads the same model, so one failing means all do.
+            logger.error(f"Detection worker failed to start: {error}")
+            with self._lock:
+                self._error = error
+            self._fail_pending(
+                RuntimeError(f"Detection workers failed to start: {error}")
+            )
+            return
+        with self._lock:
+            entry = self._pending.pop(task_id, None)
+        if entry is None:
+            return
+        future, slot, _ = entry
+        self._free_slots.put(slot)
+        if error is not None:
+            _resolve(future, error=RuntimeError(f"Detection worker failed: {error}"))
+        else:
+            _resolve(future, result)
+
+    def _on_exit(self, index: int) -> None:
+        """Fail the tasks of exited worker ``index`` and start a replacement."""
+        worker = self._workers[index]
+        worker.join(timeout=1)
+        self._drain(self._result_conns[index])
+        with self._lock:
+            if self._workers[index] is not worker:
+                return
+            lost = {
+                task_id: entry
+                for task_id, entry in self._pending.items()
+                if entry[2] == index
+            }
+            for task_id in lost:
+                del self._pending[task_id]
+            with self._send_locks[index]:
+                self._task_conns[index].close()
+            self._result_conns[index].close()
+            if self._closing or self._error is not None:
+                self._watched[index] = False
+            else:
+                logger.error(
+                    f"{worker.name} exited with code {worker.exitcode}; "
+                    f"failing {len(lost)} task(s) and restarting it"
+                )
+                self.restarts += 1
+                self._spawn(index)
+        error = RuntimeError(f"{worker.name} exited with code {worker.exitcode}")
+        for future, slot, _ in lost.values():
+            self._free_slots.put(slot)
+            _resolve(future, error=error)
+
+    def close(self) -> None:
+        """Stop the workers, fail anything still pending and free the shared memory."""
+        with self._lock:
+            self._closing = True
+        for index in range(len(self._workers)):
+            try:
+                with self._send_locks[index]:
+                    self._task_conns[index].send(None)
+            except (OSError, ValueError):
+                pass  # already exited
+        # The collector keeps taking results until each worker has exited.
+        for worker in self._workers:
+            worker.join(timeout=10)
+            if worker.is_alive():
+                worker.terminate()
+        self._wakeup.send(None)
+        self._collector.join(timeout=5)
+        for conn in (
+            *self._task_conns,
+            *self._result_conns,
+            self._wakeup,
+            self._wakeup_reader,
+        ):
+            conn.close()
+        self._fail_pending(RuntimeError("Detection worker pool closed"))
+        self.ring.close()
+
+    def _fail_pending(self, error: Exception) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future, slot, _ in pending.values():
+            self._free_slots.put(slot)
+            _resolve(future, error=error)
+
+
+def _resolve(future: Future, result=None, error: Exception | None = None) -> None:
+    """Settle ``future`` unless its caller has cancelled it."""
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
@@ -0,0 +1,142 @@
+"""A captured camera frame and the views derived from it.
+
+Several consumers usually want the same transforms of the same frame: every
+MJPEG viewer at 1280 px needs the same downscale and the same JPEG, motion
+detection a small grayscale copy. A
+:class:`Frame` computes each derived view the first time it is asked for and
+hands the cached result to everyone after that, so each transform is paid for
+once per captured frame rather than once per consumer.
+
+Views are shared between threads and therefore read-only; copy one before
+drawing on it.
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+import cv2
+import numpy as np
+
+JPEG_QUALITY = 80
+
+
+def scale_to_width(image: np.ndarray, width: int | None) -> np.ndarray:
+    """Downscale ``image`` to ``width`` px wide, preserving aspect ratio."""
+    if not width or width >= image.shape[1]:
+        return image
+    height = int(round(image.shape[0] * width / image.shape[1]))
+    return cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+
+
+def encode_jpeg(image: np.ndarray, quality: int = JPEG_QUALITY) -> bytes:
+    """Encode an image as JPEG bytes at the given quality."""
+    return cv2.imencode(".jpg", image, [int(cv2.IMWRITE_JPEG_QUALITY), int(quality)])[
+        1
+    ].tobytes()
+
+
+def _read_only(image: np.ndarray) -> np.ndarray:
+    image.flags.writeable = False
+    return image
+
+
+class Frame:
+    """One captured frame: sequence number, capture time and BGR pixels.
+
+    Derived views are computed lazily and memoised per frame. Concurrent
+    callers asking for the same view wait for the one computing it instead of
+    repeating the work.
+    """
+
+    __slots__ = ("seq", "timestamp", "image", "_views", "_lock", "_view_locks")
+
+    def __init__(self, seq: int, image: np.ndarray, timestamp: float | None = None):
+        self.seq = seq
+        self.timestamp = time.monotonic() if timestamp is None else timestamp
+        self.image = _read_only(image)
+        self._views: dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+        self._view_locks: dict[tuple, threading.Lock] = {}
+
+    @property
+    def width(self) -> int:
+        return self.image.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.image.shape[0]
+
+    @property
+    def age(self) -> float:
+        """Seconds since the frame was captured."""
+        return time.monotonic() - self.timestamp
+
+    def normalize_width(self, width: int | None) -> int | None:
+        """Normalise a requested width: ``None`` stands for full resolution."""
+        return width if width and width < self.width else None
+
+    def _view(self, key: tuple, compute: Callable[[], Any]) -> Any:
+        view = self._views.get(key)
+        if view is not None:
+            return view
+        with self._lock:
+            lock = self._view_locks.setdefault(key, threading.Lock())
+        with lock:
+            view = self._views.get(key)
+            if view is None:
+                view = compute()
+                self._views[key] = view
+            return view
+
+    def scaled(self, width: int | None = None) -> np.ndarray:
+        """The frame downscaled to ``width`` px (the base image if not smaller).
+
+        Levels form a pyramid: each one is resized from the smallest level
+        already computed that is still at least ``width`` wide, rather than
+        from the full-resolution frame.
+        """
+        width = self.normalize_width(width)
+        if width is None:
+            return self.image
+        return self._view(
+            ("scaled", width),
+            lambda: _read_only(scale_to_width(self.level_for(width + 1), width)),
+        )
+
+    def level_for(self, width: int) -> np.ndarray:
+        """The smallest BGR level already computed that is at least ``width`` px wide.
+
+        Unlike :meth:`scaled` this never computes anything; it falls back to
+        the full-resolution image.
+        """
+        source = self.image
+        for key, level in list(self._views.items()):
+            if key[0] == "scaled" and width <= level.shape[1] < source.shape[1]:
+                source = level
+        return source
+
+    def rgb(self, width: int | None = None) -> np.ndarray:
+        """The (optionally downscaled) frame in RGB channel order."""
+        width = self.normalize_width(width)
+        return self._view(
+            ("rgb", width),
+            lambda: _read_only(cv2.cvtColor(self.scaled(width), cv2.COLOR_BGR2RGB)),
+        )
+
+    def gray(self, width: int | None = None) -> np.ndarray:
+        """The (optionally downscaled) frame as single-channel grayscale."""
+        width = self.normalize_width(width)
+        return self._view(
+            ("gray", width),
+            lambda: _read_only(cv2.cvtColor(self.scaled(width), cv2.COLOR_BGR2GRAY)),
+        )
+
+    def jpeg(self, width: int | None = None, quality: int = JPEG_QUALITY) -> bytes:
+        """The frame JPEG-encoded at ``width`` px and ``quality``."""
+        width = self.normalize_width(width)
+        return self._view(
+            ("jpeg", width, int(quality)),
+            lambda: encode_jpeg(self.scaled(width), quality),
+        )
@@ -0,0 +1,204 @@
+"""Gatekeeper mode: a low-power motion sentinel in front of the detector.
+
+Through long empty hours there is nothing for the accelerator to find. A
+:class:`Gatekeeper` keeps one camera in *sentinel* mode instead: it reads a
+few frames per second, and only a small grayscale view of each goes through
+:class:`MotionDetector`. Because the camera's reader only decodes frames that
+somebody is due to receive, a sentinel alone keeps decoding and resizing
+down to those few frames, and the detector is not touched at all.
+
+When the moving fraction of the configured region crosses the motion
+threshold the gatekeeper *escalates*: it reads frames at the active rate and
+runs every one through the detector (whose results are cached for streams and
+``/detections`` as usual). After ``quiet_period_s`` without motion or new or
+moving detections it drops back to sentinel; a parked car or a piece of
+furniture the model mistakes for a class does not keep it awake.
+:meth:`Gatekeeper.status` reports the time spent in each mode and the
+resulting detector duty cycle.
+
+Configured by ``gatekeeper_params`` in the detector config.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+
+from rpi_surveillance.backend.frame import Frame
+from rpi_surveillance.backend.inference.detections import Detections
+from rpi_surveillance.backend.inference.object_detection_postprocess import iou_matrix
+from rpi_surveillance.backend.motion import MOTION_WIDTH, MotionDetector
+
+logger = logging.getLogger(__name__)
+
+SENTINEL = "sentinel"
+ACTIVE = "active"
+
+GATEKEEPER_DEFAULTS = {
+    "sentinel_fps": 2.0,
+    "active_fps": 5.0,
+    "motion_width": MOTION_WIDTH,
+    "pixel_threshold": 25,
+    "background_alpha": 0.05,
+    "motion_threshold": 0.01,
+    "quiet_period_s": 10.0,
+    "still_iou": 0.5,
+    "region": None,
+}
+
+
+class Gatekeeper:
+    """Motion sentinel for one camera that runs ``detect`` only while escalated.
+
+    Args:
+        camera: The camera handler; frames are read through its ``subscribe``.
+        detect: Runs the detector on a frame, e.g. ``detector_injector.detections``
+            bound to the camera id.
+        params: ``gatekeeper_params``, over :data:`GATEKEEPER_DEFAULTS`:
+            ``sentinel_fps`` and ``active_fps`` (frames read per second in each
+            mode), ``motion_width``, ``pixel_threshold``, ``background_alpha``
+            and ``region`` (see :class:`MotionDetector`), ``motion_threshold``
+            (moving fraction of the region that escalates) and
+            ``quiet_period_s`` (seconds without motion or detections before
+            returning to sentinel) and ``still_iou`` (overlap with a box of
+            the same class on the previous frame at which a detection counts
+            as standing still, and so not as activity).
+    """
+
+    def __init__(
+        self, camera, detect: Callable[[Frame], Detections], params: dict | None = None
+    ):
+        params = {**GATEKEEPER_DEFAULTS, **(params or {})}
+        self.camera = camera
+        self._detect = detect
+        self.sentinel_fps = float(params["sentinel_fps"])
+        self.active_fps = float(params["active_fps"])
+        self.motion_threshold = float(params["motion_threshold"])
+        self.quiet_period = float(params["quiet_period_s"])
+        self.still_iou = float(params["still_iou"])
+        self.motion = MotionDetector(
+            int(params["motion_width"]),
+            int(params["pixel_threshold"]),
+            float(params["background_alpha"]),
+            params["region"],
+        )
+        self.state = SENTINEL
+        self.frames = 0
+        self.inferences = 0
+        self.missed = 0
+        self.escalations = 0
+        self.last_motion = 0.0
+        self.last_detections = Detections.empty()
+        self._seconds = {SENTINEL: 0.0, ACTIVE: 0.0}
+        self._state_since: float | None = None
+        self._last_activity = 0.0
+        self._running = False
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> "Gatekeeper":
+        if self._thread is None:
+            self._running = True
+            self._state_since = time.monotonic()
+            self._thread = threading.Thread(
+                target=self._run, name="gatekeeper", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        with self._lock:
+            self._enter(SENTINEL, time.monotonic())
+            self._state_since = None
+
+    def _run(self) -> None:
+        with self.camera.subscribe(max_fps=self.sentinel_fps) as subscription:
+            while self._running:
+                try:
+                    frame = subscription.next(timeout=5.0)
+                except TimeoutError:
+                    continue
+                except Exception as e:
+                    logger.error(f"Gatekeeper stopped reading frames: {e}")
+                    break
+                self._examine(frame)
+                subscription.set_max_fps(
+                    self.active_fps if self.state == ACTIVE else self.sentinel_fps
+                )
+
+    def _examine(self, frame: Frame) -> None:
+        now = time.monotonic()
+        self.frames += 1
+        self.last_motion = self.motion.update(frame)
+        if self.last_motion >= self.motion_threshold:
+            self._last_activity = now
+            if self.state == SENTINEL:
+                self.escalations += 1
+                logger.info(
+                    f"Gatekeeper escalating: {self.last_motion:.1%} of region moving"
+                )
+                with self._lock:
+                    self._enter(ACTIVE, now)
+        if self.state != ACTIVE:
+            return
+        previous = self.last_detections
+        try:
+            self.last_detections = self._detect(frame)
+            self.inferences += 1
+        except TimeoutError:
+            # The detector is backed up; keep the last result until it catches up.
+            self.missed += 1
+        except Exception as e:
+            logger.error(f"Gatekeeper detection failed: {e}")
+            self.last_detections = Detections.empty()
+        if self._changed(previous, self.last_detections):
+            self._last_activity = now
+        elif now - self._last_activity >= self.quiet_period:
+            logger.info("Gatekeeper quiet; returning to sentinel")
+            with self._lock:
+                self._enter(SENTINEL, now)
+
+    def _changed(self, previous: Detections, current: Detections) -> bool:
+        """Whether ``current`` has a box that is new or moved since ``previous``."""
+        if not len(current):
+            return False
+        if not len(previous):
+            return True
+        ious = iou_matrix(current.boxes, previous.boxes)
+        ious[current.classes[:, None] != previous.classes[None, :]] = 0.0
+        return bool((ious.max(axis=1) < self.still_iou).any())
+
+    def _enter(self, state: str, now: float) -> None:
+        """Close the running mode's time account and switch to ``state``.
+
+        The caller holds ``_lock``.
+        """
+        if self._state_since is not None:
+            self._seconds[self.state] += now - self._state_since
+            self._state_since = now
+        self.state = state
+
+    def status(self) -> dict:
+        """Current mode, time spent in each mode and the detector duty cycle."""
+        with self._lock:
+            seconds = dict(self._seconds)
+            if self._state_since is not None:
+                seconds[self.state] += time.monotonic() - self._state_since
+        total = seconds[SENTINEL] + seconds[ACTIVE]
+        return {
+            "running": self._thread is not None,
+            "state": self.state,
+            "sentinel_seconds": round(seconds[SENTINEL], 1),
+            "active_seconds": round(seconds[ACTIVE], 1),
+            "duty_cycle": round(seconds[ACTIVE] / total, 4) if total else 0.0,
+            "frames": self.frames,
+            "inferences": self.inferences,
+            "missed": self.missed,
+            "escalations": self.escalations,
+            "motion": round(self.last_motion, 4),
+            "detections": len(self.last_detections),
+        }
@@ -0,0 +1,92 @@
+"""Inference backends the :class:`ObjectDetector` can run on.
+
+A backend takes letterboxed RGB model inputs and returns, per frame, the raw
+result ``extract_detections`` consumes: one ``(N, 5)`` array per class holding
+``[ymin, xmin, ymax, xmax, score]`` normalised to the model input, which is
+the layout of the Hailo NMS output. Every backend mirrors the asynchronous
+``HailoInfer`` contract: :meth:`InferenceBackend.infer_async` returns a job
+with ``wait(timeout_ms)`` and reports through an ``on_done(results, error)``
+callback, so :class:`DetectionPipeline` drives all of them the same way.
+
+Backends are looked up by name in :data:`BACKENDS` and imported on first use,
+so a node only needs the SDK of the backend it actually selects.
+"""
+
+import importlib
+from collections.abc import Callable
+from concurrent.futures import Future, wait
+
+import numpy as np
+
+# Backend name -> "module:class"; selected by ``inference_params.backend``.
+BACKENDS = {
+    "hailo": "rpi_surveillance.backend.inference.backends.hailo:HailoModel",
+    "onnx": "rpi_surveillance.backend.inference.backends.onnx:OnnxRuntimeModel",
+    "simulated": "rpi_surveillance.backend.inference.backends.simulated:SimulatedModel",
+}
+
+
+class InferenceBackend:
+    """Base class for inference engines.
+
+    Subclasses set ``input_width``, ``input_height`` and ``batch_size`` and
+    implement :meth:`infer_async`; :meth:`infer` is built on top of it.
+    """
+
+    input_width: int
+    input_height: int
+    batch_size: int = 1
+
+    def infer_async(
+        self,
+        preprocessed_frames: list[np.ndarray],
+        on_done: Callable[[list | None, Exception | None], None],
+    ):
+        """Submit up to ``batch_size`` frames as one job without waiting; return it.
+
+        ``on_done(results, error)`` runs once the job finishes, with one raw
+        result per submitted frame (or the error).
+        """
+        raise NotImplementedError
+
+    def infer(self, preprocessed_frame: np.ndarray, timeout_ms: int = 10000):
+        """Run inference on one preprocessed frame and wait for the result."""
+        result_box: dict = {}
+
+        def _on_done(results, error):
+            if error is not None:
+                result_box["error"] = error
+            else:
+                result_box["result"] = results[0]
+
+        job = self.infer_async([preprocessed_frame], _on_done)
+        job.wait(timeout_ms)
+
+        if "error" in result_box:
+            raise RuntimeError(f"Inference failed: {result_box['error']}")
+        return result_box.get("result")
+
+    def close(self) -> None:
+        pass
+
+
+class FutureJob:
+    """Adapts a :class:`Future` to the ``job.wait(timeout_ms)`` of HailoRT jobs."""
+
+    def __init__(self, future: Future):
+        self.future = future
+
+    def wait(self, timeout_ms: int) -> None:
+        wait([self.future], timeout=timeout_ms / 1000)
+
+
+def create_backend(name: str, **params) -> InferenceBackend:
+    """Instantiate the backend registered as ``name`` with its config ``params``."""
+    try:
+        target = BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown inference backend '{name}'; choose one of {sorted(BACKENDS)}"
+        )
+    module_name, _, class_name = target.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)(**params)
@@ -0,0 +1,85 @@
+"""Hailo accelerator backend, running compiled HEF models through ``HailoInfer``."""
+
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from hailo_apps.python.core.common.core import resolve_hef_path
+    from hailo_apps.python.core.common.hailo_inference import HailoInfer
+except ImportError:  # pragma: no cover - only present with the Hailo SDK installed
+    HailoInfer = None
+    resolve_hef_path = None
+
+from rpi_surveillance.backend.inference.backends import InferenceBackend
+
+APP_NAME = "object_detection"
+
+
+def _bindings_output(bindings):
+    """Read one frame's raw result out of its HailoRT output bindings."""
+    if len(bindings._output_names) == 1:
+        return bindings.output().get_buffer()
+    return {
+        name: np.expand_dims(bindings.output(name).get_buffer(), axis=0)
+        for name in bindings._output_names
+    }
+
+
+class HailoModel(InferenceBackend):
+    """Thin wrapper around ``HailoInfer``, blocking (:meth:`infer`) or not
+    (:meth:`infer_async`).
+
+    Without ``model_path`` the default HEF for the object detection app is
+    resolved (and downloaded if needed).
+    """
+
+    def __init__(self, model_path: str | Path | None = None, batch_size: int = 1):
+        if HailoInfer is None:
+            raise RuntimeError(
+                "The Hailo SDK (hailo_apps) is not available on this machine"
+            )
+        if model_path is None:
+            model_path = resolve_hef_path(None, APP_NAME, app_type="standalone")
+        if model_path is None:
+            raise RuntimeError(
+                f"Could not resolve a default HEF model for '{APP_NAME}'."
+            )
+        self.batch_size = max(1, batch_size)
+        self._hailo = HailoInfer(str(model_path), self.batch_size)
+        self.input_height, self.input_width, _ = self._hailo.get_input_shape()
+
+    def infer_async(
+        self,
+        preprocessed_frames: list[np.ndarray],
+        on_done: Callable[[list | None, Exception | None], None],
+    ):
+        """Submit up to ``batch_size`` frames as one job; return the HailoRT job.
+
+        A partial batch is padded to the configured batch size by repeating its
+        last frame; results for the padding are dropped. ``on_done(results,
+        error)`` runs on a HailoRT thread once the job finishes, with one raw
+        result per submitted frame (or the error).
+        """
+        count = len(preprocessed_frames)
+        if count > self.batch_size:
+            raise ValueError(
+                f"Got {count} frames for a model with batch size {self.batch_size}"
+            )
+        batch = list(preprocessed_frames) + [preprocessed_frames[-1]] * (
+            self.batch_size - count
+        )
+
+        def _on_done(completion_info, bindings_list):
+            if completion_info.exception:
+                on_done(None, completion_info.exception)
+                return
+            on_done(
+                [_bindings_output(bindings) for bindings in bindings_list[:count]], None
+            )
+
+        return self._hailo.run(batch, _on_done)
+
+    def close(self) -> None:
+        self._hailo.close()
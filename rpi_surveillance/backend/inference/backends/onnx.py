@@ -0,0 +1,237 @@
+"""ONNX Runtime CPU backend, for detection on nodes without a Hailo accelerator.
+
+Runs YOLO-style ONNX exports (see ``rpi_surveillance.detector.converter``) and
+reduces their dense predictions with a vectorised NMS to the per-class
+``[ymin, xmin, ymax, xmax, score]`` layout of the Hailo NMS output, so the
+rest of the detection code cannot tell the backends apart.
+"""
+
+import os
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import onnxruntime as ort
+except ImportError:  # pragma: no cover - optional dependency
+    ort = None
+
+from rpi_surveillance.backend.inference.backends import FutureJob, InferenceBackend
+
+# Candidates kept per frame before NMS; dense YOLO heads emit thousands.
+MAX_NMS_CANDIDATES = 3000
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Greedy non-maximum suppression; returns the kept indices, best score first.
+
+    ``boxes`` are ``(N, 4)`` ``[x1, y1, x2, y2]``. Each round compares the best
+    remaining box against all others at once, so the Python loop runs once per
+    kept box rather than once per pair.
+    """
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.argsort(scores)[::-1]
+    keep = []
+    while order.size:
+        best, rest = order[0], order[1:]
+        keep.append(best)
+        width = np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest])
+        height = np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest])
+        inter = np.clip(width, 0, None) * np.clip(height, 0, None)
+        iou = inter / (areas[best] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.intp)
+
+
+def batched_nms(
+    boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray, iou_threshold: float
+) -> np.ndarray:
+    """Per-class NMS in a single pass.
+
+    Boxes are normalised to ``[0, 1]``, so shifting each class by twice its id
+    keeps boxes of different classes from ever overlapping.
+    """
+    return nms(boxes + (class_ids * 2.0)[:, None], scores, iou_threshold)
+
+
+class OnnxRuntimeModel(InferenceBackend):
+    """YOLO detector on ONNX Runtime's CPU execution provider.
+
+    Args:
+        model_path: The ``.onnx`` file.
+        batch_size: Most frames per job (the pipeline's micro-batch size).
+        intra_op_threads: Threads one operator may use; ``0`` lets ONNX Runtime
+            use every physical core. Leave headroom for the camera readers on a Pi.
+        inter_op_threads: Threads for running independent operators in parallel.
+        allow_spinning: Whether idle worker threads busy-wait for work. Spinning
+            shaves latency but burns CPU the camera and encoder threads need.
+        output_format: ``"yolov8"`` (``4 + classes`` rows, no objectness) or
+            ``"yolov5"`` (``5 + classes`` columns with an objectness score).
+        nms_score_thres: Minimum class score kept before NMS.
+        nms_iou_thres: IoU above which the weaker of two same-class boxes is dropped.
+        max_detections: Most boxes returned per frame.
+        input_size: ``[height, width]`` to feed a model exported with dynamic
+            spatial dimensions; must match the model's if those are fixed.
+    """
+
+    def __init__(
+        self,
+        model_path: str | Path | None = None,
+        batch_size: int = 1,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 1,
+        allow_spinning: bool = False,
+        output_format: str = "yolov8",
+        nms_score_thres: float = 0.25,
+        nms_iou_thres: float = 0.45,
+        max_detections: int = 100,
+        input_size: tuple[int, int] | None = None,
+    ):
+        if ort is None:
+            raise RuntimeError("onnxruntime is not installed on this machine")
+        if model_path is None:
+            raise ValueError("The ONNX backend needs a model_path")
+        if output_format not in ("yolov8", "yolov5"):
+            raise ValueError(f"Unsupported ONNX output format '{output_format}'")
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.add_session_config_entry(
+            "session.intra_op.allow_spinning", "1" if allow_spinning else "0"
+        )
+        self._session = ort.InferenceSession(
+            os.fspath(model_path), options, providers=["CPUExecutionProvider"]
+        )
+
+        model_input = self._session.get_inputs()[0]
+        self._input_name = model_input.name
+        self._float_input = model_input.type == "tensor(float)"
+        shape = model_input.shape
+        self._channels_last = shape[-1] == 3
+        dims = shape[1:3] if self._channels_last else shape[2:4]
+        # Dynamic dimensions come back as names or None, not sizes.
+        if all(isinstance(dim, int) for dim in dims):
+            if input_size is not None and tuple(input_size) != tuple(dims):
+                raise ValueError(
+                    f"input_size {list(input_size)} does not match the model's "
+                    f"fixed input size {list(dims)}"
+                )
+        elif input_size is None:
+            raise ValueError(
+                f"{os.fspath(model_path)} has a dynamic input size {list(dims)}; "
+                "set onnx_params.input_size to [height, width]"
+            )
+        else:
+            dims = input_size
+        self.input_height, self.input_width = (int(dim) for dim in dims)
+        # Static batch dimension: every job is padded to exactly that many frames.
+        self._static_batch = shape[0] if isinstance(shape[0], int) else None
+        self.batch_size = max(1, min(batch_size, self._static_batch or batch_size))
+
+        self.output_format = output_format
+        self.score_threshold = nms_score_thres
+        self.iou_threshold = nms_iou_thres
+        self.max_detections = max_detections
+        # One job at a time: concurrent sessions would only fight over the
+        # intra-op threads. Queued jobs make up the in-flight window.
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="onnx-infer"
+        )
+
+    def infer_async(
+        self,
+        preprocessed_frames: list[np.ndarray],
+        on_done: Callable[[list | None, Exception | None], None],
+    ) -> FutureJob:
+        count = len(preprocessed_frames)
+        if count > self.batch_size:
+            raise ValueError(
+                f"Got {count} frames for a model with batch size {self.batch_size}"
+            )
+
+        def run():
+            try:
+                results = self._run(preprocessed_frames)
+            except Exception as e:
+                on_done(None, e)
+                return
+            on_done(results, None)
+
+        return FutureJob(self._executor.submit(run))
+
+    def _input_tensor(self, frames: list[np.ndarray]) -> np.ndarray:
+        frames = list(frames) + [frames[-1]] * (
+            (self._static_batch or len(frames)) - len(frames)
+        )
+        batch = np.stack(frames)
+        if not self._channels_last:
+            batch = batch.transpose(0, 3, 1, 2)
+        if not self._float_input:
+            return np.ascontiguousarray(batch)
+        # Cast, reorder and scale in one pass over a single buffer.
+        tensor = np.ascontiguousarray(batch, dtype=np.float32)
+        tensor *= 1.0 / 255.0
+        return tensor
+
+    def _run(self, frames: list[np.ndarray]) -> list[list[np.ndarray]]:
+        output = self._session.run(
+            None, {self._input_name: self._input_tensor(frames)}
+        )[0]
+        # yolov8 exports predictions as (batch, 4 + classes, anchors).
+        if output.shape[1] < output.shape[2]:
+            output = output.transpose(0, 2, 1)
+        return [self._decode(prediction) for prediction in output[: len(frames)]]
+
+    def _decode(self, prediction: np.ndarray) -> list[np.ndarray]:
+        """Reduce one frame's dense ``(anchors, values)`` output to per-class boxes."""
+        if self.output_format == "yolov5":
+            class_scores = prediction[:, 5:] * prediction[:, 4:5]
+        else:
+            class_scores = prediction[:, 4:]
+        class_ids = class_scores.argmax(axis=1)
+        scores = np.take_along_axis(class_scores, class_ids[:, None], axis=1)[:, 0]
+
+        candidates = np.flatnonzero(scores >= self.score_threshold)
+        if candidates.size > MAX_NMS_CANDIDATES:
+            top = np.argpartition(scores[candidates], -MAX_NMS_CANDIDATES)[
+                -MAX_NMS_CANDIDATES:
+            ]
+            candidates = candidates[top]
+        centre_x, centre_y, width, height = prediction[candidates, :4].T
+        scale = np.array([self.input_width, self.input_height] * 2, dtype=np.float32)
+        boxes = (
+            np.stack(
+                [
+                    centre_x - width / 2,
+                    centre_y - height / 2,
+                    centre_x + width / 2,
+                    centre_y + height / 2,
+                ],
+                axis=1,
+            )
+            / scale
+        )
+        np.clip(boxes, 0.0, 1.0, out=boxes)
+        scores, class_ids = scores[candidates], class_ids[candidates]
+
+        keep = batched_nms(boxes, scores, class_ids, self.iou_threshold)[
+            : self.max_detections
+        ]
+        boxes, scores, class_ids = boxes[keep], scores[keep], class_ids[keep]
+
+        # Hailo NMS layout: for each class, rows of [ymin, xmin, ymax, xmax, score].
+        rows = np.stack(
+            [boxes[:, 1], boxes[:, 0], boxes[:, 3], boxes[:, 2], scores], axis=1
+        ).astype(np.float32)
+        order = np.argsort(class_ids, kind="stable")
+        counts = np.bincount(class_ids, minlength=class_scores.shape[1])
+        return np.split(rows[order], np.cumsum(counts)[:-1])
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,215 @@
+"""Simulated Hailo accelerator, for load and latency testing without hardware.
+
+:class:`SimulatedInfer` honours the ``HailoInfer`` contract: ``run(batch,
+callback)`` returns a job with ``wait(timeout_ms)``, blocks while the device's
+async queue is full (like ``wait_for_async_ready``), and later calls
+``callback(completion_info=..., bindings_list=...)`` on its own device thread
+with bindings whose ``output().get_buffer()`` holds a Hailo-NMS-shaped result.
+It can therefore stand in for ``HailoInfer`` anywhere, including the CLI's
+``infer()``/``inference_callback`` loop; :class:`SimulatedModel` is the
+matching backend for :class:`ObjectDetector`.
+
+Latency, jitter and detections are drawn from a seeded generator keyed by job
+and frame number, so a run is repeatable.
+"""
+
+import collections
+import logging
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+from rpi_surveillance.backend.inference.backends.hailo import HailoModel
+
+logger = logging.getLogger(__name__)
+
+
+class _SimulatedJob:
+    def __init__(self):
+        self._done = threading.Event()
+
+    def wait(self, timeout_ms: int) -> None:
+        self._done.wait(timeout_ms / 1000)
+
+
+class _SimulatedOutput:
+    def __init__(self, buffer):
+        self._buffer = buffer
+
+    def get_buffer(self):
+        return self._buffer
+
+
+class _SimulatedBindings:
+    """The part of HailoRT's ``Bindings`` the result handlers read."""
+
+    def __init__(self, buffer):
+        self._output_names = ["simulated_nms"]
+        self._output = _SimulatedOutput(buffer)
+
+    def output(self, name: str | None = None) -> _SimulatedOutput:
+        return self._output
+
+
+class SimulatedInfer:
+    """Drop-in for ``HailoInfer`` backed by a timer instead of an accelerator.
+
+    Jobs run one at a time in submission order, like on the device. Each takes
+    ``latency_ms + per_frame_ms * batch_size`` plus up to ``jitter_ms`` either
+    way; the whole configured batch is paid for, as on the Hailo.
+
+    Args:
+        net: Ignored; accepted so call sites can pass a HEF path unchanged.
+        batch_size: Frames per job.
+        input_shape: ``(height, width, channels)`` reported by :meth:`get_input_shape`.
+        latency_ms: Fixed cost of one job.
+        per_frame_ms: Additional cost per frame of the batch.
+        jitter_ms: Uniform random deviation applied to each job's latency.
+        max_in_flight: Jobs the device queues before :meth:`run` blocks.
+        num_classes: Length of each per-class result list.
+        detections_per_frame: Synthetic boxes generated per frame.
+        seed: Seed for latency jitter and detections.
+    """
+
+    def __init__(
+        self,
+        net=None,
+        batch_size: int = 1,
+        input_shape: tuple[int, int, int] = (640, 640, 3),
+        latency_ms: float = 12.0,
+        per_frame_ms: float = 4.0,
+        jitter_ms: float = 0.0,
+        max_in_flight: int = 4,
+        num_classes: int = 80,
+        detections_per_frame: int = 5,
+        seed: int = 0,
+    ):
+        self.batch_size = batch_size
+        self.input_shape = tuple(input_shape)
+        self.latency = latency_ms / 1000
+        self.per_frame = per_frame_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.max_in_flight = max(1, max_in_flight)
+        self.num_classes = num_classes
+        self.detections_per_frame = detections_per_frame
+        self.seed = seed
+        self.jobs_run = 0
+        self.frames_run = 0
+        self._queue: collections.deque = collections.deque()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._submitted = 0
+        self._frames_submitted = 0
+        self._closed = False
+        self._device = threading.Thread(
+            target=self._device_loop, name="simulated-hailo", daemon=True
+        )
+        self._device.start()
+
+    def get_input_shape(self) -> tuple[int, int, int]:
+        return self.input_shape
+
+    def run(
+        self,
+        input_batch: list,
+        inference_callback_fn: Callable,
+        timeout_ms: int = 10000,
+    ):
+        """Queue a batch and return its job; blocks while ``max_in_flight`` wait."""
+        job = _SimulatedJob()
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._in_flight < self.max_in_flight or self._closed,
+                timeout_ms / 1000,
+            ):
+                raise TimeoutError(
+                    "Simulated device did not become ready for async inference"
+                )
+            if self._closed:
+                raise RuntimeError("Simulated device is closed")
+            self._in_flight += 1
+            first_frame = self._frames_submitted
+            self._frames_submitted += len(input_batch)
+            self._queue.append(
+                (
+                    self._submitted,
+                    first_frame,
+                    len(input_batch),
+                    inference_callback_fn,
+                    job,
+                )
+            )
+            self._submitted += 1
+            self._cond.notify_all()
+        return job
+
+    def _job_latency(self, job_index: int) -> float:
+        latency = self.latency + self.per_frame * self.batch_size
+        if self.jitter:
+            rng = np.random.default_rng((self.seed, job_index))
+            latency += rng.uniform(-self.jitter, self.jitter)
+        return max(0.0, latency)
+
+    def synthetic_result(self, frame_index: int) -> list[np.ndarray]:
+        """Per-class ``[ymin, xmin, ymax, xmax, score]`` rows for one frame."""
+        rng = np.random.default_rng((self.seed, frame_index, 1))
+        count = self.detections_per_frame
+        corners = rng.uniform(0.0, 1.0, (count, 2, 2))
+        low, high = corners.min(axis=1), corners.max(axis=1)
+        rows = np.column_stack([low, high, rng.uniform(0.4, 0.95, count)]).astype(
+            np.float32
+        )
+        class_ids = rng.integers(0, self.num_classes, count)
+        return [rows[class_ids == class_id] for class_id in range(self.num_classes)]
+
+    def _device_loop(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._closed)
+                if not self._queue:
+                    return
+                job_index, first_frame, count, callback, job = self._queue.popleft()
+            time.sleep(self._job_latency(job_index))
+            bindings_list = [
+                _SimulatedBindings(self.synthetic_result(first_frame + i))
+                for i in range(count)
+            ]
+            self.jobs_run += 1
+            self.frames_run += count
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+            try:
+                callback(
+                    completion_info=SimpleNamespace(exception=None),
+                    bindings_list=bindings_list,
+                )
+            except Exception as e:
+                logger.error(f"Simulated inference callback failed: {e}")
+            job._done.set()
+
+    def close(self) -> None:
+        """Finish the queued jobs, then stop the device thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._device.join(timeout=10)
+
+
+class SimulatedModel(HailoModel):
+    """:class:`HailoModel` on a :class:`SimulatedInfer` instead of the accelerator.
+
+    Takes the :class:`SimulatedInfer` options (``latency_ms``, ``jitter_ms``,
+    ``max_in_flight``, ...) as keyword arguments.
+    """
+
+    def __init__(
+        self, model_path: str | Path | None = None, batch_size: int = 1, **params
+    ):
+        self.batch_size = max(1, batch_size)
+        self._hailo = SimulatedInfer(model_path, self.batch_size, **params)
+        self.input_height, self.input_width, _ = self._hailo.get_input_shape()
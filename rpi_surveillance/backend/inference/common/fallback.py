@@ -0,0 +1,51 @@
+"""Stand-ins for the ``hailo_apps`` toolbox helpers, for nodes without the Hailo SDK.
+
+They behave like their ``hailo_apps.python.core.common`` namesakes so the
+detector and postprocessing code run unchanged on CPU-only backends.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import cv2
+import numpy as np
+
+MAX_ASYNC_INFER_JOBS = 3
+DEFAULT_COCO_LABELS_PATH = Path(__file__).resolve().parent / "coco.txt"
+
+
+def load_json_file(path: str) -> dict[str, Any]:
+    """Load and parse a JSON file."""
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"File not found: {path}")
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def get_labels(labels_path: str | None) -> list:
+    """Load class names, one per line; the COCO labels by default."""
+    if labels_path is None or not os.path.exists(labels_path):
+        labels_path = DEFAULT_COCO_LABELS_PATH
+    with open(labels_path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def id_to_color(idx):
+    np.random.seed(idx)
+    return np.random.randint(0, 255, size=3, dtype=np.uint8)
+
+
+def default_preprocess(image: np.ndarray, model_w: int, model_h: int) -> np.ndarray:
+    """Resize image with unchanged aspect ratio, padding to the model size."""
+    img_h, img_w, _ = image.shape[:3]
+    scale = min(model_w / img_w, model_h / img_h)
+    new_img_w, new_img_h = int(img_w * scale), int(img_h * scale)
+    image = cv2.resize(image, (new_img_w, new_img_h), interpolation=cv2.INTER_CUBIC)
+
+    padded_image = np.full((model_h, model_w, 3), (114, 114, 114), dtype=np.uint8)
+    x_offset = (model_w - new_img_w) // 2
+    y_offset = (model_h - new_img_h) // 2
+    padded_image[y_offset:y_offset + new_img_h, x_offset:x_offset + new_img_w] = image
+
+    return padded_image
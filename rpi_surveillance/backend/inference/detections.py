@@ -0,0 +1,132 @@
+"""The detections of one frame, as parallel NumPy arrays.
+
+:class:`Detections` is what ``extract_detections`` returns and what drawing,
+tracking, the detection cache, the worker processes and the JSON API pass
+around. The boxes, classes and scores stay in contiguous arrays all the way
+through, so no stage rebuilds per-detection lists or tuples, and a result
+pickles to a few hundred bytes when it crosses a process boundary. Results
+of the server-side tracker carry a fourth array, the track ids.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+
+
+class Detections:
+    """Detections of one frame; straight from the model they are highest score first.
+
+    Attributes:
+        boxes: ``(N, 4)`` int32 ``[xmin, ymin, xmax, ymax]`` pixel boxes.
+        classes: ``(N,)`` int32 class ids.
+        scores: ``(N,)`` float32 scores in ``[0, 1]``.
+        track_ids: ``(N,)`` int64 tracker ids, or ``None`` for untracked detections.
+    """
+
+    __slots__ = ("boxes", "classes", "scores", "track_ids")
+
+    def __init__(
+        self,
+        boxes: np.ndarray,
+        classes: np.ndarray,
+        scores: np.ndarray,
+        track_ids: np.ndarray | None = None,
+    ):
+        self.boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+        self.classes = np.asarray(classes, dtype=np.int32).reshape(-1)
+        self.scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+        self.track_ids = (
+            None
+            if track_ids is None
+            else np.asarray(track_ids, dtype=np.int64).reshape(-1)
+        )
+        if not len(self.boxes) == len(self.classes) == len(self.scores):
+            raise ValueError(
+                f"Mismatched detections: {len(self.boxes)} boxes, "
+                f"{len(self.classes)} classes, {len(self.scores)} scores"
+            )
+        if self.track_ids is not None and len(self.track_ids) != len(self.scores):
+            raise ValueError(
+                f"Mismatched detections: {len(self.track_ids)} track ids "
+                f"for {len(self.scores)} boxes"
+            )
+
+    @classmethod
+    def empty(cls) -> "Detections":
+        return cls(
+            np.empty((0, 4), dtype=np.int32),
+            np.empty(0, dtype=np.int32),
+            np.empty(0, dtype=np.float32),
+        )
+
+    @classmethod
+    def concatenate(cls, parts: Sequence["Detections"]) -> "Detections":
+        """All detections of ``parts`` (e.g. crops of a frame), highest score first."""
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return cls.empty()
+        if len(parts) == 1:
+            return parts[0]
+        scores = np.concatenate([part.scores for part in parts])
+        order = np.argsort(-scores, kind="stable")
+        track_ids = None
+        if all(part.track_ids is not None for part in parts):
+            track_ids = np.concatenate([part.track_ids for part in parts])[order]
+        return cls(
+            np.concatenate([part.boxes for part in parts])[order],
+            np.concatenate([part.classes for part in parts])[order],
+            scores[order],
+            track_ids,
+        )
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def __getitem__(self, index) -> "Detections":
+        """A subset: ``index`` is a slice, boolean mask or array of positions."""
+        if isinstance(index, (int, np.integer)):
+            index = slice(index, index + 1 or None)
+        track_ids = None if self.track_ids is None else self.track_ids[index]
+        return Detections(
+            self.boxes[index], self.classes[index], self.scores[index], track_ids
+        )
+
+    def __repr__(self) -> str:
+        return f"Detections({len(self)})"
+
+    def scaled(self, factor: float) -> "Detections":
+        """The same detections with boxes rescaled, e.g. onto a downscaled frame."""
+        if factor == 1.0:
+            return self
+        boxes = np.rint(self.boxes * factor).astype(np.int32)
+        return Detections(boxes, self.classes, self.scores, self.track_ids)
+
+    def translated(self, dx: int, dy: int) -> "Detections":
+        """The same detections with boxes shifted, e.g. from crop to frame pixels."""
+        if not dx and not dy:
+            return self
+        boxes = self.boxes + np.array([dx, dy, dx, dy], dtype=np.int32)
+        return Detections(boxes, self.classes, self.scores, self.track_ids)
+
+    def tracker_input(self) -> np.ndarray:
+        """``(N, 5)`` ``[xmin, ymin, xmax, ymax, score]`` rows, as ByteTrack wants."""
+        return np.column_stack([self.boxes, self.scores]).astype(np.float64)
+
+    def to_json(self, labels: Sequence[str] | None = None) -> list[dict]:
+        """One JSON-ready dict per detection, with its label when ``labels`` is given.
+
+        Tracked detections also carry their ``track_id``.
+        """
+        track_ids = self.track_ids.tolist() if self.track_ids is not None else None
+        items = []
+        for index, (box, class_id, score) in enumerate(
+            zip(self.boxes.tolist(), self.classes.tolist(), self.scores.tolist())
+        ):
+            item = {"box": box, "class_id": class_id}
+            if labels is not None:
+                item["label"] = labels[class_id]
+            item["score"] = score
+            if track_ids is not None:
+                item["track_id"] = track_ids[index]
+            items.append(item)
+        return items
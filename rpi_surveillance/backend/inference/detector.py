@@ -1,17 +1,37 @@
 #!/usr/bin/env python3
-"""Synchronous, single-frame object detection for request/response code paths.
+"""Single-frame object detection for request/response code paths.
 
 Unlike ``object_detection.py`` (a continuous-stream CLI pipeline built on
-threads and queues), this module is meant to be called like a function: hand
-it one camera frame, get one annotated frame back. Suitable for use from a
-FastAPI endpoint or any other synchronous handler.
+threads and queues), :class:`ObjectDetector` is meant to be called like a
+function: hand it one camera frame, get one annotated frame back. Suitable for
+use from a FastAPI endpoint or any other synchronous handler.
+
+:class:`DetectionPipeline` wraps a detector for the server's concurrent
+callers: it keeps several inference jobs in flight and overlaps preprocessing
+and postprocessing with accelerator time, returning a future per frame.
 """
+import collections
+import functools
+import logging
+import math
+import queue
 import sys
+import threading
+import time
+import warnings
+from collections.abc import Callable
+from concurrent.futures import Future
+from functools import partial
 from pathlib import Path
 
-import cv2
 import numpy as np
 
+from rpi_surveillance.backend.frame import Frame
+from rpi_surveillance.backend.inference.backends import InferenceBackend, create_backend
+from rpi_surveillance.backend.inference.detections import Detections
+from rpi_surveillance.backend.inference.filters import filters_for, score_thresholds
+from rpi_surveillance.backend.inference.preprocess import Letterboxer
+
 # -----------------------------------------------------------------------------
 # Ensure repository root is available in sys.path (same lookup as object_detection.py)
 # -----------------------------------------------------------------------------
@@ -24,63 +44,75 @@ for _p in Path(__file__).resolve().parents:
 if _repo_root is not None:
     sys.path.insert(0, str(_repo_root))
 
-from hailo_apps.python.core.common.hailo_inference import HailoInfer
-from hailo_apps.python.core.common.toolbox import get_labels, load_json_file, default_preprocess
-from hailo_apps.python.core.common.core import resolve_hef_path
+try:
+    from hailo_apps.python.core.common.defines import MAX_ASYNC_INFER_JOBS
+    from hailo_apps.python.core.common.toolbox import get_labels, load_json_file
+except ImportError:  # CPU-only nodes run without the Hailo SDK
+    from rpi_surveillance.backend.inference.common.fallback import (
+        MAX_ASYNC_INFER_JOBS,
+        get_labels,
+        load_json_file,
+    )
 
-from rpi_surveillance.backend.inference.object_detection_postprocess import (
-    extract_detections,
+# Takes ``id_to_color`` from ``hailo_apps`` when present: after the path setup.
+from rpi_surveillance.backend.inference.object_detection_postprocess import (  # noqa: E402
     draw_detections,
+    extract_detections,
+    non_max_suppression,
 )
 
-APP_NAME = "object_detection"
 DEFAULT_CONFIG_PATH = Path(__file__).resolve().parent / "config.json"
 
+# ``(xmin, ymin, xmax, ymax)`` pixel rectangle of a frame that the model runs on.
+Region = tuple[int, int, int, int]
 
-class HailoModel:
-    """Thin synchronous wrapper around ``HailoInfer`` for one frame at a time."""
+# ``tiling_params`` used where the config leaves them out; ``cameras`` maps a
+# camera id to its own overrides.
+TILING_DEFAULTS = {
+    "enabled": False,
+    "grid": [3, 2],
+    "overlap": 0.2,
+    "merge_thres": 0.6,
+    "merge_metric": "ios",
+}
 
-    def __init__(self, hef_path: str | Path, batch_size: int = 1):
-        self._hailo = HailoInfer(str(hef_path), batch_size)
-        self.input_height, self.input_width, _ = self._hailo.get_input_shape()
+logger = logging.getLogger(__name__)
 
-    def infer(self, preprocessed_frame: np.ndarray, timeout_ms: int = 10000):
-        """Run inference on one preprocessed frame and block until the result is ready."""
-        result_box: dict = {}
 
-        def _on_done(completion_info, bindings_list):
-            if completion_info.exception:
-                result_box["error"] = completion_info.exception
-                return
-            bindings = bindings_list[0]
-            if len(bindings._output_names) == 1:
-                result_box["result"] = bindings.output().get_buffer()
-            else:
-                result_box["result"] = {
-                    name: np.expand_dims(bindings.output(name).get_buffer(), axis=0)
-                    for name in bindings._output_names
-                }
-
-        job = self._hailo.run([preprocessed_frame], _on_done)
-        job.wait(timeout_ms)
-
-        if "error" in result_box:
-            raise RuntimeError(f"Hailo inference failed: {result_box['error']}")
-        return result_box.get("result")
+def tiling_for(config_data: dict, camera_id: str | None = None) -> dict:
+    """One camera's tiling settings: its ``cameras`` entry over the shared ones."""
+    params = {**TILING_DEFAULTS, **config_data.get("tiling_params", {})}
+    cameras = params.pop("cameras", None) or {}
+    return {**params, **cameras.get(camera_id, {})} if camera_id is not None else params
 
-    def close(self) -> None:
-        self._hailo.close()
 
+@functools.lru_cache(maxsize=64)
+def tile_regions(width: int, height: int, columns: int, rows: int,
+                 overlap: float) -> tuple[Region, ...]:
+    """A ``columns`` x ``rows`` grid of equal tiles over a ``width`` x ``height`` frame.
 
-def frame_to_model_input(frame_bgr: np.ndarray, width: int, height: int) -> np.ndarray:
-    """Convert a BGR camera frame into the letterboxed RGB tensor the model expects."""
-    frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-    return default_preprocess(frame_rgb, width, height)
+    Neighbouring tiles overlap by ``overlap`` of a tile, so an object smaller
+    than that overlap lies whole inside at least one tile. All tiles share
+    one size, so the letterbox geometry and buffer pool are shared too; a
+    grid whose tiles come out near the model input size runs the model at
+    close to native resolution.
+    """
+    tile_width = min(width, math.ceil(width / (columns - (columns - 1) * overlap)))
+    tile_height = min(height, math.ceil(height / (rows - (rows - 1) * overlap)))
+    xs = np.linspace(0, width - tile_width, columns).round().astype(int).tolist()
+    ys = np.linspace(0, height - tile_height, rows).round().astype(int).tolist()
+    return tuple((x, y, x + tile_width, y + tile_height) for y in ys for x in xs)
 
 
 class ObjectDetector:
     """Detect objects in individual camera frames and draw the results.
 
+    The model runs on the backend named by ``inference_params.backend`` in the
+    config (``"hailo"`` by default, ``"onnx"`` for CPU-only nodes, or
+    ``"simulated"`` for load tests without hardware); its options come from the
+    config section ``<backend>_params``, overridden by ``backend_params``.
+    ``hef_path`` is the deprecated name of ``model_path``.
+
     Usage::
 
         detector = ObjectDetector()          # auto-resolves/downloads the default HEF
@@ -92,28 +124,131 @@ class ObjectDetector:
 
     def __init__(
         self,
-        hef_path: str | Path | None = None,
+        model_path: str | Path | None = None,
         labels_path: str | Path | None = None,
         config_path: str | Path | None = None,
+        backend: str | None = None,
+        backend_params: dict | None = None,
+        hef_path: str | Path | None = None,
     ):
-        if hef_path is None:
-            hef_path = resolve_hef_path(None, APP_NAME, app_type="standalone")
-        if hef_path is None:
-            raise RuntimeError(f"Could not resolve a default HEF model for '{APP_NAME}'.")
-
+        if hef_path is not None:
+            warnings.warn("ObjectDetector(hef_path=...) is deprecated; use model_path",
+                          DeprecationWarning, stacklevel=2)
+            if model_path is not None:
+                raise TypeError("Pass either model_path or hef_path, not both")
+            model_path = hef_path
         self.labels = get_labels(str(labels_path) if labels_path else None)
         self.config_data = load_json_file(str(config_path or DEFAULT_CONFIG_PATH))
-        self.model = HailoModel(hef_path)
+        inference_params = self.config_data.get("inference_params", {})
+        self.max_batch_wait = inference_params.get("max_batch_wait_ms", 0) / 1000
+
+        self.backend = backend or inference_params.get("backend", "hailo")
+        params = {**self.config_data.get(f"{self.backend}_params", {}),
+                  **(backend_params or {})}
+        if model_path is not None:
+            params["model_path"] = model_path
+        params.setdefault("batch_size", inference_params.get("batch_size", 1))
+        self.model: InferenceBackend = create_backend(self.backend, **params)
+        preprocess_params = self.config_data.get("preprocess_params", {})
+        self.letterbox = Letterboxer(self.model.input_width, self.model.input_height,
+                                     preprocess_params.get("interpolation", "linear"))
+        tiling = tiling_for(self.config_data)
+        self.merge_threshold = tiling["merge_thres"]
+        self.merge_metric = tiling["merge_metric"]
+        visualization_params = self.config_data["visualization_params"]
+        self.max_boxes = visualization_params.get("max_boxes_to_draw", 50)
+        # The shared class allow-list and thresholds of ``filter_params``; the
+        # per-camera parts are applied by the server.
+        self.class_thresholds = score_thresholds(
+            filters_for(self.config_data), self.labels,
+            visualization_params.get("score_thres", 0.5))
 
     def detect(self, frame_bgr: np.ndarray) -> np.ndarray:
-        """Run detection on one BGR frame and return it annotated with boxes and labels."""
+        """Run detection on one BGR frame and return it annotated with boxes."""
         detections = self._infer(frame_bgr)
         return draw_detections(detections, frame_bgr.copy(), self.labels)
 
-    def _infer(self, frame_bgr: np.ndarray) -> dict:
-        model_input = frame_to_model_input(frame_bgr, self.model.input_width, self.model.input_height)
-        raw_result = self.model.infer(model_input)
-        return extract_detections(frame_bgr, raw_result, self.config_data)
+    def detect_frame(self, frame: Frame, width: int | None = None) -> np.ndarray:
+        """Annotate a captured :class:`Frame`, drawn at ``width`` px."""
+        return self.annotate(frame, self.infer_frame(frame), width)
+
+    def infer_frame(self, frame: Frame,
+                    regions: list[Region] | None = None) -> Detections:
+        """Run the model on a captured :class:`Frame`, or on ``regions`` of it.
+
+        The detections are in full-resolution frame coordinates, so one result
+        can be drawn at any output width. With ``regions``, the model runs on
+        each crop at the crop's own resolution and the results are merged.
+        """
+        parts = []
+        for region in regions if regions is not None else [None]:
+            model_input = self.model_input(frame, region)
+            try:
+                raw_result = self.model.infer(model_input)
+            finally:
+                self.release_input(model_input)
+            parts.append(self.postprocess(frame, raw_result, region))
+        return self.merge(parts)
+
+    def model_input(self, frame: Frame, region: Region | None = None) -> np.ndarray:
+        """Letterbox ``frame`` into a pooled buffer; see :meth:`release_input`.
+
+        Starts from the smallest downscale of the frame already computed (for
+        a stream, say) that is still at least as wide as the letterbox. A
+        ``region`` is cropped from the full-resolution image.
+        """
+        if region is not None:
+            xmin, ymin, xmax, ymax = region
+            return self.letterbox(frame.image[ymin:ymax, xmin:xmax])
+        geometry = self.letterbox.geometry(frame.width, frame.height)
+        return self.letterbox(frame.level_for(geometry.width))
+
+    def release_input(self, model_input: np.ndarray) -> None:
+        """Return a :meth:`model_input` buffer once the backend has consumed it."""
+        self.letterbox.release(model_input)
+
+    def postprocess(self, frame: Frame, raw_result,
+                    region: Region | None = None) -> Detections:
+        """Turn a raw model result into detections in full-resolution coordinates."""
+        if region is None:
+            return extract_detections(frame.image, raw_result, self.config_data,
+                                      self.class_thresholds)
+        xmin, ymin, xmax, ymax = region
+        crop = frame.image[ymin:ymax, xmin:xmax]
+        return extract_detections(crop, raw_result, self.config_data,
+                                  self.class_thresholds).translated(xmin, ymin)
+
+    def tiles(self, frame: Frame, camera_id: str | None = None) -> list[Region] | None:
+        """The tiles of ``frame`` under ``tiling_params``, or ``None`` for none."""
+        return frame_tiles(frame, tiling_for(self.config_data, camera_id))
+
+    def merge(self, parts: list[Detections]) -> Detections:
+        """Combine the detections of several regions of one frame.
+
+        Where regions overlap, an object is found more than once; a
+        cross-region :func:`non_max_suppression` keeps the best box of each.
+        """
+        if len(parts) < 2:
+            return Detections.concatenate(parts)
+        merged = non_max_suppression(Detections.concatenate(parts),
+                                     self.merge_threshold, self.merge_metric)
+        return merged[:self.max_boxes] if len(merged) > self.max_boxes else merged
+
+    def annotate(self, frame: Frame, detections: Detections,
+                 width: int | None = None) -> np.ndarray:
+        """Draw full-size ``detections`` on a copy of ``frame`` at ``width`` px."""
+        image = frame.scaled(width)
+        detections = detections.scaled(image.shape[1] / frame.width)
+        return draw_detections(detections, image.copy(), self.labels)
+
+    def _infer(self, frame_bgr: np.ndarray) -> Detections:
+        model_input = self.letterbox(frame_bgr)
+        try:
+            raw_result = self.model.infer(model_input)
+        finally:
+            self.letterbox.release(model_input)
+        return extract_detections(frame_bgr, raw_result, self.config_data,
+                                  self.class_thresholds)
 
     def close(self) -> None:
         self.model.close()
@@ -123,3 +258,205 @@ class ObjectDetector:
 
     def __exit__(self, *exc_info) -> None:
         self.close()
+
+
+def frame_tiles(frame: Frame, tiling: dict) -> list[Region] | None:
+    """:func:`tile_regions` for ``frame`` under its camera's :func:`tiling_for`."""
+    if not tiling["enabled"]:
+        return None
+    columns, rows = tiling["grid"]
+    if columns * rows <= 1:
+        return None
+    return list(tile_regions(frame.width, frame.height, int(columns), int(rows),
+                             float(tiling["overlap"])))
+
+
+class DetectionPipeline:
+    """Pipelined, batched, asynchronous detection on top of an :class:`ObjectDetector`.
+
+    ``ObjectDetector.infer_frame`` runs letterboxing, accelerator time and
+    postprocessing strictly in series. Here each stage has its own thread, and
+    up to ``max_jobs`` inference jobs are in flight (as in the CLI pipeline's
+    ``infer``). Frame N+1 is letterboxed and frame N-1 postprocessed while the
+    accelerator works on frame N, so throughput approaches the accelerator's
+    own limit instead of the sum of the three stages.
+
+    Frames from concurrent callers are micro-batched: once a frame arrives,
+    the preprocess stage waits up to ``max_wait`` seconds for more, and sends
+    up to ``batch_size`` of them to the accelerator as one job. Both default
+    to the detector's ``inference_params`` (``batch_size``,
+    ``max_batch_wait_ms``); a lone caller never waits longer than ``max_wait``.
+
+    A frame submitted with ``regions`` becomes one pipeline item per crop, so
+    the crops of a frame share a batch like frames of different cameras do.
+
+    Usage::
+
+        pipeline = DetectionPipeline(ObjectDetector())
+        future = pipeline.submit(frame)      # frame: rpi_surveillance Frame
+        detections = future.result()         # full-resolution coordinates
+        pipeline.close()
+    """
+
+    def __init__(self, detector: ObjectDetector, max_jobs: int = MAX_ASYNC_INFER_JOBS,
+                 batch_size: int | None = None, max_wait: float | None = None):
+        self.detector = detector
+        self.max_jobs = max_jobs
+        self.batch_size = min(batch_size or detector.model.batch_size,
+                              detector.model.batch_size)
+        self.max_wait = detector.max_batch_wait if max_wait is None else max_wait
+        self._preprocess_queue: queue.Queue = queue.Queue()
+        self._postprocess_queue: queue.Queue = queue.Queue()
+        self._pending_jobs: collections.deque = collections.deque()
+        self._threads = [
+            threading.Thread(target=self._preprocess_loop, name="detect-preprocess",
+                             daemon=True),
+            threading.Thread(target=self._postprocess_loop, name="detect-postprocess",
+                             daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def capacity(self) -> int:
+        """Frames the pipeline can usefully hold: every job slot plus the next batch."""
+        return self.batch_size * (self.max_jobs + 1)
+
+    def submit(self, frame: Frame, regions: list[Region] | None = None) -> Future:
+        """Queue a frame, or ``regions`` of it; the future resolves to detections."""
+        if regions is None:
+            future: Future = Future()
+            self._preprocess_queue.put((frame, None, future))
+            return future
+        parts = [Future() for _ in regions]
+        for region, part in zip(regions, parts):
+            self._preprocess_queue.put((frame, region, part))
+        return _gather(parts, self.detector.merge)
+
+    def _prepare(self, item, frames: list, regions: list, futures: list,
+                 model_inputs: list) -> None:
+        frame, region, future = item
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            model_inputs.append(self.detector.model_input(frame, region))
+        except Exception as e:
+            future.set_exception(e)
+            return
+        frames.append(frame)
+        regions.append(region)
+        futures.append(future)
+
+    def _next_batch(self) -> tuple[list, list, list, list, bool]:
+        """Block for a frame, then gather more for up to ``max_wait``.
+
+        Each frame is letterboxed as soon as it arrives, so the window overlaps
+        preprocessing instead of adding to it. Returns the frames, their
+        regions, futures and model inputs, and whether the stop sentinel was seen.
+        """
+        frames, regions, futures, model_inputs = [], [], [], []
+        item = self._preprocess_queue.get()
+        if item is None:
+            return frames, regions, futures, model_inputs, True
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            self._prepare(item, frames, regions, futures, model_inputs)
+            if len(frames) >= self.batch_size:
+                break
+            try:
+                # Take whatever is already queued even once the window has passed.
+                timeout = max(0.0, deadline - time.monotonic())
+                item = self._preprocess_queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                return frames, regions, futures, model_inputs, True
+        return frames, regions, futures, model_inputs, False
+
+    def _preprocess_loop(self) -> None:
+        stopping = False
+        while not stopping:
+            frames, regions, futures, model_inputs, stopping = self._next_batch()
+            if not frames:
+                continue
+            try:
+                # Limit number of concurrent async inferences
+                while len(self._pending_jobs) >= self.max_jobs:
+                    self._pending_jobs.popleft().wait(10000)
+                job = self.detector.model.infer_async(
+                    model_inputs,
+                    partial(self._on_inferred, frames, regions, futures, model_inputs))
+            except Exception as e:
+                self._release(model_inputs)
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            self._pending_jobs.append(job)
+        while self._pending_jobs:
+            self._pending_jobs.popleft().wait(10000)
+        self._postprocess_queue.put(None)
+
+    def _release(self, model_inputs: list[np.ndarray]) -> None:
+        for model_input in model_inputs:
+            self.detector.release_input(model_input)
+
+    def _on_inferred(self, frames: list[Frame], regions: list, futures: list[Future],
+                     model_inputs: list, results: list | None,
+                     error: Exception | None) -> None:
+        """Runs on a backend thread: hand the raw results on without other work."""
+        # The backend has consumed the inputs by now; their buffers can be refilled.
+        self._release(model_inputs)
+        if error is None and len(results) != len(futures):
+            error = f"got {len(results)} results for {len(futures)} frames"
+        if error is not None:
+            for future in futures:
+                future.set_exception(RuntimeError(f"Inference failed: {error}"))
+            return
+        for item in zip(frames, regions, futures, results):
+            self._postprocess_queue.put(item)
+
+    def _postprocess_loop(self) -> None:
+        while True:
+            item = self._postprocess_queue.get()
+            if item is None:
+                break
+            frame, region, future, raw_result = item
+            try:
+                future.set_result(self.detector.postprocess(frame, raw_result, region))
+            except Exception as e:
+                logger.error(f"Detection postprocess failed: {e}")
+                future.set_exception(e)
+
+    def close(self) -> None:
+        """Finish the frames already submitted, then stop the stage threads."""
+        self._preprocess_queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=15)
+
+
+def _gather(parts: list[Future], combine: Callable[[list], Detections]) -> Future:
+    """A future of ``combine`` over the results of ``parts``, or their first error."""
+    future: Future = Future()
+    if not parts:
+        future.set_result(combine([]))
+        return future
+    remaining = [len(parts)]
+    lock = threading.Lock()
+
+    def on_done(_) -> None:
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        errors = [part.exception() for part in parts if part.exception() is not None]
+        if errors:
+            future.set_exception(errors[0])
+            return
+        try:
+            future.set_result(combine([part.result() for part in parts]))
+        except Exception as e:
+            future.set_exception(e)
+
+    for part in parts:
+        part.add_done_callback(on_done)
+    return future
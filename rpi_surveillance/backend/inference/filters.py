@@ -0,0 +1,147 @@
+"""Class allow-lists, per-class score thresholds and exclusion zones.
+
+Configured by ``filter_params`` in the detector config, with a ``cameras``
+entry per camera id overriding the shared settings key by key:
+
+``classes``
+    Class ids or labels to keep; ``null`` keeps every class.
+``class_thresholds``
+    Label (or id) to minimum score, over ``visualization_params.score_thres``.
+``exclusion_zones``
+    Polygons ``[[x, y], ...]`` in frame-relative ``0..1`` coordinates.
+    Detections whose ``zone_anchor`` point (``"bottom"``, the centre of the
+    bottom edge where an object stands, or ``"center"``) lies in a zone are
+    dropped.
+``blank_zones``
+    Also paint the zones out of the frame before inference, so the model
+    cannot see (or spend boxes on) anything in them.
+
+The shared allow-list and thresholds become one per-class threshold table
+that ``extract_detections`` applies while it gathers the raw results, so
+excluded classes are never even concatenated. Each camera's zones are
+rasterised once per frame size into an integer mask, and all boxes of a
+frame are tested against it with a single fancy-indexing lookup.
+"""
+
+import threading
+from collections.abc import Sequence
+
+import cv2
+import numpy as np
+
+from rpi_surveillance.backend.frame import Frame
+from rpi_surveillance.backend.inference.detections import Detections
+from rpi_surveillance.backend.inference.preprocess import PAD_VALUE
+
+FILTER_DEFAULTS = {
+    "classes": None,
+    "class_thresholds": {},
+    "exclusion_zones": [],
+    "zone_anchor": "bottom",
+    "blank_zones": False,
+}
+ZONE_ANCHORS = ("bottom", "center")
+
+
+def filters_for(config_data: dict, camera_id: str | None = None) -> dict:
+    """One camera's filter settings: its ``cameras`` entry over the shared ones."""
+    params = {**FILTER_DEFAULTS, **config_data.get("filter_params", {})}
+    cameras = params.pop("cameras", None) or {}
+    return {**params, **cameras.get(camera_id, {})} if camera_id is not None else params
+
+
+def _class_id(name, labels: Sequence[str]) -> int:
+    if isinstance(name, int) or str(name).isdigit():
+        return int(name)
+    try:
+        return labels.index(name)
+    except ValueError:
+        raise ValueError(f"Unknown class '{name}' in filter_params") from None
+
+
+def score_thresholds(params: dict, labels: Sequence[str], default: float) -> np.ndarray:
+    """``(num_classes,)`` float32 minimum score per class; ``inf`` if not allowed."""
+    thresholds = np.full(len(labels), default, dtype=np.float32)
+    for name, threshold in params["class_thresholds"].items():
+        thresholds[_class_id(name, labels)] = threshold
+    if params["classes"] is not None:
+        allowed = np.zeros(len(labels), dtype=bool)
+        allowed[[_class_id(name, labels) for name in params["classes"]]] = True
+        thresholds[~allowed] = np.inf
+    return thresholds
+
+
+class DetectionFilter:
+    """One camera's :func:`filters_for` settings, applied to frames and detections.
+
+    Args:
+        params: The camera's filter settings.
+        labels: Class names, to resolve the labels used in ``params``.
+        default_threshold: Score threshold of classes without their own.
+    """
+
+    def __init__(self, params: dict, labels: Sequence[str], default_threshold: float):
+        if params["zone_anchor"] not in ZONE_ANCHORS:
+            raise ValueError(
+                f"Unknown zone_anchor '{params['zone_anchor']}'; "
+                f"choose one of {ZONE_ANCHORS}"
+            )
+        self.thresholds = score_thresholds(params, labels, default_threshold)
+        self.default_threshold = default_threshold
+        self.zones = [
+            np.asarray(zone, dtype=np.float64).reshape(-1, 2)
+            for zone in params["exclusion_zones"]
+        ]
+        self.anchor = params["zone_anchor"]
+        self.blank_zones = bool(params["blank_zones"]) and bool(self.zones)
+        # Zones rasterised per frame size: (polygons in pixels, uint8 mask).
+        self._rasters: dict[tuple[int, int], tuple[list[np.ndarray], np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def _raster(self, width: int, height: int) -> tuple[list[np.ndarray], np.ndarray]:
+        raster = self._rasters.get((width, height))
+        if raster is None:
+            with self._lock:
+                raster = self._rasters.get((width, height))
+                if raster is not None:
+                    return raster
+                polygons = [
+                    np.rint(zone * (width - 1, height - 1)).astype(np.int32)
+                    for zone in self.zones
+                ]
+                mask = np.zeros((height, width), dtype=np.uint8)
+                cv2.fillPoly(mask, polygons, 1)
+                raster = self._rasters[(width, height)] = (polygons, mask)
+        return raster
+
+    def zone_mask(self, width: int, height: int) -> np.ndarray:
+        """``(height, width)`` uint8 mask, 1 inside any exclusion zone."""
+        return self._raster(width, height)[1]
+
+    def blank(self, frame: Frame) -> Frame:
+        """A copy of ``frame`` with the zones painted out if ``blank_zones`` is set."""
+        if not self.blank_zones:
+            return frame
+        image = frame.image.copy()
+        cv2.fillPoly(
+            image, self._raster(frame.width, frame.height)[0], (PAD_VALUE,) * 3
+        )
+        return Frame(frame.seq, image, frame.timestamp)
+
+    def apply(self, detections: Detections, width: int, height: int) -> Detections:
+        """Drop the detections below their class threshold or anchored in a zone."""
+        if not len(detections):
+            return detections
+        classes = detections.classes
+        thresholds = self.thresholds[np.minimum(classes, len(self.thresholds) - 1)]
+        thresholds[classes >= len(self.thresholds)] = self.default_threshold
+        keep = detections.scores >= thresholds
+        if self.zones:
+            boxes = detections.boxes
+            xs = np.clip((boxes[:, 0] + boxes[:, 2]) // 2, 0, width - 1)
+            if self.anchor == "bottom":
+                ys = np.clip(boxes[:, 3] - 1, 0, height - 1)
+            else:
+                ys = np.clip((boxes[:, 1] + boxes[:, 3]) // 2, 0, height - 1)
+            keep &= self.zone_mask(width, height)[ys, xs] == 0
+        return detections if keep.all() else detections[keep]
@@ -2,33 +2,134 @@ import cv2
 import numpy as np
 try:
     from hailo_apps.python.core.common.toolbox import id_to_color
-except ImportError:
-    from pathlib import Path
-    import sys
-
-    core_dir = Path(__file__).resolve().parents[2] / "core"
-    sys.path.insert(0, str(core_dir))
-    from common.toolbox import id_to_color
+except ImportError:  # CPU-only nodes run without the Hailo SDK
+    from rpi_surveillance.backend.inference.common.fallback import id_to_color
 
 import os
-from collections import deque
+import threading
+import weakref
+from collections import OrderedDict
 from typing import NamedTuple
 
+from rpi_surveillance.backend.inference.detections import Detections
+
 # ── Annotation style ────────────────────────────────────────────────────────
 FONT = cv2.FONT_HERSHEY_DUPLEX
 CHIP_ALPHA = 0.85
 HALO_COLOR = (0, 0, 0)
 # Tracks the tracker kept alive without a matching detection this frame.
 UNMATCHED_TRACK_COLOR = (180, 180, 180)
+# Class colours precomputed; ids beyond extend the table.
+COLOR_LUT_SIZE = 256
+# Rendered label chips kept per renderer.
+CHIP_CACHE_SIZE = 1024
+# Output resolutions with a cached renderer.
+MAX_RENDERERS = 16
 
-# Dictionary to store a limited history of tracklet coordinates.
-# The keys will be the track IDs.
-tracklet_history = {}
 # Maximum number of past frames to display
-trail_length = 30 
+trail_length = 30
+# Tracks a tracker's trail store holds at once; the least recently seen goes first.
+MAX_TRACKLETS = 256
 # Only draw trail for certain classes (e.g., person=0, phone=67 in COCO)
 TRACKLET_CLASSES = [0, 67]  # PERSON, SMARTPHONE
 
+
+class TrackletStore:
+    """Recent centroids of a tracker's live tracks, for drawing trails.
+
+    Trails live in one preallocated ``(max_tracks, trail_length, 2)`` ring
+    array, so memory is fixed however many tracks come and go. Tracks the
+    tracker has dropped are evicted through :meth:`retain`; if more than
+    ``max_tracks`` are live at once, the least recently updated one is reused.
+    """
+
+    def __init__(self, max_tracks: int = MAX_TRACKLETS,
+                 trail_length: int = trail_length):
+        self.max_tracks = max_tracks
+        self.trail_length = trail_length
+        self._points = np.zeros((max_tracks, trail_length, 2), dtype=np.int32)
+        self._count = np.zeros(max_tracks, dtype=np.int32)
+        self._head = np.zeros(max_tracks, dtype=np.int32)
+        self._last_seen = np.zeros(max_tracks, dtype=np.int64)
+        self._rows: dict[int, int] = {}
+        self._owners: list[int | None] = [None] * max_tracks
+        self._free = list(range(max_tracks - 1, -1, -1))
+        self._tick = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, track_id: int) -> bool:
+        return track_id in self._rows
+
+    def append(self, track_id: int, point: tuple[int, int]) -> None:
+        """Add the newest centroid of ``track_id``."""
+        self._tick += 1
+        row = self._rows.get(track_id)
+        if row is None:
+            row = self._allocate(track_id)
+        self._points[row, self._head[row]] = point
+        self._head[row] = (self._head[row] + 1) % self.trail_length
+        self._count[row] = min(self._count[row] + 1, self.trail_length)
+        self._last_seen[row] = self._tick
+
+    def trail(self, track_id: int) -> np.ndarray:
+        """The stored centroids of ``track_id``, oldest first, as ``(N, 2)``."""
+        row = self._rows.get(track_id)
+        if row is None:
+            return self._points[0, :0]
+        count, head = self._count[row], self._head[row]
+        if count < self.trail_length:
+            return self._points[row, :count]
+        return np.concatenate((self._points[row, head:], self._points[row, :head]))
+
+    def retain(self, track_ids) -> None:
+        """Evict every track not in ``track_ids``, i.e. those the tracker dropped."""
+        live = set(track_ids)
+        for track_id in [track_id for track_id in self._rows if track_id not in live]:
+            self._release(track_id)
+
+    def clear(self) -> None:
+        for track_id in list(self._rows):
+            self._release(track_id)
+
+    def _allocate(self, track_id: int) -> int:
+        if not self._free:
+            # Every row is live: reuse the one updated longest ago.
+            self._release(self._owners[int(np.argmin(self._last_seen))])
+        row = self._free.pop()
+        self._count[row] = self._head[row] = 0
+        self._rows[track_id] = row
+        self._owners[row] = track_id
+        return row
+
+    def _release(self, track_id: int) -> None:
+        row = self._rows.pop(track_id)
+        self._owners[row] = None
+        self._free.append(row)
+
+
+_tracklet_stores: "weakref.WeakKeyDictionary[object, TrackletStore]" = (
+    weakref.WeakKeyDictionary())
+
+
+def tracklets_for(tracker) -> TrackletStore:
+    """The :class:`TrackletStore` of ``tracker``, created on first use."""
+    store = _tracklet_stores.get(tracker)
+    if store is None:
+        store = _tracklet_stores[tracker] = TrackletStore()
+    return store
+
+
+def _live_track_ids(tracker, online_targets) -> set:
+    """Ids the tracker still keeps, including lost tracks it may yet re-find."""
+    tracked = getattr(tracker, "tracked_stracks", None)
+    lost = getattr(tracker, "lost_stracks", None)
+    if tracked is None or lost is None:
+        return {track.track_id for track in online_targets}
+    return {track.track_id for track in (*tracked, *lost)}
+
+
 def inference_result_handler(original_frame, infer_results, labels, config_data, tracker=None, draw_trail=False):
     """
     Processes inference results and draw detections (with optional tracking).
@@ -43,7 +144,7 @@ def inference_result_handler(original_frame, infer_results, labels, config_data,
     Returns:
         np.ndarray: Frame with detections or tracks drawn.
     """
-    detections = extract_detections(original_frame, infer_results, config_data)  # Should return dict with boxes, classes, scores
+    detections = extract_detections(original_frame, infer_results, config_data)
     frame_with_detections = draw_detections(detections, original_frame, labels, tracker=tracker, draw_trail=draw_trail)
     return frame_with_detections
 
@@ -55,9 +156,9 @@ class _Style(NamedTuple):
     pad: int
 
 
-def _style_for(image: np.ndarray) -> _Style:
+def _style_for(height: int) -> _Style:
     """Derive drawing metrics so annotations look alike at any resolution."""
-    factor = min(2.0, max(0.65, image.shape[0] / 720.0))
+    factor = min(2.0, max(0.65, height / 720.0))
     return _Style(thickness=max(1, round(2 * factor)),
                   font_scale=0.55 * factor,
                   pad=max(3, round(6 * factor)))
@@ -69,17 +170,6 @@ def _readable_text_color(background: tuple) -> tuple:
     return (0, 0, 0) if 0.114 * blue + 0.587 * green + 0.299 * red > 150 else (255, 255, 255)
 
 
-def _blend_rect(image: np.ndarray, pt1: tuple, pt2: tuple, color: tuple, alpha: float) -> None:
-    """Alpha-blend a solid rectangle onto the image, clipped to its bounds."""
-    height, width = image.shape[:2]
-    x1, x2 = sorted((max(0, min(pt1[0], width)), max(0, min(pt2[0], width))))
-    y1, y2 = sorted((max(0, min(pt1[1], height)), max(0, min(pt2[1], height))))
-    if x2 <= x1 or y2 <= y1:
-        return
-    roi = image[y1:y2, x1:x2]
-    cv2.addWeighted(np.full_like(roi, color), alpha, roi, 1 - alpha, 0, dst=roi)
-
-
 def _draw_corner_brackets(image: np.ndarray, box: tuple, color: tuple, thickness: int) -> None:
     """Draw L-shaped corners over the box, each backed by a dark halo.
 
@@ -94,41 +184,232 @@ def _draw_corner_brackets(image: np.ndarray, box: tuple, color: tuple, thickness
                 cv2.line(image, (x, y), (x, y + step_y * length), stroke_color, stroke, cv2.LINE_AA)
 
 
-def _chip_size(text: str, style: _Style, font_scale: float | None = None) -> tuple[int, int]:
-    """Return the (width, height) a label chip needs to hold *text*."""
-    (text_w, text_h), baseline = cv2.getTextSize(text, FONT, font_scale or style.font_scale, 1)
-    return text_w + 2 * style.pad, text_h + baseline + 2 * style.pad
+_class_colors: list[tuple] | None = None
 
 
-def _draw_chip(image: np.ndarray, text: str, top_left: tuple, bg_color: tuple, style: _Style,
-               fg_color: tuple | None = None, alpha: float = CHIP_ALPHA,
-               font_scale: float | None = None) -> tuple[int, int, int, int]:
-    """Draw a filled label chip, nudged to stay inside the frame.
+def class_color(class_id: int) -> tuple:
+    """BGR colour of a class, as ``id_to_color`` picks it, from a lookup table.
 
-    Returns:
-        tuple: The chip rectangle as (x1, y1, x2, y2).
+    ``id_to_color`` reseeds NumPy's global generator on every call, so the
+    table is filled once and the global generator's state is restored.
+    """
+    global _class_colors
+    if _class_colors is None or class_id >= len(_class_colors):
+        state = np.random.get_state()
+        try:
+            size = max(COLOR_LUT_SIZE, class_id + 1)
+            _class_colors = [tuple(int(c) for c in id_to_color(i)[:3])
+                             for i in range(size)]
+        finally:
+            np.random.set_state(state)
+    return _class_colors[class_id]
+
+
+class _Chip(NamedTuple):
+    """A pre-rendered label chip.
+
+    Composited as ``image * transmittance / 255 + premultiplied``.
+    """
+    premultiplied: np.ndarray  # (h, w, 3) uint8
+    transmittance: np.ndarray  # (h, w, 3) uint8, 255 where the image shows through
+    text_end: int = 0  # x where the chip's text ends
+
+    @property
+    def size(self) -> tuple[int, int]:
+        height, width = self.transmittance.shape[:2]
+        return width, height
+
+
+class AnnotationRenderer:
+    """Draws detections onto images of one resolution.
+
+    The drawing style depends only on the resolution, so it is computed once.
+    Label chips -- the translucent class tag with room for the score and its
+    confidence meter, and the tracking badge -- are rendered once per (text,
+    scale, colours) into a small LRU cache and then alpha-composited into place
+    through a reusable per-thread scratch buffer, instead of being blended and
+    text-rendered again for every box. The score goes on top as its own cached
+    text chip, so class chips do not multiply with the scores. Use
+    :func:`get_renderer` to share one per resolution.
     """
-    scale = font_scale or style.font_scale
-    chip_w, chip_h = _chip_size(text, style, scale)
-    height, width = image.shape[:2]
-    x1 = max(0, min(top_left[0], width - chip_w))
-    y1 = max(0, min(top_left[1], height - chip_h))
-    x2, y2 = x1 + chip_w, y1 + chip_h
-
-    _blend_rect(image, (x1, y1), (x2, y2), bg_color, alpha)
-    (_, text_h), _ = cv2.getTextSize(text, FONT, scale, 1)
-    cv2.putText(image, text, (x1 + style.pad, y1 + style.pad + text_h), FONT, scale,
-                fg_color or _readable_text_color(bg_color), 1, cv2.LINE_AA)
-    return x1, y1, x2, y2
-
 
-def _draw_confidence_meter(image: np.ndarray, chip: tuple, score: float, style: _Style) -> None:
-    """Fill the bottom edge of a chip proportionally to the detection score."""
-    x1, _, x2, y2 = chip
-    bar_h = max(3, style.thickness + 1)
-    filled = int((x2 - x1) * min(max(score, 0.0), 100.0) / 100.0)
-    _blend_rect(image, (x1, y2 - bar_h), (x2, y2), HALO_COLOR, 0.75)
-    _blend_rect(image, (x1, y2 - bar_h), (x1 + filled, y2), (255, 255, 255), 1.0)
+    def __init__(self, width: int, height: int, chip_cache_size: int = CHIP_CACHE_SIZE):
+        self.width = width
+        self.height = height
+        self.style = _style_for(height)
+        self.chip_cache_size = chip_cache_size
+        self._chips: OrderedDict[tuple, _Chip] = OrderedDict()
+        # Score text "0%" .. "100%" per text colour, see _score_text.
+        self._score_texts: dict[tuple[int, tuple], _Chip] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def draw_detection(self, image: np.ndarray, box: list, labels: list | str,
+                       score: float, color: tuple, track: bool = False) -> None:
+        """Draw one detection; see :func:`draw_detection`."""
+        if isinstance(labels, str):
+            labels = [labels]
+
+        height, width = image.shape[:2]
+        xmin, ymin, xmax, ymax = (int(coord) for coord in box)
+        xmin, xmax = max(0, min(xmin, width - 1)), max(0, min(xmax, width - 1))
+        ymin, ymax = max(0, min(ymin, height - 1)), max(0, min(ymax, height - 1))
+        if xmax - xmin < 2 or ymax - ymin < 2:
+            return
+
+        style = self.style
+        color = tuple(int(channel) for channel in color[:3])
+
+        corners = (xmin, ymin, xmax, ymax)
+        cv2.rectangle(image, (xmin, ymin), (xmax, ymax), HALO_COLOR,
+                      style.thickness + 1, cv2.LINE_AA)
+        cv2.rectangle(image, (xmin, ymin), (xmax, ymax), color,
+                      max(1, style.thickness - 1), cv2.LINE_AA)
+        _draw_corner_brackets(image, corners, color, style.thickness + 1)
+
+        # Without a matching detection the tracker only knows the ID, so the single
+        # label is the tracking tag rather than a class name.
+        if track and len(labels) == 1:
+            class_name, track_tag = None, labels[0]
+        else:
+            class_name = labels[0] if labels else None
+            track_tag = labels[1] if len(labels) > 1 else None
+
+        # "Over" is associative, so the score and its meter are drawn over the
+        # composited class chip, and one class chip serves every score.
+        percent = min(max(round(score), 0), 100)
+        text_color = _readable_text_color(color)
+        # Digits are equally wide, so reserving as many keeps the chip exactly as
+        # wide as the text it shows.
+        chip = self._chip(f"{class_name}  " if class_name else "", color, text_color,
+                          CHIP_ALPHA, style.font_scale, meter=True,
+                          reserve="8" * len(str(percent)) + "%")
+        chip_w, chip_h = chip.size
+        chip_y = ymin - chip_h if ymin - chip_h >= 0 else ymin
+        chip_x, chip_y = self._composite(image, chip, xmin, chip_y)
+        self._composite(image, self._score_text(percent, text_color),
+                        chip_x + chip.text_end, chip_y)
+        filled = int(chip_w * percent / 100)
+        image[chip_y + chip_h - self._meter_height():chip_y + chip_h,
+              chip_x:chip_x + filled] = 255
+
+        if track_tag:
+            badge = self._chip(track_tag, HALO_COLOR, color, 0.7,
+                               style.font_scale * 0.9)
+            badge_w, badge_h = badge.size
+            self._composite(image, badge, xmax - badge_w, ymax - badge_h)
+
+    def _score_text(self, percent: int, color: tuple) -> _Chip:
+        """``percent`` as a transparent chip, positioned like the end of a title."""
+        key = (percent, color)
+        chip = self._score_texts.get(key)
+        if chip is None:
+            text, pad, font_scale = f"{percent}%", self.style.pad, self.style.font_scale
+            (text_w, text_h), baseline = cv2.getTextSize(text, FONT, font_scale, 1)
+            coverage = np.zeros((pad + text_h + baseline, text_w), dtype=np.uint8)
+            cv2.putText(coverage, text, (0, pad + text_h), FONT, font_scale, 255, 1,
+                        cv2.LINE_AA)
+            coverage = np.repeat(coverage[..., None], 3, axis=2)
+            premultiplied = cv2.multiply(coverage, (*color, 0), scale=1 / 255)
+            chip = self._score_texts[key] = _Chip(premultiplied, 255 - coverage)
+        return chip
+
+    def _meter_height(self) -> int:
+        return max(3, self.style.thickness + 1)
+
+    def _chip(self, text: str, bg_color: tuple, fg_color: tuple, alpha: float,
+              font_scale: float, meter: bool = False, reserve: str = "") -> _Chip:
+        key = (text, font_scale, bg_color, fg_color, alpha, meter, reserve)
+        with self._lock:
+            chip = self._chips.get(key)
+            if chip is not None:
+                self._chips.move_to_end(key)
+                return chip
+        chip = self._render_chip(text, bg_color, fg_color, alpha, font_scale, meter,
+                                 reserve)
+        with self._lock:
+            self._chips[key] = chip
+            if len(self._chips) > self.chip_cache_size:
+                self._chips.popitem(last=False)
+        return chip
+
+    def _render_chip(self, text: str, bg_color: tuple, fg_color: tuple, alpha: float,
+                     font_scale: float, meter: bool, reserve: str) -> _Chip:
+        """Render a chip as the layers it is made of, each blended "over" the last.
+
+        The chip leaves room for ``reserve`` after ``text``; a ``meter`` is only
+        the empty track, :meth:`draw_detection` fills it.
+        """
+        pad = self.style.pad
+        (reserve_w, _), _ = cv2.getTextSize(reserve, FONT, font_scale, 1)
+        (full_w, text_h), baseline = cv2.getTextSize(text + reserve, FONT,
+                                                     font_scale, 1)
+        chip_w, chip_h = full_w + 2 * pad, text_h + baseline + 2 * pad
+        premultiplied = np.zeros((chip_h, chip_w, 3), dtype=np.float32)
+        transmittance = np.ones((chip_h, chip_w, 1), dtype=np.float32)
+
+        def over(rows: slice, cols: slice, color: tuple, coverage) -> None:
+            premultiplied[rows, cols] *= 1 - coverage
+            premultiplied[rows, cols] += np.float32(color) * coverage
+            transmittance[rows, cols] *= 1 - coverage
+
+        everything = slice(None)
+        over(everything, everything, bg_color, alpha)
+        text_mask = np.zeros((chip_h, chip_w), dtype=np.uint8)
+        cv2.putText(text_mask, text, (pad, pad + text_h), FONT, font_scale, 255, 1,
+                    cv2.LINE_AA)
+        over(everything, everything, fg_color, text_mask[..., None] / np.float32(255))
+        if meter:
+            # The bottom edge doubles as a confidence meter.
+            bar = slice(chip_h - self._meter_height(), None)
+            over(bar, everything, HALO_COLOR, 0.75)
+        transmittance = np.repeat(transmittance, 3, axis=2) * 255
+        return _Chip(np.rint(premultiplied).clip(0, 255).astype(np.uint8),
+                     np.rint(transmittance).astype(np.uint8), pad + full_w - reserve_w)
+
+    def _composite(self, image: np.ndarray, chip: _Chip, x: int,
+                   y: int) -> tuple[int, int]:
+        """Blend ``chip`` onto ``image`` at about (x, y), nudged inside the frame.
+
+        Returns where the chip went.
+        """
+        height, width = image.shape[:2]
+        chip_w, chip_h = chip.size
+        x = max(0, min(x, width - chip_w))
+        y = max(0, min(y, height - chip_h))
+        roi = image[y:y + chip_h, x:x + chip_w]
+        roi_h, roi_w = roi.shape[:2]
+        if not roi_h or not roi_w:
+            return x, y
+        scratch = getattr(self._local, "scratch", None)
+        if scratch is None or scratch.shape[0] < roi_h or scratch.shape[1] < roi_w:
+            scratch_h = max(roi_h, 0 if scratch is None else scratch.shape[0])
+            scratch_w = max(roi_w, 0 if scratch is None else scratch.shape[1])
+            scratch = np.empty((scratch_h, scratch_w, 3), dtype=np.uint8)
+            self._local.scratch = scratch
+        shown = scratch[:roi_h, :roi_w]
+        cv2.multiply(roi, chip.transmittance[:roi_h, :roi_w], dst=shown, scale=1 / 255)
+        cv2.add(shown, chip.premultiplied[:roi_h, :roi_w], dst=roi)
+        return x, y
+
+
+_renderers: dict[tuple[int, int], AnnotationRenderer] = {}
+_renderers_lock = threading.Lock()
+
+
+def get_renderer(width: int, height: int) -> AnnotationRenderer:
+    """The shared :class:`AnnotationRenderer` for ``width`` x ``height`` images."""
+    key = (width, height)
+    renderer = _renderers.get(key)
+    if renderer is None:
+        with _renderers_lock:
+            renderer = _renderers.get(key)
+            if renderer is None:
+                # Stream widths come from clients; keep only the recent ones.
+                if len(_renderers) >= MAX_RENDERERS:
+                    _renderers.pop(next(iter(_renderers)))
+                renderer = _renderers[key] = AnnotationRenderer(width, height)
+    return renderer
 
 
 def draw_detection(image: np.ndarray, box: list, labels: list | str, score: float,
@@ -149,171 +430,146 @@ def draw_detection(image: np.ndarray, box: list, labels: list | str, score: floa
         color (tuple): Color for the bounding box.
         track (bool): Whether to include tracking info.
     """
-    if isinstance(labels, str):
-        labels = [labels]
-
-    height, width = image.shape[:2]
-    xmin, ymin, xmax, ymax = (int(coord) for coord in box)
-    xmin, xmax = max(0, min(xmin, width - 1)), max(0, min(xmax, width - 1))
-    ymin, ymax = max(0, min(ymin, height - 1)), max(0, min(ymax, height - 1))
-    if xmax - xmin < 2 or ymax - ymin < 2:
-        return
-
-    style = _style_for(image)
-    color = tuple(int(channel) for channel in color[:3])
-
-    cv2.rectangle(image, (xmin, ymin), (xmax, ymax), HALO_COLOR, style.thickness + 1, cv2.LINE_AA)
-    cv2.rectangle(image, (xmin, ymin), (xmax, ymax), color, max(1, style.thickness - 1), cv2.LINE_AA)
-    _draw_corner_brackets(image, (xmin, ymin, xmax, ymax), color, style.thickness + 1)
-
-    # Without a matching detection the tracker only knows the ID, so the single
-    # label is the tracking tag rather than a class name.
-    if track and len(labels) == 1:
-        class_name, track_tag = None, labels[0]
-    else:
-        class_name = labels[0] if labels else None
-        track_tag = labels[1] if len(labels) > 1 else None
-
-    title = f"{class_name}  {score:.0f}%" if class_name else f"{score:.0f}%"
-    _, chip_h = _chip_size(title, style)
-    chip_y = ymin - chip_h if ymin - chip_h >= 0 else ymin
-    chip = _draw_chip(image, title, (xmin, chip_y), color, style)
-    _draw_confidence_meter(image, chip, score, style)
+    renderer = get_renderer(image.shape[1], image.shape[0])
+    renderer.draw_detection(image, box, labels, score, color, track)
 
-    if track_tag:
-        badge_scale = style.font_scale * 0.9
-        badge_w, badge_h = _chip_size(track_tag, style, badge_scale)
-        _draw_chip(image, track_tag, (xmax - badge_w, ymax - badge_h), HALO_COLOR, style,
-                   fg_color=color, alpha=0.7, font_scale=badge_scale)
 
-
-def denormalize_and_rm_pad(box: list, size: int, padding_length: int, input_height: int, input_width: int) -> list:
+def denormalize_and_rm_pad(boxes: np.ndarray, size: int, padding_length: int,
+                           input_height: int, input_width: int) -> np.ndarray:
     """
     Denormalize bounding box coordinates and remove padding.
 
     Args:
-        box (list): Normalized bounding box coordinates.
+        boxes (np.ndarray): (N, 4) or (4,) normalized ``[ymin, xmin, ymax, xmax]``.
         size (int): Size to scale the coordinates.
         padding_length (int): Length of padding to remove.
         input_height (int): Height of the input image.
         input_width (int): Width of the input image.
 
     Returns:
-        list: Denormalized bounding box coordinates with padding removed.
+        np.ndarray: Integer ``[xmin, ymin, xmax, ymax]`` boxes with padding removed.
     """
-    # Scale box coordinates
-    box = [int(x * size) for x in box]
-
-    # Apply padding correction
-    for i in range(4):
-        if i % 2 == 0:  # x-coordinates
-            if input_height != size:
-                box[i] -= padding_length
-        else:  # y-coordinates
-            if input_width != size:
-                box[i] -= padding_length
-
-    # Swap to [ymin, xmin, ymax, xmax]
-    return [box[1], box[0], box[3], box[2]]
-
-
-def extract_detections(image: np.ndarray, detections: list, config_data) -> dict:
+    boxes = np.asarray(boxes, dtype=np.float32)
+    # The letterbox pads the short side, so only that axis has an offset.
+    y_pad = padding_length if input_height != size else 0
+    x_pad = padding_length if input_width != size else 0
+    # Truncate like int() before removing the offset, then swap to x-first.
+    pixels = (boxes[..., [1, 0, 3, 2]] * size).astype(np.int32)
+    pixels -= np.array([x_pad, y_pad, x_pad, y_pad], dtype=np.int32)
+    return pixels
+
+
+def extract_detections(image: np.ndarray, detections: list, config_data,
+                       class_thresholds: np.ndarray | None = None) -> Detections:
     """
     Extract detections from the input data.
 
+    The per-class results are stacked into one array, so thresholding, top-k
+    selection and denormalisation each run as a single NumPy operation.
+
     Args:
         image (np.ndarray): Image to draw on.
         detections (list): Raw detections from the model.
         config_data (Dict): Loaded JSON config containing post-processing metadata.
+        class_thresholds (np.ndarray, optional): Minimum score per class id
+            (``inf`` drops the class before it is even stacked), in place of
+            the single ``score_thres``; classes past its end use ``score_thres``.
 
     Returns:
-        dict: Filtered detection results containing 'detection_boxes', 'detection_classes', 'detection_scores', and 'num_detections'.
+        Detections: Filtered detection results, highest score first, in pixels.
     """
 
     visualization_params = config_data["visualization_params"]
     score_threshold = visualization_params.get("score_thres", 0.5)
     max_boxes = visualization_params.get("max_boxes_to_draw", 50)
 
+    counts = [len(detection) for detection in detections]
+    limits = None
+    if class_thresholds is not None:
+        limits = np.full(len(counts), score_threshold, dtype=np.float32)
+        known = min(len(counts), len(class_thresholds))
+        limits[:known] = class_thresholds[:known]
+        counts = [count if limit != np.inf else 0
+                  for count, limit in zip(counts, limits.tolist())]
+    if not any(counts) or max_boxes <= 0:
+        return Detections.empty()
+
+    rows = np.concatenate(
+        [detection for detection, count in zip(detections, counts) if count])
+    rows = rows.reshape(-1, 5).astype(np.float32, copy=False)
+    class_ids = np.repeat(np.arange(len(counts), dtype=np.int32), counts)
+
+    keep = rows[:, 4] >= (score_threshold if limits is None else limits[class_ids])
+    rows, class_ids = rows[keep], class_ids[keep]
+    if len(rows) > max_boxes:
+        top = np.argpartition(-rows[:, 4], max_boxes - 1)[:max_boxes]
+        rows, class_ids = rows[top], class_ids[top]
+    # Stable, so equal scores keep the model's class order.
+    order = np.argsort(-rows[:, 4], kind="stable")
+    rows, class_ids = rows[order], class_ids[order]
+
     img_height, img_width = image.shape[:2]
     size = max(img_height, img_width)
     padding_length = int(abs(img_height - img_width) / 2)
 
-    all_detections = []
-
-    for class_id, detection in enumerate(detections):
-        for det in detection:
-            bbox, score = det[:4], det[4]
-            if score >= score_threshold:
-                denorm_bbox = denormalize_and_rm_pad(bbox, size, padding_length, img_height, img_width)
-                all_detections.append((score, class_id, denorm_bbox))
-
-    # Sort all detections by score descending
-    all_detections.sort(reverse=True, key=lambda x: x[0])
-
-    # Take top max_boxes
-    top_detections = all_detections[:max_boxes]
+    boxes = denormalize_and_rm_pad(rows[:, :4], size, padding_length, img_height,
+                                   img_width)
+    return Detections(boxes, class_ids, rows[:, 4])
 
-    scores, class_ids, boxes = zip(*top_detections) if top_detections else ([], [], [])
 
-    return {
-        'detection_boxes': list(boxes),
-        'detection_classes': list(class_ids),
-        'detection_scores': list(scores),
-        'num_detections': len(top_detections)
-    }
-
-
-def draw_detections(detections: dict, img_out: np.ndarray, labels, tracker=None, draw_trail=False) -> np.ndarray:
+def draw_detections(detections: Detections, img_out: np.ndarray, labels, tracker=None,
+                    draw_trail=False,
+                    tracklets: TrackletStore | None = None) -> np.ndarray:
     """
     Draw detections or tracking results on the image.
 
     Args:
-        detections (dict): Raw detection outputs.
+        detections (Detections): ``extract_detections`` output, in ``img_out`` pixels.
         img_out (np.ndarray): Image to draw on.
         labels (list): List of class labels.
         enable_tracking (bool): Whether to use tracker output (ByteTrack).
         tracker (BYTETracker, optional): ByteTrack tracker instance.
+        tracklets (TrackletStore, optional): Trail store; defaults to the tracker's.
 
     Returns:
         np.ndarray: Annotated image.
     """
 
-    # Extract detection data from the dictionary
-    boxes = detections["detection_boxes"]  # List of [xmin,ymin,xmaxm, ymax] boxes
-    scores = detections["detection_scores"]  # List of detection confidences
-    num_detections = detections["num_detections"]  # Total number of valid detections
-    classes = detections["detection_classes"]  # List of class indices per detection
+    boxes = detections.boxes
+    classes = detections.classes.tolist()
+    renderer = get_renderer(img_out.shape[1], img_out.shape[0])
 
     if tracker:
-        dets_for_tracker = []
-
-        # Convert detection format to [xmin,ymin,xmaxm ymax,score] for tracker
-        for idx in range(num_detections):
-            box = boxes[idx]  # [x, y, w, h]
-            score = scores[idx]
-            dets_for_tracker.append([*box, score])
-
         # Skip tracking if no detections passed
-        if not dets_for_tracker:
+        if not len(detections):
             return img_out
 
-        # Run BYTETracker and get active tracks
-        online_targets = tracker.update(np.array(dets_for_tracker))
+        # Run BYTETracker on [xmin, ymin, xmax, ymax, score] rows and get active tracks
+        online_targets = tracker.update(detections.tracker_input())
+        if tracklets is None:
+            tracklets = tracklets_for(tracker)
+        tracklets.retain(_live_track_ids(tracker, online_targets))
+
+        # Pair every track with its best-overlapping detection in one pass
+        track_boxes = np.array([track.tlbr for track in online_targets],
+                               dtype=np.float64)
+        matches = match_tracks_to_detections(track_boxes, boxes).tolist()
 
         # Draw tracked bounding boxes with ID labels
-        for track in online_targets:
+        for track, best_idx in zip(online_targets, matches):
             track_id = track.track_id  # Unique tracker ID
             x1, y1, x2, y2 = track.tlbr  # Bounding box (top-left, bottom-right)
             xmin, ymin, xmax, ymax = map(int, [x1, y1, x2, y2])
-            best_idx = find_best_matching_detection_index(track.tlbr, boxes)
-            if best_idx is None:
-                draw_detection(img_out, [xmin, ymin, xmax, ymax], f"ID {track_id}",
-                               track.score * 100.0, UNMATCHED_TRACK_COLOR, track=True)
+            if best_idx < 0:
+                renderer.draw_detection(img_out, [xmin, ymin, xmax, ymax],
+                                        f"ID {track_id}", track.score * 100.0,
+                                        UNMATCHED_TRACK_COLOR, track=True)
                 continue
 
-            color = tuple(id_to_color(classes[best_idx]).tolist())  # Color based on class
-            draw_detection(img_out, [xmin, ymin, xmax, ymax], [labels[classes[best_idx]], f"ID {track_id}"],
-                           track.score * 100.0, color, track=True)
+            color = class_color(classes[best_idx])  # Color based on class
+            renderer.draw_detection(img_out, [xmin, ymin, xmax, ymax],
+                                    [labels[classes[best_idx]], f"ID {track_id}"],
+                                    track.score * 100.0, color, track=True)
 
             if not classes[best_idx] in TRACKLET_CLASSES:
                 continue
@@ -322,17 +578,16 @@ def draw_detections(detections: dict, img_out: np.ndarray, labels, tracker=None,
             center_x = int((x1 + x2) / 2)
             center_y = int((y1 + y2) / 2)
             centroid = (center_x, center_y)
-            
-            # Initialize or update the tracklet history
-            if track_id not in tracklet_history:
-                tracklet_history[track_id] = deque(maxlen=trail_length)
-            tracklet_history[track_id].append(centroid)
+
+            # Update the tracklet history
+            tracklets.append(track_id, centroid)
 
             if draw_trail:
-                for i in range(1, len(tracklet_history[track_id])):
+                trail = tracklets.trail(track_id).tolist()
+                for i in range(1, len(trail)):
                     # Get the center point for the current and previous frames
-                    point_a = tracklet_history[track_id][i-1]
-                    point_b = tracklet_history[track_id][i]
+                    point_a = trail[i-1]
+                    point_b = trail[i]
 
                     # Draw a line between the points and draw the points as circles
                     cv2.line(img_out, point_a, point_b, color, 3) #(255, 0, 0), 2)
@@ -341,14 +596,117 @@ def draw_detections(detections: dict, img_out: np.ndarray, labels, tracker=None,
 
 
     else:
-        # No tracking — draw raw model detections
-        for idx in range(num_detections):
-            color = tuple(id_to_color(classes[idx]).tolist())  # Color based on class
-            draw_detection(img_out, boxes[idx], [labels[classes[idx]]], scores[idx] * 100.0, color)
+        # No tracker here: draw the detections, with IDs if tracked upstream
+        track_ids = (detections.track_ids.tolist()
+                     if detections.track_ids is not None else None)
+        for idx, (box, class_id, score) in enumerate(zip(boxes.tolist(), classes,
+                                                         detections.scores.tolist())):
+            color = class_color(class_id)  # Color based on class
+            if track_ids is None:
+                renderer.draw_detection(img_out, box, [labels[class_id]],
+                                        score * 100.0, color)
+            else:
+                renderer.draw_detection(img_out, box,
+                                        [labels[class_id], f"ID {track_ids[idx]}"],
+                                        score * 100.0, color, track=True)
 
     return img_out
 
 
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    Compute the IoU of every box in ``boxes_a`` with every box in ``boxes_b``.
+
+    Uses the same formula as ``compute_iou``, broadcast over all pairs at once.
+
+    Args:
+        boxes_a (np.ndarray): (A, 4) boxes in [x_min, y_min, x_max, y_max] format.
+        boxes_b (np.ndarray): (B, 4) boxes in [x_min, y_min, x_max, y_max] format.
+
+    Returns:
+        np.ndarray: (A, B) IoU values between 0 and 1.
+    """
+    boxes_a = np.asarray(boxes_a, dtype=np.float64).reshape(-1, 1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float64).reshape(1, -1, 4)
+    top_left = np.maximum(boxes_a[..., :2], boxes_b[..., :2])
+    bottom_right = np.minimum(boxes_a[..., 2:], boxes_b[..., 2:])
+    inter = np.clip(bottom_right - top_left, 0, None).prod(axis=2)
+    area_a = np.maximum(1e-5, (boxes_a[..., 2] - boxes_a[..., 0])
+                        * (boxes_a[..., 3] - boxes_a[..., 1]))
+    area_b = np.maximum(1e-5, (boxes_b[..., 2] - boxes_b[..., 0])
+                        * (boxes_b[..., 3] - boxes_b[..., 1]))
+    return inter / (area_a + area_b - inter + 1e-5)
+
+
+def match_tracks_to_detections(track_boxes: np.ndarray,
+                               detection_boxes: np.ndarray) -> np.ndarray:
+    """
+    Find, for every track, the detection it overlaps most.
+
+    Args:
+        track_boxes (np.ndarray): (T, 4) track boxes as [x_min, y_min, x_max, y_max].
+        detection_boxes (np.ndarray): (D, 4) detection boxes in the same format.
+
+    Returns:
+        np.ndarray: (T,) index of each track's best detection, -1 where it has none.
+    """
+    track_count, detection_count = len(track_boxes), len(detection_boxes)
+    if not track_count or not detection_count:
+        return np.full(track_count, -1, dtype=np.intp)
+    ious = iou_matrix(track_boxes, detection_boxes)
+    best = ious.argmax(axis=1)
+    best[ious[np.arange(track_count), best] <= 0] = -1
+    return best
+
+
+def non_max_suppression(detections: Detections, threshold: float = 0.6,
+                        metric: str = "ios") -> Detections:
+    """
+    Drop detections that overlap a higher-scoring detection of the same class.
+
+    Used to merge the results of overlapping tiles or crops of one frame. The
+    pairwise overlaps are one broadcast NumPy operation; only the greedy pass
+    over the score order is a loop, and it skips every box already suppressed.
+
+    Args:
+        detections (Detections): Detections, highest score first.
+        threshold (float): Overlap above which the lower-scoring box is dropped.
+        metric (str): ``"iou"`` (intersection over union) or ``"ios"``
+            (intersection over the smaller box). ``"ios"`` also removes the
+            partial box of an object cut by a tile edge, which overlaps the
+            whole box from the neighbouring tile far less than its IoU
+            threshold would need.
+
+    Returns:
+        Detections: The kept detections, still highest score first.
+    """
+    count = len(detections)
+    if count < 2:
+        return detections
+    # One coordinate at a time: broadcasting (N, 1, 2) against (1, N, 2) is
+    # several times slower than four contiguous (N, N) operations.
+    xmin, ymin, xmax, ymax = detections.boxes.astype(np.float64).T
+    widths = np.minimum(xmax[:, None], xmax) - np.maximum(xmin[:, None], xmin)
+    heights = np.minimum(ymax[:, None], ymax) - np.maximum(ymin[:, None], ymin)
+    inter = np.maximum(widths, 0) * np.maximum(heights, 0)
+    areas = np.maximum(1e-5, (xmax - xmin) * (ymax - ymin))
+    if metric == "ios":
+        overlap = inter / np.minimum(areas[:, None], areas)
+    elif metric == "iou":
+        overlap = inter / (areas[:, None] + areas - inter + 1e-5)
+    else:
+        raise ValueError(f"Unknown overlap metric '{metric}'; choose 'iou' or 'ios'")
+    # Only boxes of the same class suppress each other, and only lower-scoring ones.
+    same_class = detections.classes[:, None] == detections.classes
+    suppresses = (overlap > threshold) & same_class
+    suppresses = np.triu(suppresses, k=1)
+    keep = np.ones(count, dtype=bool)
+    for index in np.flatnonzero(suppresses.any(axis=1)):
+        if keep[index]:
+            keep &= ~suppresses[index]
+    return detections if keep.all() else detections[keep]
+
+
 def find_best_matching_detection_index(track_box, detection_boxes):
     """
     Finds the index of the detection box with the highest IoU relative to the given tracking box.
@@ -360,15 +718,8 @@ def find_best_matching_detection_index(track_box, detection_boxes):
     Returns:
         int or None: Index of the best matching detection, or None if no match is found.
     """
-    best_iou = 0
-    best_idx = -1
-
-    for i, det_box in enumerate(detection_boxes):
-        iou = compute_iou(track_box, det_box)
-        if iou > best_iou:
-            best_iou = iou
-            best_idx = i
-
+    best_idx = int(match_tracks_to_detections(np.reshape(track_box, (1, 4)),
+                                              np.reshape(detection_boxes, (-1, 4)))[0])
     return best_idx if best_idx != -1 else None
 
 
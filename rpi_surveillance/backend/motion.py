@@ -0,0 +1,122 @@
+"""Cheap motion detection on small grayscale frames.
+
+:class:`MotionDetector` compares each frame against a running-average
+background at 160 px wide, a ``Frame.gray`` view other consumers can share.
+At that size the blur, difference and threshold are nearly free; the
+downscale from 1080p dominates at a few milliseconds per frame, so motion can
+be watched continuously on hardware that could not afford to run the
+detector all the time.
+"""
+
+from collections.abc import Sequence
+
+import cv2
+import numpy as np
+
+from rpi_surveillance.backend.frame import Frame
+
+# Width of the grayscale view motion is computed on.
+MOTION_WIDTH = 160
+
+
+class MotionDetector:
+    """Running-average background subtraction over an optional region.
+
+    Args:
+        width: Width of the grayscale view compared, in px.
+        pixel_threshold: Grey-level change (0-255) at which a pixel counts as moving.
+        background_alpha: Weight of each new frame in the running background;
+            higher forgets a scene change (a parked car, lights going on) sooner.
+        region: Polygon ``[[x, y], ...]`` in frame-relative ``0..1``
+            coordinates that motion is measured in; ``None`` for the whole frame.
+    """
+
+    def __init__(
+        self,
+        width: int = MOTION_WIDTH,
+        pixel_threshold: int = 25,
+        background_alpha: float = 0.05,
+        region: Sequence[Sequence[float]] | None = None,
+    ):
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.background_alpha = background_alpha
+        self.region = (
+            None
+            if region is None
+            else np.asarray(region, dtype=np.float64).reshape(-1, 2)
+        )
+        self._background: np.ndarray | None = None
+        self._region_mask: np.ndarray | None = None
+        self._region_area = 0
+        self.mask: np.ndarray | None = None
+
+    def reset(self) -> None:
+        """Forget the background; the next frame starts a new one."""
+        self._background = None
+        self.mask = None
+
+    def _build_region_mask(self, shape: tuple[int, int]) -> None:
+        height, width = shape
+        if self.region is None:
+            self._region_mask = None
+            self._region_area = height * width
+            return
+        mask = np.zeros(shape, np.uint8)
+        points = np.rint(self.region * (width - 1, height - 1)).astype(np.int32)
+        cv2.fillPoly(mask, [points], 255)
+        self._region_mask = mask
+        self._region_area = max(1, cv2.countNonZero(mask))
+
+    def update(self, frame: Frame) -> float:
+        """Fold ``frame`` into the background; return the moving fraction of the region.
+
+        The binary motion mask (255 where moving, inside the region) is left in
+        :attr:`mask`. The first frame, and the first after a change of
+        resolution, only seeds the background and reports no motion.
+        """
+        gray = cv2.GaussianBlur(frame.gray(self.width), (5, 5), 0)
+        if self._background is None or self._background.shape != gray.shape:
+            self._background = gray.astype(np.float32)
+            self._build_region_mask(gray.shape)
+            self.mask = np.zeros_like(gray)
+            return 0.0
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(self._background))
+        cv2.accumulateWeighted(gray, self._background, self.background_alpha)
+        _, mask = cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)
+        if self._region_mask is not None:
+            cv2.bitwise_and(mask, self._region_mask, dst=mask)
+        self.mask = mask
+        return cv2.countNonZero(mask) / self._region_area
+
+
+def motion_boxes(mask: np.ndarray, min_area: int = 30, dilate: int = 2) -> np.ndarray:
+    """Bounding boxes of the moving blobs in a :attr:`MotionDetector.mask`.
+
+    The mask is dilated ``dilate`` times first, so the fragments of one
+    moving object join into one blob. Blobs smaller than ``min_area`` mask
+    pixels are noise and dropped.
+
+    Returns:
+        ``(N, 4)`` int32 ``[xmin, ymin, xmax, ymax]`` mask-pixel boxes, largest first.
+    """
+    if dilate:
+        mask = cv2.dilate(mask, np.ones((3, 3), np.uint8), iterations=dilate)
+    count, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    # Label 0 is the background.
+    stats = stats[1:count]
+    stats = stats[stats[:, cv2.CC_STAT_AREA] >= min_area]
+    stats = stats[np.argsort(-stats[:, cv2.CC_STAT_AREA], kind="stable")]
+    xmin, ymin = stats[:, cv2.CC_STAT_LEFT], stats[:, cv2.CC_STAT_TOP]
+    return (
+        np.column_stack(
+            [
+                xmin,
+                ymin,
+                xmin + stats[:, cv2.CC_STAT_WIDTH],
+                ymin + stats[:, cv2.CC_STAT_HEIGHT],
+            ]
+        )
+        .astype(np.int32)
+        .reshape(-1, 4)
+    )
@@ -0,0 +1,233 @@
+"""Motion-ROI inference: run the model on native-resolution crops around motion.
+
+Letterboxing a 1920x1080 frame into a 640x640 model input shrinks it threefold,
+so a person 40 px tall at the far end of the yard reaches the model at about
+13 px. With ROI inference enabled, each camera's frames go through a
+:class:`MotionDetector` first, and the model runs on up to ``max_regions``
+``crop_size`` windows cut from the full-resolution frame around the moving
+blobs instead, where that person keeps all 40 px.
+
+The rest of the frame did not change, so the detections there are carried
+over from the camera's last full-frame pass; frames without any motion need
+no inference at all. A full-frame pass still runs every
+``full_frame_interval_s`` to pick up objects that were already standing
+still, and whenever the motion does not fit into ``max_regions`` windows.
+The accelerator therefore never runs more than ``max_regions`` inputs for a
+frame, and on a mostly static scene far fewer than one on average.
+
+Configured by ``roi_params`` in the detector config.
+"""
+
+import threading
+from collections.abc import Callable
+
+import numpy as np
+
+from rpi_surveillance.backend.frame import Frame
+from rpi_surveillance.backend.inference.detections import Detections
+from rpi_surveillance.backend.inference.detector import Region
+from rpi_surveillance.backend.motion import MotionDetector, motion_boxes
+
+ROI_DEFAULTS = {
+    "enabled": False,
+    "crop_size": 640,
+    "max_regions": 2,
+    "margin_px": 32,
+    "full_frame_interval_s": 1.0,
+    "motion_width": 320,
+    "pixel_threshold": 25,
+    "background_alpha": 0.05,
+    "min_area_px": 30,
+}
+
+
+class RegionPlanner:
+    """One camera's motion model and the regions its frames are inferred on.
+
+    Frames must arrive in capture order; :meth:`process` ignores any frame
+    older than the last one it saw and returns the current result instead.
+    """
+
+    def __init__(self, params: dict):
+        self.crop_size = int(params["crop_size"])
+        self.max_regions = int(params["max_regions"])
+        self.margin = int(params["margin_px"])
+        self.full_frame_interval = float(params["full_frame_interval_s"])
+        self.min_area = int(params["min_area_px"])
+        self.motion = MotionDetector(
+            int(params["motion_width"]),
+            int(params["pixel_threshold"]),
+            float(params["background_alpha"]),
+        )
+        self.frames = 0
+        self.full_frames = 0
+        self.full_frame_inputs = 0
+        self.crops = 0
+        self.skipped = 0
+        self._last_seq: int | None = None
+        self._full: Detections | None = None
+        self._full_at = 0.0
+        self._result = Detections.empty()
+        self._lock = threading.Lock()
+
+    def process(
+        self,
+        frame: Frame,
+        infer: Callable[[Frame, list[Region] | None], Detections],
+        full_frame_inputs: int = 1,
+    ) -> Detections:
+        """Detections for ``frame``, running ``infer`` on the regions that changed.
+
+        ``full_frame_inputs`` is how many model inputs a full-frame pass
+        costs: the number of tiles on a tiled camera.
+        """
+        with self._lock:
+            if self._last_seq is not None and frame.seq <= self._last_seq:
+                return self._result
+            self._last_seq = frame.seq
+            self.frames += 1
+            self.motion.update(frame)
+            regions = None
+            if (
+                self._full is not None
+                and frame.timestamp - self._full_at < self.full_frame_interval
+            ):
+                regions = self.plan(frame)
+            if regions is None:
+                self.full_frames += 1
+                self.full_frame_inputs += full_frame_inputs
+                self._full = infer(frame, None)
+                self._full_at = frame.timestamp
+                self._result = self._full
+            elif not regions:
+                self.skipped += 1
+                self._result = self._full
+            else:
+                self.crops += len(regions)
+                found = infer(frame, regions)
+                self._result = Detections.concatenate(
+                    [found, self._full[~_centres_inside(self._full.boxes, regions)]]
+                )
+            return self._result
+
+    def plan(self, frame: Frame) -> list[Region] | None:
+        """Crop windows over the motion: ``[]`` for none, ``None`` for the frame."""
+        boxes = motion_boxes(self.motion.mask, self.min_area)
+        if not len(boxes):
+            return []
+        scale = frame.width / self.motion.mask.shape[1]
+        boxes = np.rint(boxes * scale).astype(np.int32)
+        boxes[:, :2] -= self.margin
+        boxes[:, 2:] += self.margin
+        np.clip(
+            boxes, 0, [frame.width, frame.height, frame.width, frame.height], out=boxes
+        )
+        return self._cover(boxes.tolist(), frame.width, frame.height)
+
+    def _cover(self, boxes: list, width: int, height: int) -> list[Region] | None:
+        """Pack ``boxes`` (largest first) greedily into ``max_regions`` crop windows."""
+        size = self.crop_size
+        if size > width or size > height:
+            return None
+        extents: list[list[int]] = []
+        for xmin, ymin, xmax, ymax in boxes:
+            if xmax - xmin > size or ymax - ymin > size:
+                return None
+            for extent in extents:
+                merged = [
+                    min(extent[0], xmin),
+                    min(extent[1], ymin),
+                    max(extent[2], xmax),
+                    max(extent[3], ymax),
+                ]
+                if merged[2] - merged[0] <= size and merged[3] - merged[1] <= size:
+                    extent[:] = merged
+                    break
+            else:
+                if len(extents) == self.max_regions:
+                    return None
+                extents.append([xmin, ymin, xmax, ymax])
+        regions = []
+        for xmin, ymin, xmax, ymax in extents:
+            left = min(max((xmin + xmax - size) // 2, 0), width - size)
+            top = min(max((ymin + ymax - size) // 2, 0), height - size)
+            regions.append((left, top, left + size, top + size))
+        return regions
+
+
+def _centres_inside(boxes: np.ndarray, regions: list[Region]) -> np.ndarray:
+    """``(N,)`` mask of the boxes whose centre lies in any of ``regions``."""
+    centres = (boxes[:, None, :2] + boxes[:, None, 2:]) / 2
+    regions = np.asarray(regions, dtype=np.float64)[None]
+    inside = ((centres >= regions[..., :2]) & (centres < regions[..., 2:])).all(axis=2)
+    return inside.any(axis=1)
+
+
+class RoiService:
+    """Per-camera :class:`RegionPlanner` instances, created on first use.
+
+    Args:
+        params: ``roi_params``, over :data:`ROI_DEFAULTS`: ``enabled``,
+            ``crop_size`` (side of the square crop windows, in frame pixels;
+            the model's input size crops without any resize),
+            ``max_regions`` (most crops per frame; more motion than fits runs
+            a full-frame pass), ``margin_px`` (context kept around each moving
+            blob), ``full_frame_interval_s``, and the motion settings
+            ``motion_width``, ``pixel_threshold``, ``background_alpha`` and
+            ``min_area_px`` (smallest blob, in motion mask pixels).
+    """
+
+    def __init__(self, params: dict | None = None):
+        self.params = {**ROI_DEFAULTS, **(params or {})}
+        self.enabled = bool(self.params["enabled"])
+        self._cameras: dict[str, RegionPlanner] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict) -> "RoiService":
+        return cls(config.get("roi_params"))
+
+    def process(
+        self,
+        camera_id: str,
+        frame: Frame,
+        infer: Callable[[Frame, list[Region] | None], Detections],
+        full_frame_inputs: int = 1,
+    ) -> Detections:
+        """Detections for one camera's ``frame``; see :class:`RegionPlanner`."""
+        with self._lock:
+            planner = self._cameras.get(camera_id)
+            if planner is None:
+                planner = self._cameras[camera_id] = RegionPlanner(self.params)
+        return planner.process(frame, infer, full_frame_inputs)
+
+    def discard(self, camera_id: str) -> None:
+        """Forget a camera's motion model and carried-over detections."""
+        with self._lock:
+            self._cameras.pop(camera_id, None)
+
+    def status(self) -> dict:
+        """Whether ROI inference is on and, per camera, the model inputs per frame.
+
+        A tiled full-frame pass counts one input per tile.
+        """
+        with self._lock:
+            cameras = dict(self._cameras)
+        return {
+            "enabled": self.enabled,
+            "cameras": {
+                camera_id: {
+                    "frames": planner.frames,
+                    "full_frames": planner.full_frames,
+                    "full_frame_inputs": planner.full_frame_inputs,
+                    "crops": planner.crops,
+                    "skipped": planner.skipped,
+                    "inputs_per_frame": round(
+                        (planner.full_frame_inputs + planner.crops) / planner.frames, 3
+                    )
+                    if planner.frames
+                    else 0.0,
+                }
+                for camera_id, planner in cameras.items()
+            },
+        }
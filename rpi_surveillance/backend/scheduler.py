@@ -0,0 +1,262 @@
+"""Fair, priority-aware sharing of the single detector between cameras.
+
+Every camera funnels its detection requests into one :class:`FairScheduler`.
+Each request belongs to a :class:`Priority` class, and a higher class is
+always served first: a burst of one-shot ``/detect`` calls queues behind the
+live ``detect=true`` streams instead of in front of them. Within a class,
+requests are queued per camera and served round-robin by a single worker
+thread, so one busy camera cannot starve the others of the accelerator.
+
+Requests may carry a deadline. One that can no longer be served in time
+(its deadline is closer than the scheduler's recent service time) while other
+work is waiting is failed with :class:`DeadlineExceeded` instead of occupying
+the accelerator, so the caller can fall back to an older result while the
+queue drains.
+"""
+
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future
+from enum import IntEnum
+from functools import partial
+from typing import Any
+
+# Weight of each completed request in the smoothed service time.
+SERVICE_TIME_SMOOTHING = 0.2
+
+
+class Priority(IntEnum):
+    """Request classes, most urgent first."""
+
+    LIVE = 0  # overlays of live streams
+    TRIGGER = 1  # event and recording triggers (the gatekeeper)
+    API = 2  # one-shot API calls
+    BACKFILL = 3  # background work that may wait indefinitely
+
+
+class DeadlineExceeded(TimeoutError):
+    """A request could not be served before its deadline."""
+
+
+class FairScheduler:
+    """Priority-ordered, round-robin, single-worker executor keyed by camera id.
+
+    Args:
+        process: Called on the worker thread with each submitted item; its
+            return value (or exception) resolves the item's future. It may
+            instead return a :class:`Future` (an asynchronous pipeline), which
+            then resolves the item's future when it completes.
+        max_in_flight: How many asynchronous results may be outstanding before
+            the worker stops handing out items. Keeping this small keeps the
+            backlog in the fair per-camera queues rather than in the pipeline's
+            own FIFO.
+        name: Name of the worker thread.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[Any], Any],
+        max_in_flight: int = 1,
+        name: str = "detector-scheduler",
+    ):
+        self._process = process
+        self._max_in_flight = max(1, max_in_flight)
+        self._in_flight = 0
+        self._name = name
+        # (priority, camera id) -> queued (item, future, deadline)
+        self._queues: dict[
+            tuple[Priority, str], deque[tuple[Any, Future, float | None]]
+        ] = {}
+        # Per priority, the camera ids in the order they are next served.
+        self._turns: dict[Priority, deque[str]] = {
+            priority: deque() for priority in Priority
+        }
+        # Smoothed seconds from handing an item out to its result.
+        self.service_time = 0.0
+        self.served = {priority.name.lower(): 0 for priority in Priority}
+        self.expired = {priority.name.lower(): 0 for priority in Priority}
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._running = False
+
+    def submit(
+        self,
+        key: str,
+        item: Any,
+        priority: Priority = Priority.API,
+        deadline: float | None = None,
+    ) -> Future:
+        """Queue ``item`` on behalf of camera ``key`` and return its future.
+
+        ``deadline`` is a ``time.monotonic()`` time; an item that cannot be
+        handed out comfortably before it fails with :class:`DeadlineExceeded`.
+        """
+        future: Future = Future()
+        priority = Priority(priority)
+        with self._cond:
+            if self._expired_locked(priority, deadline, time.monotonic()):
+                # Hopeless already; fail now rather than occupy a queue slot.
+                future.set_exception(self._deadline_error())
+                return future
+            self._ensure_worker()
+            queue = self._queues.get((priority, key))
+            if queue is None:
+                queue = self._queues[(priority, key)] = deque()
+            if not queue:
+                self._turns[priority].append(key)
+            queue.append((item, future, deadline))
+            self._cond.notify()
+        return future
+
+    @property
+    def max_in_flight(self) -> int:
+        return self._max_in_flight
+
+    @max_in_flight.setter
+    def max_in_flight(self, value: int) -> None:
+        with self._cond:
+            self._max_in_flight = max(1, value)
+            self._cond.notify()
+
+    def pending(self, key: str | None = None) -> int:
+        """Number of queued items, for one camera or in total."""
+        with self._cond:
+            return sum(
+                len(queue)
+                for (_, camera), queue in self._queues.items()
+                if key is None or camera == key
+            )
+
+    def stats(self) -> dict:
+        """Queued, served and expired requests per priority, and the service time."""
+        with self._cond:
+            queued = {priority.name.lower(): 0 for priority in Priority}
+            for (priority, _), queue in self._queues.items():
+                queued[priority.name.lower()] += len(queue)
+            return {
+                "service_ms": round(self.service_time * 1000, 1),
+                "queued": queued,
+                "served": dict(self.served),
+                "expired": dict(self.expired),
+            }
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._run, name=self._name, daemon=True
+            )
+            self._thread.start()
+
+    def _has_turns_locked(self) -> bool:
+        return any(self._turns.values())
+
+    def _next_locked(self) -> tuple[Priority, Any, Future, float | None]:
+        """Pop the most urgent class's next camera queue head; rotate it to the back."""
+        priority = next(priority for priority in Priority if self._turns[priority])
+        turns = self._turns[priority]
+        key = turns.popleft()
+        queue = self._queues[(priority, key)]
+        item, future, deadline = queue.popleft()
+        if queue:
+            turns.append(key)
+        else:
+            del self._queues[(priority, key)]
+        return priority, item, future, deadline
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and (
+                    not self._has_turns_locked()
+                    or self._in_flight >= self._max_in_flight
+                ):
+                    self._cond.wait()
+                if not self._running:
+                    return
+                priority, item, future, deadline = self._next_locked()
+                if future.cancelled():
+                    continue
+                started = time.monotonic()
+                expired = self._expired_locked(priority, deadline, started)
+                if not expired:
+                    self.served[priority.name.lower()] += 1
+            if not future.set_running_or_notify_cancel():
+                continue
+            if expired:
+                future.set_exception(self._deadline_error())
+                continue
+            try:
+                result = self._process(item)
+            except Exception as e:
+                future.set_exception(e)
+                continue
+            if isinstance(result, Future):
+                with self._cond:
+                    self._in_flight += 1
+                result.add_done_callback(partial(self._on_done, future, started))
+            else:
+                self._record_service_time(started)
+                future.set_result(result)
+
+    def _expired_locked(
+        self, priority: Priority, deadline: float | None, now: float
+    ) -> bool:
+        """Whether an item due at ``deadline`` can no longer be served; counts it if so.
+
+        While the accelerator is otherwise idle a late item is still served:
+        it costs nobody anything, and its timing corrects a stale service time.
+        """
+        if deadline is None or deadline - now >= self.service_time:
+            return False
+        if deadline > now and not self._in_flight and not self._has_turns_locked():
+            return False
+        self.expired[priority.name.lower()] += 1
+        return True
+
+    def _deadline_error(self) -> DeadlineExceeded:
+        return DeadlineExceeded(
+            f"Request cannot be served before its deadline "
+            f"(service time {self.service_time * 1000:.0f} ms)"
+        )
+
+    def _record_service_time(self, started: float) -> None:
+        elapsed = time.monotonic() - started
+        with self._cond:
+            if self.service_time:
+                self.service_time += SERVICE_TIME_SMOOTHING * (
+                    elapsed - self.service_time
+                )
+            else:
+                self.service_time = elapsed
+
+    def _on_done(self, future: Future, started: float, result: Future) -> None:
+        self._record_service_time(started)
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+        error = result.exception()
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result.result())
+
+    def close(self) -> None:
+        """Stop the worker and fail everything still queued."""
+        with self._cond:
+            self._running = False
+            pending = [
+                future for queue in self._queues.values() for _, future, _ in queue
+            ]
+            self._queues.clear()
+            for turns in self._turns.values():
+                turns.clear()
+            self._cond.notify_all()
+        for future in pending:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(RuntimeError("Detector scheduler closed"))
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
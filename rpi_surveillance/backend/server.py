@@ -5,6 +5,10 @@ Contains the PiCamera2 handler and the FastAPI ``APIRouter`` exposing the camera
 REST endpoints. The router is mounted onto the NiceGUI/FastAPI application in
 ``rpi_surveillance.app`` under the ``/api`` prefix, so this module does not run a
 server of its own.
+
+Several cameras can run side by side: each is registered under a camera id and
+served at ``/api/cameras/{camera_id}/...``. The original single-camera routes
+(``/api/stream``, ``/api/capture``, ...) act on the ``default`` camera.
 """
 
 import asyncio
@@ -12,9 +16,10 @@ import logging
 import os
 import threading
 import time
+from concurrent.futures import Future
+from functools import partial
 from urllib.parse import quote, urlsplit, urlunsplit
 
-import cv2
 import numpy as np
 from fastapi import APIRouter, Depends
 from fastapi.responses import JSONResponse, Response, StreamingResponse
@@ -26,6 +31,7 @@ except Exception:  # pragma: no cover - only present on a Raspberry Pi
 
 
 
+from rpi_surveillance.backend.cache import SequenceCache
 from rpi_surveillance.backend.camera import (
     DEFAULT_RTSP_URL,
     JPEG_QUALITY,
@@ -33,7 +39,23 @@ from rpi_surveillance.backend.camera import (
     PiCameraHandler,
     Settings,
 )
-from rpi_surveillance.backend.inference.detector import ObjectDetector
+from rpi_surveillance.backend.frame import Frame, encode_jpeg
+from rpi_surveillance.backend.detction_worker import SLOT_SHAPE, DetectionWorkerPool
+from rpi_surveillance.backend.inference.detections import Detections
+from rpi_surveillance.backend.inference.filters import DetectionFilter, filters_for
+from rpi_surveillance.backend.inference.detector import (
+    DEFAULT_CONFIG_PATH,
+    DetectionPipeline,
+    ObjectDetector,
+    Region,
+    frame_tiles,
+    get_labels,
+    load_json_file,
+    tiling_for,
+)
+from rpi_surveillance.backend.roi import RoiService
+from rpi_surveillance.backend.scheduler import DeadlineExceeded, FairScheduler, Priority
+from rpi_surveillance.backend.tracking import TrackingService
 from rpi_surveillance.config import load_env
 
 logger = logging.getLogger(__name__)
@@ -43,6 +65,26 @@ API_PREFIX = "/api"
 STREAM_WIDTH = 1280
 STREAM_QUALITY = 75
 STREAM_MAX_FPS = 15.0
+# Detections of a frame captured at most this many seconds apart from the one
+# being shown are reused instead of running the model again.
+DETECTION_REUSE_AGE = 0.1
+# Seconds each class of caller waits for a detection pass (``None``: no limit).
+DETECTION_DEADLINES = {
+    Priority.LIVE: 0.25,
+    Priority.TRIGGER: 1.0,
+    Priority.API: 5.0,
+    Priority.BACKFILL: None,
+}
+# A caller whose pass misses its deadline gets the camera's newest result
+# instead, if that comes from a frame captured at most this many seconds earlier.
+STALE_RESULT_AGE = 2.0
+# Seconds a worker process may take to draw and encode a frame for a caller
+# whose class has no deadline.
+RENDER_TIMEOUT = 10.0
+# Dummy inferences run by the detector warm-up (per worker process, if any).
+WARMUP_INFERENCES = 3
+# Camera served by the original single-camera routes (``/api/stream`` etc.).
+DEFAULT_CAMERA_ID = "default"
 
 # Ensure .env (RTSP credentials etc.) is loaded before reading env vars below.
 load_env()
@@ -75,103 +117,494 @@ def _resolve_rtsp_url(url: str | None) -> str:
     return urlunsplit((parts.scheme, netloc, parts.path, parts.query, parts.fragment))
 
 
-def _scale_to_width(frame: np.ndarray, width: int | None) -> np.ndarray:
-    """Downscale ``frame`` to ``width`` px wide, preserving aspect ratio."""
-    if not width or width >= frame.shape[1]:
-        return frame
-    height = int(round(frame.shape[0] * width / frame.shape[1]))
-    return cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
-
+# Encoded JPEGs of the newest frames, keyed by (camera, seq) and the stream
+# profile (width, quality, detect). Every client asking for the same profile
+# reuses one payload, so encoding cost grows with the number of distinct
+# profiles rather than with the number of viewers.
+encoded_cache = SequenceCache()
 
-def _encode_jpeg(frame: np.ndarray, quality: int = JPEG_QUALITY) -> bytes:
-    """Encode a frame as JPEG bytes at the given quality."""
-    return cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), int(quality)])[1].tobytes()
+CameraHandler = RTSPCameraHandler | PiCameraHandler
 
 
-class _DependencyInjector:
-    def __init__(self):
-        self.camera_handler: RTSPCameraHandler | None = None
-
-    def __call__(self):
-        return self.camera_handler
+class _CameraRegistry:
+    """Running camera handlers, keyed by camera id.
 
-    def set_camera_handler(self, camera_handler: RTSPCameraHandler | None):
-        self.camera_handler = camera_handler
-        return self
+    Every camera gets its own handler, and with it its own reader thread, frame
+    broker and recorder, so starting, stopping or restarting one camera never
+    tears down the others. The registry doubles as the FastAPI dependency that
+    resolves ``camera_id`` (a path parameter on ``/cameras/{camera_id}/...``, a
+    query parameter defaulting to ``DEFAULT_CAMERA_ID`` on the legacy routes)
+    to its handler.
+    """
 
+    def __init__(self):
+        self._handlers: dict[str, CameraHandler] = {}
+        # (source, url) each camera was last started with, so it can be
+        # restarted or auto-started on first use without the caller repeating it.
+        self._sources: dict[str, tuple[str, str | None]] = {}
+        self._lock = threading.Lock()
+        self._camera_locks: dict[str, threading.Lock] = {}
+
+    def __call__(self, camera_id: str = DEFAULT_CAMERA_ID):
+        return self._handlers.get(camera_id)
+
+    def ids(self) -> list[str]:
+        return sorted(set(self._handlers) | set(self._sources))
+
+    def describe(self, camera_id: str) -> dict:
+        source, _ = self._sources.get(camera_id, ("rtsp", None))
+        handler = self._handlers.get(camera_id)
+        return {
+            "id": camera_id,
+            "source": source,
+            "running": handler is not None,
+            "recording": bool(handler is not None and handler._recording),
+            "gatekeeper": bool(handler is not None and handler.gatekeeper is not None),
+            "frames_grabbed": getattr(handler, "frames_grabbed", 0),
+            "frames_decoded": getattr(handler, "frames_decoded", 0),
+        }
+
+    def _camera_lock(self, camera_id: str) -> threading.Lock:
+        with self._lock:
+            return self._camera_locks.setdefault(camera_id, threading.Lock())
+
+    def start(self, camera_id: str = DEFAULT_CAMERA_ID, source: str | None = None,
+              url: str | None = None):
+        """(Re)start one camera, replacing only that camera's previous handler.
+
+        Without ``source``, the camera is started the way it was last time (or
+        as the default RTSP stream if it has never been started).
+        """
+        if source is None:
+            source, url = self._sources.get(camera_id, ("rtsp", url))
+        source = (source or "rtsp").lower()
+        # Per-camera lock: opening an RTSP stream can take seconds, and other
+        # cameras must not wait for it.
+        with self._camera_lock(camera_id):
+            if source == "rpi":
+                for other_id, other in self._handlers.items():
+                    if other_id != camera_id and isinstance(other, PiCameraHandler):
+                        raise RuntimeError(
+                            f"PiCamera2 is already in use by camera '{other_id}'")
+            existing = self._handlers.pop(camera_id, None)
+            # A new handler numbers its frames from 1 again.
+            encoded_cache.discard(camera_id)
+            detector_injector.discard(camera_id)
+            if existing is not None:
+                logging.info(f"Cleaning up existing handler for camera '{camera_id}'")
+                try:
+                    existing.close()
+                except Exception as e:
+                    logging.error(f"Error closing existing camera '{camera_id}': {e}")
+            handler = _build_camera_handler(source, url, camera_id)
+            try:
+                handler.start()
+            except Exception:
+                # Release the just-built handler so a failed start doesn't leave the
+                # camera acquired (which would break every subsequent attempt).
+                try:
+                    handler.close()
+                except Exception as e:
+                    logging.error(f"Error cleaning up failed camera handler: {e}")
+                raise
+            self._sources[camera_id] = (source, url)
+            self._handlers[camera_id] = handler
+            return handler
+
+    def get_or_start(self, camera_id: str = DEFAULT_CAMERA_ID):
+        """Return the running handler, auto-starting the camera if needed."""
+        handler = self._handlers.get(camera_id)
+        if handler is None:
+            handler = self.start(camera_id)
+        return handler
+
+    def stop(self, camera_id: str = DEFAULT_CAMERA_ID) -> bool:
+        """Stop and forget one camera's handler. Returns whether it was running."""
+        with self._camera_lock(camera_id):
+            handler = self._handlers.pop(camera_id, None)
+            encoded_cache.discard(camera_id)
+            detector_injector.discard(camera_id)
+            if handler is None:
+                return False
+            handler.reset_camera()
+            return True
+
+    def discard(self, camera_id: str) -> None:
+        """Drop a handler that failed, without trying to close it again."""
+        self._handlers.pop(camera_id, None)
+
+    def close(self) -> None:
+        for camera_id in list(self._handlers):
+            try:
+                self.stop(camera_id)
+            except Exception as e:
+                logging.error(f"Error stopping camera '{camera_id}': {e}")
+
+
+camera_registry = _CameraRegistry()
+
+
+class _StaleAnnotation(Exception):
+    """A frame annotated with an older frame's detections, after a missed deadline.
+
+    Raised with the JPEG rather than returning it, so ``encoded_cache`` does
+    not keep it for the frame's other viewers.
+    """
 
-camera_injector = _DependencyInjector()
+    def __init__(self, payload: bytes):
+        super().__init__("Annotated with stale detections")
+        self.payload = payload
 
 
 class _DetectorInjector:
-    """Lazily builds the ObjectDetector on first use (loads the Hailo model)."""
+    """Lazily builds the ObjectDetector (loading the model) on first use.
+
+    All cameras share the one detector. Their requests go through a
+    :class:`FairScheduler`, which serves cameras round-robin on a single worker
+    thread, so a busy camera cannot starve the others of the accelerator.
+    Every request carries a :class:`Priority` and a deadline from
+    ``DETECTION_DEADLINES``: live overlays go first, then recording triggers,
+    then one-shot API calls. A pass that cannot finish in time is not run;
+    the caller reuses the camera's newest result, so live overlays stay
+    within their deadline however many ``/detect`` calls are queued.
+
+    Inference itself runs through a :class:`DetectionPipeline`, so letterboxing,
+    accelerator time and postprocessing of consecutive requests overlap, and
+    frames from different cameras arriving together share one batch. With
+    ``inference_params.workers`` set in the detector config, detection and
+    drawing run in that many :class:`DetectionWorkerPool` processes instead,
+    off this process's GIL.
+
+    Results are cached per camera by frame sequence number, in full-resolution
+    coordinates. Every consumer of the same (or a very recent) frame reuses
+    them and only draws them at its own resolution, so the accelerator runs at
+    most once per source frame however many viewers ask for overlays.
+
+    With ``roi_params.enabled``, a :class:`RoiService` decides per frame
+    whether the model sees the whole frame, native-resolution crops around
+    motion, or nothing at all. Cameras with tiling enabled in
+    ``tiling_params`` run every full-frame pass as one batch of overlapping
+    tiles instead. Each camera's ``filter_params`` (class allow-list,
+    per-class thresholds, exclusion zones) are applied to its results before
+    they reach tracking, the cache or any drawing.
+
+    :meth:`warm_up` loads the detector ahead of the first request and runs a
+    few dummy inferences; :meth:`status` reports how far that has got.
+    """
 
     def __init__(self):
         self._detector: ObjectDetector | None = None
+        self._pipeline: DetectionPipeline | None = None
+        self._workers: DetectionWorkerPool | None = None
+        self._labels: list[str] | None = None
+        self._tracking: TrackingService | None = None
+        self._roi: RoiService | None = None
+        self._config: dict = {}
+        self._filters: dict[str, DetectionFilter] = {}
         self._lock = threading.Lock()
-        self._infer_lock = threading.Lock()
-
-    def __call__(self) -> ObjectDetector:
-        if self._detector is None:
-            with self._lock:
-                if self._detector is None:
+        self._state = "idle"
+        self._warming = False
+        self._error: str | None = None
+        self._load_seconds: float | None = None
+        self._warmup_ms: list[float] = []
+        self._scheduler = FairScheduler(self._submit_scheduled)
+        self.cache = SequenceCache()
+
+    def _ensure_started(self) -> None:
+        if self._labels is not None:
+            return
+        with self._lock:
+            if self._labels is not None:
+                return
+            self._state, self._error = "loading", None
+            started = time.monotonic()
+            try:
+                config = load_json_file(str(DEFAULT_CONFIG_PATH))
+                workers = config.get("inference_params", {}).get("workers", 0)
+                if workers:
+                    self._workers = DetectionWorkerPool(
+                        workers, config_path=DEFAULT_CONFIG_PATH)
+                    capacity = self._workers.capacity
+                    labels = get_labels(None)
+                else:
                     self._detector = ObjectDetector()
+                    self._pipeline = DetectionPipeline(self._detector)
+                    capacity = self._pipeline.capacity
+                    labels = self._detector.labels
+                self._tracking = TrackingService.from_config(config)
+                self._roi = RoiService.from_config(config)
+                self._config = config
+            except Exception as e:
+                self._state, self._error = "failed", str(e)
+                raise
+            # Enough frames in the pipeline (or worker slots) to keep every
+            # stage busy; the rest of the backlog waits in the fair per-camera
+            # queues.
+            self._scheduler.max_in_flight = capacity
+            self._labels = labels
+            self._load_seconds = round(time.monotonic() - started, 3)
+            self._state = "warming" if self._warming else "ready"
+
+    def warm_up(self, inferences: int = WARMUP_INFERENCES) -> None:
+        """Load the detector now and run ``inferences`` dummy frames through it.
+
+        Model loading, HEF resolution and the slow first inferences then happen
+        here rather than in the first viewer's request. Failures are logged and
+        reported by :meth:`status`; the next request retries the load.
+        """
+        self._warming = True
+        try:
+            self._ensure_started()
+            self._state = "warming"
+            if self._workers is not None:
+                # The workers share one task queue; submit enough for each to get some.
+                shape = SLOT_SHAPE
+                inferences *= self._workers.size
+            else:
+                model = self._detector.model
+                shape = (model.input_height, model.input_width, 3)
+            blank = np.zeros(shape, np.uint8)
+            self._warmup_ms = []
+            for seq in range(inferences):
+                started = time.monotonic()
+                self._submit_to_pipeline(Frame(seq, blank)).result()
+                self._warmup_ms.append(round((time.monotonic() - started) * 1000, 1))
+            self._state = "ready"
+            logger.info(f"Detector ready: loaded in {self._load_seconds}s, "
+                        f"warm-up inferences {self._warmup_ms} ms")
+        except Exception as e:
+            self._state, self._error = "failed", str(e)
+            logger.error(f"Detector warm-up failed: {e}")
+        finally:
+            self._warming = False
+
+    def start_warm_up(self) -> None:
+        """Run :meth:`warm_up` on a background thread and return immediately."""
+        threading.Thread(target=self.warm_up, name="detector-warmup",
+                         daemon=True).start()
+
+    def status(self) -> dict:
+        """State: ``idle``, ``loading``, ``warming``, ``ready`` or ``failed``."""
+        return {
+            "state": self._state,
+            "ready": self._state == "ready",
+            "error": self._error,
+            "workers": self._workers.size if self._workers is not None else 0,
+            "load_seconds": self._load_seconds,
+            "warmup_ms": self._warmup_ms,
+            "tracking": self._tracking.status() if self._tracking is not None else None,
+            "roi": self._roi.status() if self._roi is not None else None,
+            "scheduler": self._scheduler.stats(),
+        }
+
+    def __call__(self) -> ObjectDetector | None:
+        """The in-process detector, or ``None`` when detection runs in workers."""
+        self._ensure_started()
         return self._detector
 
-    def detect(self, frame: np.ndarray) -> np.ndarray:
-        """Annotate a frame, serialising access to the single Hailo device.
-
-        Concurrent streams and requests all share one accelerator, so inference
-        is funnelled through a lock rather than interleaved on it.
+    @property
+    def labels(self) -> list[str]:
+        self._ensure_started()
+        return self._labels
+
+    def _submit_to_pipeline(self, frame: Frame,
+                            regions: list[Region] | None = None) -> Future:
+        self._ensure_started()
+        if self._workers is not None:
+            return self._workers.submit(frame, regions)
+        return self._pipeline.submit(frame, regions)
+
+    def _submit_scheduled(self, item: tuple[Frame, list[Region] | None]) -> Future:
+        return self._submit_to_pipeline(*item)
+
+    def detections(self, frame: Frame, camera_id: str = DEFAULT_CAMERA_ID,
+                   priority: Priority = Priority.API) -> Detections:
+        """Detections for ``frame`` in full-resolution pixels; see :meth:`lookup`."""
+        return self.lookup(frame, camera_id, priority)[0]
+
+    def lookup(self, frame: Frame, camera_id: str = DEFAULT_CAMERA_ID,
+               priority: Priority = Priority.API) -> tuple[Detections, bool]:
+        """Detections for ``frame``, and whether they are a stale stand-in.
+
+        With tracking enabled, every frame gets tracked boxes, and the
+        :class:`TrackingService` decides which frames the model runs on.
+        Otherwise the camera's newest cached result is reused when it comes
+        from a frame captured within ``DETECTION_REUSE_AGE``. Frames that need
+        the model are queued fairly against the other cameras, once, however
+        many callers ask.
+
+        A pass that misses the ``priority``'s deadline falls back to the
+        camera's newest result within ``STALE_RESULT_AGE``, flagged as stale;
+        failing that, it raises :class:`DeadlineExceeded`. A missed deadline
+        never passes for a frame without objects.
         """
-        detector = self()
-        with self._infer_lock:
-            return detector.detect(frame)
+        self._ensure_started()
+        timeout = DETECTION_DEADLINES[priority]
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        infer = partial(self._infer, camera_id, priority=priority, deadline=deadline)
+        tracking = self._tracking
+        if tracking is not None and tracking.enabled:
+            compute = partial(tracking.process, camera_id, frame, infer)
+        else:
+            recent = self.cache.newest(camera_id, "detections")
+            if recent is not None:
+                stamp, detections = recent[1]
+                if abs(frame.timestamp - stamp) <= DETECTION_REUSE_AGE:
+                    return detections, False
+            compute = partial(infer, frame)
+        try:
+            _, detections = self.cache.get_or_compute(
+                camera_id, frame.seq, "detections",
+                lambda: (frame.timestamp, compute()), timeout)
+        except TimeoutError:
+            return self._stale_detections(camera_id, frame, priority), True
+        return detections, False
+
+    def _stale_detections(self, camera_id: str, frame: Frame,
+                          priority: Priority) -> Detections:
+        recent = self.cache.newest(camera_id, "detections")
+        if recent is not None:
+            stamp, detections = recent[1]
+            if frame.timestamp - stamp <= STALE_RESULT_AGE:
+                return detections
+        raise DeadlineExceeded(f"No detections for camera '{camera_id}' within "
+                               f"{DETECTION_DEADLINES[priority]}s")
+
+    def _infer(self, camera_id: str, frame: Frame, priority: Priority = Priority.API,
+               deadline: float | None = None) -> Detections:
+        infer = partial(self._infer_regions, camera_id, priority=priority,
+                        deadline=deadline)
+        roi = self._roi
+        if roi is not None and roi.enabled:
+            tiles = frame_tiles(frame, tiling_for(self._config, camera_id))
+            return roi.process(camera_id, frame, infer, len(tiles) if tiles else 1)
+        return infer(frame)
+
+    def _infer_regions(self, camera_id: str, frame: Frame,
+                       regions: list[Region] | None = None,
+                       priority: Priority = Priority.API,
+                       deadline: float | None = None) -> Detections:
+        if regions is None:
+            regions = frame_tiles(frame, tiling_for(self._config, camera_id))
+        camera_filter = self._filter_for(camera_id)
+        future = self._scheduler.submit(
+            camera_id, (camera_filter.blank(frame), regions), priority, deadline)
+        try:
+            detections = future.result(
+                max(0.0, deadline - time.monotonic()) if deadline is not None else None)
+        except DeadlineExceeded:
+            raise
+        except TimeoutError:
+            # Still queued (or on the accelerator): don't let it run for nobody.
+            future.cancel()
+            raise DeadlineExceeded(
+                f"Detection for camera '{camera_id}' missed its deadline")
+        return camera_filter.apply(detections, frame.width, frame.height)
+
+    def _filter_for(self, camera_id: str) -> DetectionFilter:
+        camera_filter = self._filters.get(camera_id)
+        if camera_filter is None:
+            visualization = self._config["visualization_params"]
+            score_threshold = visualization.get("score_thres", 0.5)
+            camera_filter = self._filters[camera_id] = DetectionFilter(
+                filters_for(self._config, camera_id), self._labels, score_threshold)
+        return camera_filter
+
+    def discard(self, camera_id: str) -> None:
+        """Forget a camera's cached detections, tracks and motion model."""
+        self.cache.discard(camera_id)
+        if self._tracking is not None:
+            self._tracking.discard(camera_id)
+        if self._roi is not None:
+            self._roi.discard(camera_id)
+
+    def detect_jpeg(self, frame: Frame, camera_id: str = DEFAULT_CAMERA_ID,
+                    width: int | None = None, quality: int = JPEG_QUALITY,
+                    priority: Priority = Priority.API) -> bytes:
+        """Annotate a frame at ``width`` px and encode it as JPEG.
+
+        A worker process gets the ``priority``'s deadline again for drawing;
+        missing it raises :class:`DeadlineExceeded`, as a late inference does.
+        A frame drawn with stale detections comes back as
+        :class:`_StaleAnnotation`, so it is served but never cached.
+        """
+        detections, stale = self.lookup(frame, camera_id, priority)
+        if self._workers is not None:
+            try:
+                future = self._workers.render(frame, detections, width, quality)
+            except TimeoutError as e:
+                raise DeadlineExceeded(
+                    f"Rendering for camera '{camera_id}' not started: {e}") from None
+            try:
+                payload = future.result(DETECTION_DEADLINES[priority] or RENDER_TIMEOUT)
+            except TimeoutError:
+                future.cancel()
+                raise DeadlineExceeded(
+                    f"Rendering for camera '{camera_id}' missed its deadline") from None
+        else:
+            payload = encode_jpeg(self().annotate(frame, detections, width), quality)
+        if stale:
+            raise _StaleAnnotation(payload)
+        return payload
+
+    def close(self) -> None:
+        """Stop the scheduler and release the detector or worker processes."""
+        self._scheduler.close()
+        with self._lock:
+            if self._pipeline is not None:
+                self._pipeline.close()
+            if self._detector is not None:
+                self._detector.close()
+            if self._workers is not None:
+                self._workers.close()
+            self._detector = self._pipeline = self._workers = self._labels = None
+            self._tracking = self._roi = None
+            self._filters = {}
+            self._state, self._load_seconds, self._warmup_ms = "idle", None, []
 
 
 detector_injector = _DetectorInjector()
 
 
-def _build_camera_handler(source: str, url: str | None):
+def _encoded_frame(camera_id: str, frame: Frame, width: int | None, quality: int,
+                   detect: bool = False, priority: Priority = Priority.API) -> bytes:
+    """JPEG payload for one frame and stream profile, shared via ``encoded_cache``."""
+    width = frame.normalize_width(width)
+
+    def compute() -> bytes:
+        if detect:
+            return detector_injector.detect_jpeg(frame, camera_id, width, quality,
+                                                 priority)
+        return frame.jpeg(width, quality)
+
+    try:
+        return encoded_cache.get_or_compute(camera_id, frame.seq,
+                                            (width, int(quality), detect), compute)
+    except _StaleAnnotation as stale:
+        return stale.payload
+
+
+def _build_camera_handler(source: str, url: str | None, camera_id: str | None = None):
     """Create a camera handler for the requested source ('rtsp' or 'rpi')."""
     source = (source or "rtsp").lower()
+    # The default camera keeps the untagged file names it always had.
+    tag = camera_id if camera_id != DEFAULT_CAMERA_ID else None
     if source == "rpi":
         if Picamera2 is None:
             raise RuntimeError("PiCamera2 is not available on this machine")
-        return PiCameraHandler()
-    return RTSPCameraHandler(_resolve_rtsp_url(url))
-
-
-def _start_camera_internal(
-    _camera_handler: None | RTSPCameraHandler | PiCameraHandler,
-    url: str | None = None,
-    source: str = "rtsp",
-):
-    if _camera_handler is not None:
-        logging.info("Cleaning up existing camera handler")
-        try:
-            _camera_handler.close()
-        except Exception as e:
-            logging.error(f"Error closing existing camera: {e}")
-    _camera_handler = _build_camera_handler(source, url)
-    try:
-        _camera_handler.start()
-    except Exception:
-        # Release the just-built handler so a failed start doesn't leave the
-        # camera acquired (which would break every subsequent attempt).
-        try:
-            _camera_handler.close()
-        except Exception as e:
-            logging.error(f"Error cleaning up failed camera handler: {e}")
-        raise
-    camera_injector.set_camera_handler(_camera_handler)
-    return _camera_handler
+        return PiCameraHandler(camera_id=tag)
+    return RTSPCameraHandler(_resolve_rtsp_url(url), camera_id=tag)
 
 
 # ===========================================================================
 # Camera REST endpoints
+#
+# Every camera endpoint is registered twice: under ``/cameras/{camera_id}/...``
+# and at its original path, where ``camera_id`` falls back to a query parameter
+# defaulting to ``DEFAULT_CAMERA_ID``.
 # ===========================================================================
 camera_api = APIRouter(prefix=API_PREFIX, tags=["camera"])
+CAMERA_PREFIX = "/cameras/{camera_id}"
 
 
 @camera_api.get("/")
@@ -179,58 +612,98 @@ def read_root():
     return {"message": "Hello, World!"}
 
 
+@camera_api.get("/cameras")
+def list_cameras():
+    return {"cameras": [camera_registry.describe(camera_id)
+                        for camera_id in camera_registry.ids()]}
+
+
+@camera_api.get("/detector")
+def detector_status():
+    """Report whether the detector is loaded and warmed up."""
+    return detector_injector.status()
+
+
 @camera_api.get("/start")
+@camera_api.get(CAMERA_PREFIX + "/start")
 def start_camera(
     source: str = "rtsp",
     url: str | None = None,
-    camera_handler: RTSPCameraHandler | PiCameraHandler = Depends(camera_injector),
+    camera_id: str = DEFAULT_CAMERA_ID,
 ):
     try:
-        _start_camera_internal(camera_handler, url, source)
+        camera_registry.start(camera_id, source, url)
     except Exception as e:
-        logging.error(f"Failed to start {source} camera: {e}")
-        camera_injector.set_camera_handler(None)
+        logging.error(f"Failed to start {source} camera '{camera_id}': {e}")
+        camera_registry.discard(camera_id)
         return JSONResponse(status_code=502, content={"message": str(e)})
-    return {"message": "Camera started", "source": source}
+    return {"message": "Camera started", "source": source, "camera_id": camera_id}
 
 
 @camera_api.get("/stop")
-def stop_camera(camera_handler: RTSPCameraHandler = Depends(camera_injector)):
-    if camera_handler is not None:
-        camera_handler.reset_camera()
-        camera_injector.set_camera_handler(None)
-    return {"message": "Camera stopped"}
+@camera_api.get(CAMERA_PREFIX + "/stop")
+def stop_camera(camera_id: str = DEFAULT_CAMERA_ID):
+    camera_registry.stop(camera_id)
+    return {"message": "Camera stopped", "camera_id": camera_id}
 
 
 @camera_api.get("/capture")
+@camera_api.get(CAMERA_PREFIX + "/capture")
 def capture_image(
     width: int = 0,
     quality: int = JPEG_QUALITY,
-    camera_handler: RTSPCameraHandler = Depends(camera_injector),
+    camera_id: str = DEFAULT_CAMERA_ID,
 ):
     """Return a single frame as JPEG, full resolution unless ``width`` is given."""
-    if camera_handler is None:
-        camera_handler = _start_camera_internal(None)
-    image = _scale_to_width(camera_handler.capture_image(), width)
-    return Response(content=_encode_jpeg(image, quality), media_type="image/jpeg")
+    camera_handler = camera_registry.get_or_start(camera_id)
+    payload = _encoded_frame(camera_id, camera_handler.capture_frame(), width, quality)
+    return Response(content=payload, media_type="image/jpeg")
 
 
 @camera_api.get("/detect")
+@camera_api.get(CAMERA_PREFIX + "/detect")
 def detect_objects(
     width: int = 0,
     quality: int = JPEG_QUALITY,
-    camera_handler: RTSPCameraHandler = Depends(camera_injector),
+    camera_id: str = DEFAULT_CAMERA_ID,
 ):
     """Capture the current frame and return it annotated with detected objects."""
-    if camera_handler is None:
-        camera_handler = _start_camera_internal(None)
-    frame = _scale_to_width(camera_handler.capture_image(), width)
-    annotated = detector_injector.detect(frame)
-    return Response(content=_encode_jpeg(annotated, quality), media_type="image/jpeg")
+    camera_handler = camera_registry.get_or_start(camera_id)
+    try:
+        payload = _encoded_frame(camera_id, camera_handler.capture_frame(), width,
+                                 quality, detect=True)
+    except DeadlineExceeded as e:
+        return JSONResponse(status_code=503, content={"message": str(e)})
+    return Response(content=payload, media_type="image/jpeg")
+
+
+@camera_api.get("/detections")
+@camera_api.get(CAMERA_PREFIX + "/detections")
+def list_detections(camera_id: str = DEFAULT_CAMERA_ID):
+    """Return the current frame's detections as JSON, in full-resolution pixels."""
+    camera_handler = camera_registry.get_or_start(camera_id)
+    frame = camera_handler.capture_frame()
+    try:
+        detections, stale = detector_injector.lookup(frame, camera_id)
+    except DeadlineExceeded as e:
+        return JSONResponse(status_code=503, content={"message": str(e)})
+    labels = detector_injector.labels
+    return {
+        "camera_id": camera_id,
+        "seq": frame.seq,
+        "width": frame.width,
+        "height": frame.height,
+        "stale": stale,
+        "detections": detections.to_json(labels),
+    }
 
 
 @camera_api.get("/restart")
-def restart_camera(camera_handler: RTSPCameraHandler = Depends(camera_injector)):
+@camera_api.get(CAMERA_PREFIX + "/restart")
+def restart_camera(
+    camera_id: str = DEFAULT_CAMERA_ID,
+    camera_handler: CameraHandler | None = Depends(camera_registry),
+):
     if camera_handler is None:
         return JSONResponse(status_code=400, content={"message": "Camera not started"})
 
@@ -239,32 +712,37 @@ def restart_camera(camera_handler: RTSPCameraHandler = Depends(camera_injector))
         camera_handler.restart_camera()
         return JSONResponse(status_code=200, content={"message": "Camera restarted"})
     except Exception as e:
-        # If restart fails, try full reinitialize
+        # If restart fails, try full reinitialize with the camera's own source
         logging.error(f"Simple restart failed: {e}. Attempting full reinitialization.")
         try:
-            camera_handler.close()
-            camera_handler = RTSPCameraHandler().start()
-            camera_injector.set_camera_handler(camera_handler)
+            camera_registry.start(camera_id)
             return JSONResponse(status_code=200, content={"message": "Camera reinitialized"})
         except Exception as e2:
             logging.error(f"Full reinitialization failed: {e2}")
-            camera_injector.set_camera_handler(None)
+            camera_registry.discard(camera_id)
             return JSONResponse(status_code=500, content={"message": f"Restart failed: {str(e2)}"})
 
 
 @camera_api.post("/update_settings")
-def update_settings(settings: Settings, camera_handler: RTSPCameraHandler = Depends(camera_injector)):
+@camera_api.post(CAMERA_PREFIX + "/update_settings")
+def update_settings(
+    settings: Settings,
+    camera_handler: CameraHandler | None = Depends(camera_registry),
+):
+    if camera_handler is None:
+        return JSONResponse(status_code=400, content={"message": "Camera not started"})
     camera_handler.update_settings(settings)
     return {"message": "Settings updated"}
 
 
 @camera_api.get("/stream")
+@camera_api.get(CAMERA_PREFIX + "/stream")
 async def stream_video(
     detect: bool = False,
     width: int = STREAM_WIDTH,
     quality: int = STREAM_QUALITY,
     max_fps: float = STREAM_MAX_FPS,
-    camera_handler: RTSPCameraHandler | None = Depends(camera_injector),
+    camera_id: str = DEFAULT_CAMERA_ID,
 ):
     """Stream live video as MJPEG, optionally annotated with detections.
 
@@ -273,31 +751,34 @@ async def stream_video(
     receives fewer frames. Pushing frames to the page over the websocket instead
     lets a slow client build an unbounded queue, and latency grows without bound.
     """
-    if camera_handler is None:
-        camera_handler = _start_camera_internal(None)
+    camera_handler = await asyncio.to_thread(camera_registry.get_or_start, camera_id)
 
     camera_handler.streaming_active = True
-    min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+    # Each client reads the camera's shared frames through its own cursor, so
+    # extra viewers never trigger extra captures.
+    subscription = camera_handler.subscribe(max_fps=max_fps)
 
-    def _render(last_seq: int) -> tuple[bytes, int]:
+    def _render() -> bytes:
         """Blocking part of the pipeline; runs off the event loop."""
-        frame, seq = camera_handler.next_frame(last_seq, timeout=5.0)
-        # Downscale before inference and drawing so every later stage works on
-        # the smaller frame the browser is actually going to display.
-        frame = _scale_to_width(frame, width)
-        if detect:
-            frame = detector_injector.detect(frame)
-        return _encode_jpeg(frame, quality), seq
+        frame = subscription.next(timeout=5.0)
+        # Annotations are drawn on the downscaled frame the browser is actually
+        # going to display, and the payload is shared with every other viewer
+        # of the same profile.
+        return _encoded_frame(camera_id, frame, width, quality, detect, Priority.LIVE)
 
     async def generate_frames():
-        last_seq = 0
         try:
             while camera_handler.streaming_active:
-                started = time.monotonic()
+                # Pace on the event loop rather than sleeping in a worker thread.
+                delay = subscription.wait_time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
                 try:
-                    payload, last_seq = await asyncio.to_thread(_render, last_seq)
+                    payload = await asyncio.to_thread(_render)
                 except TimeoutError:
-                    continue  # Source stalled; hold the connection open and retry.
+                    # Source stalled, or the detector missed the frame's
+                    # deadline; hold the connection open and retry.
+                    continue
                 except Exception as e:
                     logging.error(f"Error generating frame: {e}")
                     break
@@ -305,11 +786,10 @@ async def stream_video(
                        b'Content-Type: image/jpeg\r\n'
                        b'Content-Length: ' + str(len(payload)).encode() + b'\r\n\r\n'
                        + payload + b'\r\n')
-                remaining = min_interval - (time.monotonic() - started)
-                if remaining > 0:
-                    await asyncio.sleep(remaining)
         finally:
-            logging.info("Streaming stopped")
+            # Drop the subscription so the camera stops decoding for this client.
+            subscription.close()
+            logging.info(f"Streaming stopped for camera '{camera_id}'")
 
     return StreamingResponse(
         generate_frames(),
@@ -319,7 +799,8 @@ async def stream_video(
 
 
 @camera_api.get("/stream/stop")
-def stop_stream(camera_handler: RTSPCameraHandler = Depends(camera_injector)):
+@camera_api.get(CAMERA_PREFIX + "/stream/stop")
+def stop_stream(camera_handler: CameraHandler | None = Depends(camera_registry)):
     """Stop the video stream"""
     if camera_handler:
         camera_handler.streaming_active = False
@@ -327,12 +808,18 @@ def stop_stream(camera_handler: RTSPCameraHandler = Depends(camera_injector)):
 
 
 @camera_api.get("/save")
-def save_image(camera_handler: RTSPCameraHandler = Depends(camera_injector)):
+@camera_api.get(CAMERA_PREFIX + "/save")
+def save_image(
+    camera_id: str = DEFAULT_CAMERA_ID,
+    camera_handler: CameraHandler | None = Depends(camera_registry),
+):
     """Capture and save the current frame as a JPEG file."""
     if camera_handler is None:
         return JSONResponse(status_code=400, content={"message": "Camera not started"})
     try:
-        filename = camera_handler.save_image()
+        payload = _encoded_frame(camera_id, camera_handler.capture_frame(), None,
+                                 JPEG_QUALITY)
+        filename = camera_handler.save_image(payload)
         return {"message": "Image saved", "filename": filename}
     except Exception as e:
         logging.error(f"Error saving image: {e}")
@@ -340,7 +827,8 @@ def save_image(camera_handler: RTSPCameraHandler = Depends(camera_injector)):
 
 
 @camera_api.get("/record/start")
-def start_recording(camera_handler: RTSPCameraHandler = Depends(camera_injector)):
+@camera_api.get(CAMERA_PREFIX + "/record/start")
+def start_recording(camera_handler: CameraHandler | None = Depends(camera_registry)):
     """Start recording video to an MP4 file."""
     if camera_handler is None:
         return JSONResponse(status_code=400, content={"message": "Camera not started"})
@@ -353,7 +841,8 @@ def start_recording(camera_handler: RTSPCameraHandler = Depends(camera_injector)
 
 
 @camera_api.get("/record/stop")
-def stop_recording(camera_handler: RTSPCameraHandler = Depends(camera_injector)):
+@camera_api.get(CAMERA_PREFIX + "/record/stop")
+def stop_recording(camera_handler: CameraHandler | None = Depends(camera_registry)):
     """Stop recording and finalise the video file."""
     if camera_handler is None:
         return JSONResponse(status_code=400, content={"message": "Camera not started"})
@@ -366,14 +855,44 @@ def stop_recording(camera_handler: RTSPCameraHandler = Depends(camera_injector))
         logging.error(f"Error stopping recording: {e}")
         return JSONResponse(status_code=500, content={"message": str(e)})
 
+
 @camera_api.get("/start_gatekeeper")
-def start_gatekeeper(camera_handler: RTSPCameraHandler = Depends(camera_injector)):
-    """Start the gatekeeper"""
+@camera_api.get(CAMERA_PREFIX + "/start_gatekeeper")
+def start_gatekeeper(
+    camera_id: str = DEFAULT_CAMERA_ID,
+    camera_handler: CameraHandler | None = Depends(camera_registry),
+):
+    """Start the gatekeeper: watch cheaply for motion, detect only on motion."""
     if camera_handler is None:
         return JSONResponse(status_code=400, content={"message": "Camera not started"})
     try:
-        camera_handler.start_gatekeeper()
-        return {"message": "Gatekeeper started"}
+        params = load_json_file(str(DEFAULT_CONFIG_PATH)).get("gatekeeper_params")
+        gatekeeper = camera_handler.start_gatekeeper(
+            partial(detector_injector.detections, camera_id=camera_id,
+                    priority=Priority.TRIGGER), params)
+        return {"message": "Gatekeeper started", "gatekeeper": gatekeeper.status()}
     except Exception as e:
         logging.error(f"Error starting gatekeeper: {e}")
-        return JSONResponse(status_code=500, content={"message": str(e)})
\ No newline at end of file
+        return JSONResponse(status_code=500, content={"message": str(e)})
+
+
+@camera_api.get("/stop_gatekeeper")
+@camera_api.get(CAMERA_PREFIX + "/stop_gatekeeper")
+def stop_gatekeeper(camera_handler: CameraHandler | None = Depends(camera_registry)):
+    """Stop the gatekeeper and report its duty cycle."""
+    if camera_handler is None:
+        return JSONResponse(status_code=400, content={"message": "Camera not started"})
+    summary = camera_handler.stop_gatekeeper()
+    if summary is None:
+        return {"message": "Gatekeeper not running"}
+    return {"message": "Gatekeeper stopped", "gatekeeper": summary}
+
+
+@camera_api.get("/gatekeeper")
+@camera_api.get(CAMERA_PREFIX + "/gatekeeper")
+def gatekeeper_status(camera_handler: CameraHandler | None = Depends(camera_registry)):
+    """Report the gatekeeper's mode, duty cycle and counters."""
+    if camera_handler is None:
+        return JSONResponse(status_code=400, content={"message": "Camera not started"})
+    gatekeeper = camera_handler.gatekeeper
+    return {"gatekeeper": gatekeeper.status() if gatekeeper is not None else None}
@@ -0,0 +1,220 @@
+"""Server-side multi-object tracking with skip-frame inference.
+
+Overlays want a result for every streamed frame, but the objects in a
+surveillance scene barely move between two frames at 15 fps. With tracking
+enabled, each camera gets a ByteTrack tracker: the model runs on every
+``infer_every``-th frame the server annotates, or sooner when its newest
+result is older than ``max_result_age_ms``, and on the frames in between the
+tracker's Kalman motion model (``STrack.multi_predict``) carries the boxes
+forward. Accelerator load drops by about ``infer_every`` while the boxes keep
+moving smoothly, and every box gains a stable track id. A due inference that
+misses its deadline is covered by the motion model the same way.
+
+Configured by ``tracking_params`` in the detector config; ByteTrack's own
+settings come from ``visualization_params.tracker``, as for the CLI.
+"""
+
+import logging
+import threading
+from collections.abc import Callable
+from types import SimpleNamespace
+
+import numpy as np
+
+from rpi_surveillance.backend.frame import Frame
+from rpi_surveillance.backend.inference.detections import Detections
+from rpi_surveillance.backend.inference.object_detection_postprocess import (
+    match_tracks_to_detections,
+)
+from rpi_surveillance.backend.scheduler import DeadlineExceeded
+
+try:
+    from hailo_apps.python.core.tracker.byte_tracker import BYTETracker, STrack
+except ImportError:  # ByteTrack ships with the Hailo SDK
+    BYTETracker = STrack = None
+
+logger = logging.getLogger(__name__)
+
+# ByteTrack settings used where ``visualization_params.tracker`` leaves them out.
+TRACKER_DEFAULTS = {
+    "track_thresh": 0.5,
+    "track_buffer": 30,
+    "match_thresh": 0.8,
+    "aspect_ratio_thresh": 1.6,
+    "min_box_area": 10,
+    "mot20": False,
+}
+
+
+class CameraTracker:
+    """One camera's tracker and its skip-frame schedule.
+
+    Frames must arrive in capture order; :meth:`process` ignores any frame
+    older than the last one it saw and returns the current tracks instead.
+    """
+
+    def __init__(
+        self,
+        tracker_params: dict,
+        infer_every: int,
+        max_result_age: float,
+        frame_rate: int,
+    ):
+        self.infer_every = infer_every
+        self.max_result_age = max_result_age
+        self.tracker = BYTETracker(
+            SimpleNamespace(**tracker_params), frame_rate=frame_rate
+        )
+        self.frames = 0
+        self.inferences = 0
+        self.missed = 0
+        self._classes: dict[int, int] = {}
+        self._last_seq: int | None = None
+        self._last_inference_at: float | None = None
+        self._since_inference = 0
+        self._result = Detections.empty()
+        self._lock = threading.Lock()
+
+    def process(self, frame: Frame, infer: Callable[[Frame], Detections]) -> Detections:
+        """Tracked detections for ``frame``, running ``infer`` on it only when due."""
+        with self._lock:
+            if self._last_seq is not None and frame.seq <= self._last_seq:
+                return self._result
+            self._last_seq = frame.seq
+            self.frames += 1
+            if self._inference_due(frame):
+                try:
+                    self._result = self._update(frame, infer(frame))
+                except DeadlineExceeded:
+                    # The accelerator is backed up: coast on the motion model
+                    # and try the model again on the next frame.
+                    self.missed += 1
+                    self._result = self._predict()
+            else:
+                self._result = self._predict()
+            return self._result
+
+    def _inference_due(self, frame: Frame) -> bool:
+        return (
+            self._last_inference_at is None
+            or self._since_inference + 1 >= self.infer_every
+            or frame.timestamp - self._last_inference_at > self.max_result_age
+        )
+
+    def _update(self, frame: Frame, detections: Detections) -> Detections:
+        self.inferences += 1
+        self._since_inference = 0
+        self._last_inference_at = frame.timestamp
+        tracks = self.tracker.update(detections.tracker_input())
+        # A track takes the class of the detection it overlaps most, and keeps
+        # it through frames where it has none.
+        track_boxes = np.array([track.tlbr for track in tracks], dtype=np.float64)
+        matches = match_tracks_to_detections(track_boxes, detections.boxes).tolist()
+        for track, match in zip(tracks, matches):
+            if match >= 0:
+                self._classes[track.track_id] = int(detections.classes[match])
+        live = {
+            track.track_id
+            for track in (*self.tracker.tracked_stracks, *self.tracker.lost_stracks)
+        }
+        for track_id in [
+            track_id for track_id in self._classes if track_id not in live
+        ]:
+            del self._classes[track_id]
+        return self._tracks_to_detections(tracks)
+
+    def _predict(self) -> Detections:
+        """Advance every track one frame with the motion model alone."""
+        self._since_inference += 1
+        # Count the frame, so lost tracks expire after ``track_buffer`` frames
+        # of the stream rather than of inferences.
+        self.tracker.frame_id += 1
+        pool = [*self.tracker.tracked_stracks, *self.tracker.lost_stracks]
+        if pool:
+            STrack.multi_predict(pool)
+        return self._tracks_to_detections(
+            [track for track in self.tracker.tracked_stracks if track.is_activated]
+        )
+
+    def _tracks_to_detections(self, tracks: list) -> Detections:
+        tracks = [track for track in tracks if track.track_id in self._classes]
+        if not tracks:
+            return Detections.empty()
+        return Detections(
+            np.rint([track.tlbr for track in tracks]),
+            [self._classes[track.track_id] for track in tracks],
+            [track.score for track in tracks],
+            [track.track_id for track in tracks],
+        )
+
+
+class TrackingService:
+    """Per-camera :class:`CameraTracker` instances, created on first use.
+
+    Args:
+        params: ``tracking_params``: ``enabled``, ``infer_every`` (run the model
+            on every Nth frame), ``max_result_age_ms`` (also run it when the
+            newest result is older than this) and ``frame_rate`` (the stream
+            rate ByteTrack's ``track_buffer`` is counted against).
+        tracker_params: ByteTrack settings, over :data:`TRACKER_DEFAULTS`.
+    """
+
+    def __init__(self, params: dict | None = None, tracker_params: dict | None = None):
+        params = params or {}
+        self.enabled = bool(params.get("enabled", False))
+        self.infer_every = max(1, int(params.get("infer_every", 3)))
+        self.max_result_age = params.get("max_result_age_ms", 250) / 1000
+        self.frame_rate = int(params.get("frame_rate", 15))
+        self.tracker_params = {**TRACKER_DEFAULTS, **(tracker_params or {})}
+        if self.enabled and BYTETracker is None:
+            logger.warning(
+                "Tracking is enabled but ByteTrack (hailo_apps) is not available; "
+                "running detection on every frame without tracking"
+            )
+            self.enabled = False
+        self._cameras: dict[str, CameraTracker] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict) -> "TrackingService":
+        return cls(
+            config.get("tracking_params"),
+            config.get("visualization_params", {}).get("tracker"),
+        )
+
+    def process(
+        self, camera_id: str, frame: Frame, infer: Callable[[Frame], Detections]
+    ) -> Detections:
+        """Tracked detections for one camera's ``frame``; see :class:`CameraTracker`."""
+        with self._lock:
+            camera = self._cameras.get(camera_id)
+            if camera is None:
+                camera = self._cameras[camera_id] = CameraTracker(
+                    self.tracker_params,
+                    self.infer_every,
+                    self.max_result_age,
+                    self.frame_rate,
+                )
+        return camera.process(frame, infer)
+
+    def discard(self, camera_id: str) -> None:
+        """Forget a camera's tracks, e.g. when its handler is replaced."""
+        with self._lock:
+            self._cameras.pop(camera_id, None)
+
+    def status(self) -> dict:
+        """Whether tracking is on and, per camera, how many frames needed the model."""
+        with self._lock:
+            cameras = dict(self._cameras)
+        return {
+            "enabled": self.enabled,
+            "infer_every": self.infer_every,
+            "cameras": {
+                camera_id: {
+                    "frames": camera.frames,
+                    "inferences": camera.inferences,
+                    "missed": camera.missed,
+                }
+                for camera_id, camera in cameras.items()
+            },
+        }
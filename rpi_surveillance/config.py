@@ -67,3 +67,12 @@ def get_storage_secret() -> str:
         )
         return secrets.token_hex(32)
     return secret
+
+
+def get_detector_warmup() -> bool:
+    """Whether to load and warm up the detector at startup (``DETECTOR_WARMUP``).
+
+    Off by default: the model is then loaded on the first detection request.
+    """
+    value = os.environ.get("DETECTOR_WARMUP", "").strip().lower()
+    return value in {"1", "true", "yes", "on"}
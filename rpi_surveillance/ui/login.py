@@ -1,5 +1,6 @@
 """Login and authentication module for rpi_surveillance."""
 
+import re
 from typing import Optional
 
 from fastapi import Request
@@ -24,9 +25,11 @@ UNRESTRICTED_PATH_PREFIXES = ('/_nicegui', '/media')
 API_PATH_PREFIX = '/api'
 LOOPBACK_HOSTS = frozenset({'127.0.0.1', '::1', 'localhost'})
 
-# The live view's <img> pulls MJPEG frames from the browser itself, so this one
-# endpoint has to be reachable over the network — gated on a logged-in session.
+# The live view's <img> pulls MJPEG frames from the browser itself, so the
+# stream endpoints (the default camera's and each registered camera's) have to
+# be reachable over the network — gated on a logged-in session.
 STREAM_PATH = f'{API_PATH_PREFIX}/stream'
+CAMERA_STREAM_PATH = re.compile(rf'{API_PATH_PREFIX}/cameras/[^/]+/stream')
 
 LOGIN_CSS = """
 html, body {
@@ -74,7 +77,8 @@ class AuthMiddleware(BaseHTTPMiddleware):
             client_host = request.client.host if request.client else None
             if client_host in LOOPBACK_HOSTS:
                 return await call_next(request)
-            if path == STREAM_PATH and app.storage.user.get('authenticated', False):
+            is_stream = path == STREAM_PATH or CAMERA_STREAM_PATH.fullmatch(path)
+            if is_stream and app.storage.user.get('authenticated', False):
                 return await call_next(request)
             return JSONResponse(status_code=403, content={'message': 'Forbidden'})
         if (path.startswith(UNRESTRICTED_PATH_PREFIXES)
@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+
+from rpi_surveillance.backend.cache import SequenceCache
+
+
+def test_concurrent_callers_share_one_computation():
+    cache = SequenceCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "jpeg"
+
+    results = []
+    owner = threading.Thread(
+        target=lambda: results.append(cache.get_or_compute("cam", 1, "p", compute))
+    )
+    owner.start()
+    assert started.wait(5)
+    waiter = threading.Thread(
+        target=lambda: results.append(cache.get_or_compute("cam", 1, "p", compute))
+    )
+    waiter.start()
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+
+    assert results == ["jpeg", "jpeg"]
+    assert len(calls) == 1
+    assert (cache.misses, cache.hits) == (1, 1)
+
+
+def test_waiter_times_out_on_a_slow_computation():
+    cache = SequenceCache()
+    started, release = threading.Event(), threading.Event()
+
+    def compute():
+        started.set()
+        release.wait(5)
+        return "jpeg"
+
+    owner = threading.Thread(target=cache.get_or_compute, args=("cam", 1, "p", compute))
+    owner.start()
+    assert started.wait(5)
+    with pytest.raises(TimeoutError):
+        cache.get_or_compute("cam", 1, "p", compute, timeout=0.05)
+    release.set()
+    owner.join(5)
+    assert cache.get("cam", 1, "p") == "jpeg"
+
+
+def test_failed_computation_is_not_cached():
+    cache = SequenceCache()
+
+    def fail():
+        raise RuntimeError("encoder failed")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("cam", 1, "p", fail)
+    assert cache.get("cam", 1, "p") is None
+    assert cache.get_or_compute("cam", 1, "p", lambda: "jpeg") == "jpeg"
+    assert cache.misses == 2
+
+
+def test_lowest_sequence_is_evicted_first():
+    cache = SequenceCache(depth=2)
+    for seq in (5, 3):
+        cache.get_or_compute("cam", seq, "p", lambda seq=seq: seq)
+    # A late request for an older frame must not push out the newest one.
+    cache.get_or_compute("cam", 4, "p", lambda: 4)
+    assert cache.get("cam", 3, "p") is None
+    assert cache.get("cam", 4, "p") == 4
+    assert cache.get("cam", 5, "p") == 5
+    assert cache.newest("cam", "p") == (5, 5)
+
+
+def test_cameras_and_params_are_cached_separately():
+    cache = SequenceCache(depth=1)
+    cache.get_or_compute("a", 1, "small", lambda: "a-small")
+    cache.get_or_compute("a", 1, "large", lambda: "a-large")
+    cache.get_or_compute("b", 1, "small", lambda: "b-small")
+    assert cache.get("a", 1, "small") == "a-small"
+    assert cache.get("a", 1, "large") == "a-large"
+    cache.discard("a")
+    assert cache.get("a", 1, "small") is None
+    assert cache.get("b", 1, "small") == "b-small"
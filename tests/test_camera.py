@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from rpi_surveillance.backend import camera
+from rpi_surveillance.backend.camera import DropPolicy, FrameBroker
+
+IMAGE = np.zeros((2, 2, 3), np.uint8)
+
+
+class FakeClock:
+    """Stands in for the ``time`` module: ``sleep`` advances ``monotonic``."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(camera, "time", clock)
+    return clock
+
+
+def publish(broker: FrameBroker, count: int) -> None:
+    for _ in range(count):
+        broker.publish(IMAGE)
+
+
+def test_latest_skips_to_the_newest_frame(clock):
+    broker = FrameBroker(capacity=4)
+    subscription = broker.subscribe(policy=DropPolicy.LATEST)
+    publish(broker, 3)
+    assert subscription.next().seq == 3
+    publish(broker, 3)
+    assert subscription.next().seq == 6
+    assert subscription.dropped == 2
+
+
+def test_queue_delivers_every_buffered_frame_in_order(clock):
+    broker = FrameBroker(capacity=4)
+    subscription = broker.subscribe(policy=DropPolicy.QUEUE)
+    publish(broker, 3)
+    assert [subscription.next().seq for _ in range(3)] == [1, 2, 3]
+    # Frames 4-6 are overwritten by 7-10 before the consumer gets to them.
+    publish(broker, 7)
+    assert [subscription.next().seq for _ in range(4)] == [7, 8, 9, 10]
+    assert subscription.dropped == 3
+
+
+def test_repeat_hands_out_the_newest_frame_on_every_tick(clock):
+    broker = FrameBroker(capacity=4)
+    subscription = broker.subscribe(max_fps=10, policy=DropPolicy.REPEAT)
+    publish(broker, 1)
+    assert [subscription.next().seq for _ in range(3)] == [1, 1, 1]
+    publish(broker, 2)
+    assert subscription.next().seq == 3
+    assert subscription.dropped == 1
+
+
+def test_max_fps_paces_reads_without_banking_time(clock):
+    broker = FrameBroker(capacity=4)
+    subscription = broker.subscribe(max_fps=10)
+    start = clock.now
+    for _ in range(3):
+        publish(broker, 1)
+        subscription.next()
+    # The first frame is due at once, the next two 0.1 s apart.
+    assert clock.now == pytest.approx(start + 0.2)
+    assert subscription.wait_time() == pytest.approx(0.1)
+
+    # After falling behind, the next frame is due immediately, but only one.
+    clock.now += 1.0
+    publish(broker, 1)
+    subscription.next()
+    assert subscription.wait_time() == 0.0
+    publish(broker, 1)
+    subscription.next()
+    assert subscription.wait_time() == pytest.approx(0.1)
+
+
+def test_open_subscription_is_demand_once_due(clock):
+    broker = FrameBroker(capacity=4)
+    assert not broker.has_demand()
+    with broker.subscribe(max_fps=10) as subscription:
+        assert broker.has_demand()
+        publish(broker, 1)
+        subscription.next()
+        assert not broker.has_demand()
+        assert broker.has_demand(lookahead=0.1)
+    assert not broker.has_demand()
+
+
+def test_wait_times_out_without_a_new_frame():
+    broker = FrameBroker(capacity=4)
+    publish(broker, 1)
+    with pytest.raises(TimeoutError):
+        broker.wait(last_seq=1, timeout=0.05)
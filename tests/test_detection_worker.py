@@ -0,0 +1,72 @@
+import json
+import os
+import signal
+import time
+
+import numpy as np
+import pytest
+
+from rpi_surveillance.backend import detction_worker
+from rpi_surveillance.backend.detction_worker import DetectionWorkerPool
+from rpi_surveillance.backend.frame import Frame
+from rpi_surveillance.backend.inference.detector import (
+    DEFAULT_CONFIG_PATH,
+    load_json_file,
+)
+
+IMAGE = np.zeros((480, 640, 3), np.uint8)
+
+
+@pytest.fixture
+def pool(tmp_path):
+    config = load_json_file(str(DEFAULT_CONFIG_PATH))
+    config["simulated_params"].update(latency_ms=300.0, per_frame_ms=0.0, jitter_ms=0.0)
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps(config))
+    pool = DetectionWorkerPool(
+        workers=2, device="simulated", config_path=config_path, slot_shape=IMAGE.shape
+    )
+    # Wait for both workers to load their model.
+    for future in [pool.submit(Frame(seq, IMAGE)) for seq in range(2)]:
+        future.result(timeout=60)
+    yield pool
+    pool.close()
+
+
+def test_killed_worker_fails_its_task_and_is_replaced(pool):
+    busy = pool.submit(Frame(10, IMAGE))
+    time.sleep(0.1)
+    ((_, _, index),) = pool._pending.values()
+    os.kill(pool._workers[index].pid, signal.SIGKILL)
+
+    with pytest.raises(RuntimeError, match="exited"):
+        busy.result(timeout=10)
+    assert pool.capacity == pool._free_slots.qsize()
+
+    futures = [pool.submit(Frame(seq, IMAGE)) for seq in range(11, 11 + pool.size * 2)]
+    for future in futures:
+        future.result(timeout=60)
+    assert pool.restarts == 1
+    assert all(worker.is_alive() for worker in pool._workers)
+
+
+def test_idle_worker_death_is_noticed(pool):
+    os.kill(pool._workers[0].pid, signal.SIGKILL)
+    deadline = time.monotonic() + 10
+    while pool.restarts == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert pool.restarts == 1
+    futures = [pool.submit(Frame(seq, IMAGE)) for seq in range(20, 26)]
+    for future in futures:
+        future.result(timeout=60)
+    assert not pool._pending
+
+
+def test_slot_exhaustion_is_a_timeout(pool, monkeypatch):
+    monkeypatch.setattr(detction_worker, "SLOT_TIMEOUT", 0.05)
+    futures = [pool.submit(Frame(seq, IMAGE)) for seq in range(30, 30 + pool.capacity)]
+    with pytest.raises(TimeoutError, match="slots"):
+        pool.submit(Frame(99, IMAGE))
+    for future in futures:
+        future.result(timeout=60)
+    assert pool.capacity == pool._free_slots.qsize()
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from rpi_surveillance.backend.frame import Frame
+from rpi_surveillance.backend.inference.detector import (
+    frame_tiles,
+    tile_regions,
+    tiling_for,
+)
+
+
+@pytest.mark.parametrize(
+    "width, height, columns, rows, overlap",
+    [(1920, 1080, 3, 2, 0.2), (1280, 720, 2, 2, 0.0), (1920, 1080, 4, 3, 0.25)],
+)
+def test_tiles_cover_the_frame_with_equal_overlapping_tiles(
+    width, height, columns, rows, overlap
+):
+    tiles = tile_regions(width, height, columns, rows, overlap)
+    assert len(tiles) == columns * rows
+    assert len({(xmax - xmin, ymax - ymin) for xmin, ymin, xmax, ymax in tiles}) == 1
+
+    covered = np.zeros((height, width), bool)
+    for xmin, ymin, xmax, ymax in tiles:
+        assert 0 <= xmin < xmax <= width and 0 <= ymin < ymax <= height
+        covered[ymin:ymax, xmin:xmax] = True
+    assert covered.all()
+
+    # Neighbours share at least ``overlap`` of a tile.
+    tile_width = tiles[0][2] - tiles[0][0]
+    for left, right in zip(tiles, tiles[1:columns]):
+        assert left[2] - right[0] >= int(overlap * tile_width)
+
+
+def test_single_tile_is_the_whole_frame():
+    assert tile_regions(640, 480, 1, 1, 0.2) == ((0, 0, 640, 480),)
+
+
+def test_tiling_is_off_by_default_and_per_camera():
+    config = {"tiling_params": {"cameras": {"gate": {"enabled": True, "grid": [2, 1]}}}}
+    frame = Frame(1, np.zeros((720, 1280, 3), np.uint8))
+    assert frame_tiles(frame, tiling_for(config)) is None
+    tiles = frame_tiles(frame, tiling_for(config, "gate"))
+    assert len(tiles) == 2
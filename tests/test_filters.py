@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from rpi_surveillance.backend.frame import Frame
+from rpi_surveillance.backend.inference.detections import Detections
+from rpi_surveillance.backend.inference.filters import (
+    DetectionFilter,
+    filters_for,
+    score_thresholds,
+)
+from rpi_surveillance.backend.inference.preprocess import PAD_VALUE
+
+LABELS = ["person", "bicycle", "car", "dog"]
+WIDTH, HEIGHT = 200, 100
+# The right half of the frame.
+RIGHT_HALF = [[0.5, 0.0], [1.0, 0.0], [1.0, 1.0], [0.5, 1.0]]
+
+
+def detection_filter(**params) -> DetectionFilter:
+    return DetectionFilter(filters_for({"filter_params": params}), LABELS, 0.5)
+
+
+def test_class_allow_list_and_thresholds():
+    params = filters_for(
+        {"filter_params": {"classes": ["person", 2], "class_thresholds": {"car": 0.8}}}
+    )
+    thresholds = score_thresholds(params, LABELS, 0.5)
+    assert thresholds.tolist() == pytest.approx([0.5, np.inf, 0.8, np.inf])
+    with pytest.raises(ValueError, match="horse"):
+        score_thresholds({**params, "classes": ["horse"]}, LABELS, 0.5)
+
+
+def test_apply_drops_classes_below_their_threshold():
+    detections = Detections(
+        [[0, 0, 10, 10]] * 5, [0, 1, 2, 2, 7], [0.6, 0.9, 0.7, 0.9, 0.6]
+    )
+    kept = detection_filter(
+        classes=["person", "car"], class_thresholds={"car": 0.8}
+    ).apply(detections, WIDTH, HEIGHT)
+    # Class 7 has no label, so it keeps the default threshold.
+    assert kept.classes.tolist() == [0, 2, 7]
+    assert kept.scores.tolist() == pytest.approx([0.6, 0.9, 0.6])
+
+
+@pytest.mark.parametrize(
+    "anchor, kept_xmin", [("bottom", [10, 110]), ("center", [10, 60])]
+)
+def test_apply_drops_boxes_anchored_in_a_zone(anchor, kept_xmin):
+    top = [[0.0, 0.0], [1.0, 0.0], [1.0, 0.2], [0.0, 0.2]]
+    bottom = [[0.0, 0.8], [1.0, 0.8], [1.0, 1.0], [0.0, 1.0]]
+    detections = Detections(
+        [
+            [10, 30, 50, 70],  # between the zones
+            [60, 10, 100, 95],  # stands in the bottom zone, centre between
+            [110, 0, 140, 30],  # centre in the top zone, bottom between
+        ],
+        [0, 0, 0],
+        [0.9] * 3,
+    )
+    kept = detection_filter(exclusion_zones=[top, bottom], zone_anchor=anchor).apply(
+        detections, WIDTH, HEIGHT
+    )
+    assert kept.boxes[:, 0].tolist() == kept_xmin
+
+
+def test_blank_paints_the_zones_out():
+    image = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+    frame = Frame(1, image)
+    assert detection_filter(exclusion_zones=[RIGHT_HALF]).blank(frame) is frame
+    blanked = detection_filter(exclusion_zones=[RIGHT_HALF], blank_zones=True).blank(
+        frame
+    )
+    assert (blanked.image[:, WIDTH // 2 + 1 :] == PAD_VALUE).all()
+    assert (blanked.image[:, : WIDTH // 2 - 1] == 0).all()
+    assert (image == 0).all()
+
+
+def test_camera_entry_overrides_shared_settings():
+    config = {
+        "filter_params": {
+            "classes": ["person"],
+            "cameras": {"yard": {"classes": None, "exclusion_zones": [RIGHT_HALF]}},
+        }
+    }
+    assert filters_for(config)["classes"] == ["person"]
+    yard = filters_for(config, "yard")
+    assert yard["classes"] is None and yard["exclusion_zones"] == [RIGHT_HALF]
+    with pytest.raises(ValueError, match="zone_anchor"):
+        DetectionFilter({**yard, "zone_anchor": "top"}, LABELS, 0.5)
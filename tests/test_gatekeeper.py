@@ -0,0 +1,121 @@
+import threading
+
+import numpy as np
+import pytest
+
+from rpi_surveillance.backend import gatekeeper as gatekeeper_module
+from rpi_surveillance.backend.frame import Frame
+from rpi_surveillance.backend.gatekeeper import ACTIVE, SENTINEL, Gatekeeper
+from rpi_surveillance.backend.inference.detections import Detections
+
+# Powers of two, so the fake clock adds up exactly.
+SENTINEL_FPS = 2.0
+ACTIVE_FPS = 8.0
+PARAMS = {
+    "sentinel_fps": SENTINEL_FPS,
+    "active_fps": ACTIVE_FPS,
+    "quiet_period_s": 1.0,
+    # The intruder stays where it stopped; the background absorbs it at once.
+    "background_alpha": 1.0,
+}
+
+
+class FakeClock:
+    """Stands in for the ``time`` module; only the fake camera advances it."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class FakeSubscription:
+    def __init__(self, camera: "FakeCamera", max_fps: float):
+        self.camera = camera
+        self.max_fps = max_fps
+
+    def __enter__(self) -> "FakeSubscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def set_max_fps(self, max_fps: float) -> None:
+        self.max_fps = max_fps
+
+    def next(self, timeout: float | None = None) -> Frame:
+        """The next scripted frame, one frame interval at the current rate later."""
+        self.camera.rates.append(self.max_fps)
+        frame = next(self.camera.frames, None)
+        if frame is None:
+            self.camera.done.set()
+            raise EOFError("no more frames")
+        self.camera.clock.now += 1 / self.max_fps
+        return frame
+
+
+class FakeCamera:
+    """Hands out ``frames``, recording the read rate asked for before each one."""
+
+    def __init__(self, clock: FakeClock, frames: list[Frame]):
+        self.clock = clock
+        self.frames = iter(frames)
+        self.rates: list[float] = []
+        self.done = threading.Event()
+
+    def subscribe(self, max_fps: float) -> FakeSubscription:
+        return FakeSubscription(self, max_fps)
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(gatekeeper_module, "time", clock)
+    return clock
+
+
+def scene(seq: int, intruder: bool = False) -> Frame:
+    image = np.full((240, 320, 3), 40, np.uint8)
+    if intruder:
+        image[60:180, 100:200] = 220
+    return Frame(seq, image)
+
+
+def detection(x: int = 0) -> Detections:
+    return Detections(
+        np.array([[100 + x, 60, 200 + x, 180]]), np.array([2]), np.array([0.9])
+    )
+
+
+def run(clock: FakeClock, detect, intruder_frames: int) -> tuple[FakeCamera, dict]:
+    """An empty frame, then a parked intruder; the status once frames run out."""
+    frames = [scene(1)] + [scene(seq, True) for seq in range(2, intruder_frames + 2)]
+    camera = FakeCamera(clock, frames)
+    gatekeeper = Gatekeeper(camera, detect, PARAMS).start()
+    try:
+        assert camera.done.wait(timeout=5)
+        return camera, gatekeeper.status()
+    finally:
+        gatekeeper.stop()
+
+
+def test_static_detection_returns_to_sentinel(clock):
+    camera, status = run(clock, lambda frame: detection(), intruder_frames=11)
+    # Escalated on frame 2; a quiet second (8 frames) later back to sentinel.
+    assert camera.rates == [SENTINEL_FPS] * 2 + [ACTIVE_FPS] * 8 + [SENTINEL_FPS] * 3
+    assert status["state"] == SENTINEL
+    assert status["escalations"] == 1
+    assert status["inferences"] == 9
+    assert status["detections"] == 1
+    assert (status["sentinel_seconds"], status["active_seconds"]) == (2.0, 1.0)
+
+
+def test_moving_detection_keeps_it_active(clock):
+    steps = iter(range(1000))
+    camera, status = run(
+        clock, lambda frame: detection(x=next(steps) * 40 % 120), intruder_frames=20
+    )
+    assert camera.rates == [SENTINEL_FPS] * 2 + [ACTIVE_FPS] * 20
+    assert status["state"] == ACTIVE
+    assert status["escalations"] == 1
@@ -0,0 +1,45 @@
+from pathlib import Path
+
+import pytest
+
+onnx = pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+
+from rpi_surveillance.backend.inference.backends.onnx import (  # noqa: E402
+    OnnxRuntimeModel,
+)
+
+
+def write_model(path: Path, height, width) -> Path:
+    """An identity model with a ``(1, 3, height, width)`` float input."""
+    shape = [1, 3, height, width]
+    graph = onnx.helper.make_graph(
+        [onnx.helper.make_node("Identity", ["images"], ["output0"])],
+        "identity",
+        [onnx.helper.make_tensor_value_info("images", onnx.TensorProto.FLOAT, shape)],
+        [onnx.helper.make_tensor_value_info("output0", onnx.TensorProto.FLOAT, shape)],
+    )
+    model = onnx.helper.make_model(
+        graph, opset_imports=[onnx.helper.make_opsetid("", 13)]
+    )
+    model.ir_version = 8
+    onnx.save(model, path / "model.onnx")
+    return path / "model.onnx"
+
+
+def test_fixed_input_size_is_read_from_the_model(tmp_path):
+    model = OnnxRuntimeModel(write_model(tmp_path, 480, 640))
+    assert (model.input_height, model.input_width) == (480, 640)
+
+
+def test_dynamic_input_size_needs_input_size(tmp_path):
+    path = write_model(tmp_path, "height", "width")
+    with pytest.raises(ValueError, match="dynamic input size"):
+        OnnxRuntimeModel(path)
+    model = OnnxRuntimeModel(path, input_size=[320, 416])
+    assert (model.input_height, model.input_width) == (320, 416)
+
+
+def test_input_size_must_match_a_fixed_model(tmp_path):
+    with pytest.raises(ValueError, match="does not match"):
+        OnnxRuntimeModel(write_model(tmp_path, 480, 640), input_size=[640, 640])
@@ -0,0 +1,234 @@
+import cv2
+import numpy as np
+import pytest
+
+from rpi_surveillance.backend.inference.detections import Detections
+from rpi_surveillance.backend.inference.object_detection_postprocess import (
+    CHIP_ALPHA,
+    FONT,
+    AnnotationRenderer,
+    _draw_corner_brackets,
+    compute_iou,
+    extract_detections,
+    iou_matrix,
+    match_tracks_to_detections,
+    non_max_suppression,
+)
+
+NUM_CLASSES = 80
+
+
+def config(score_thres: float = 0.35, max_boxes: int = 50) -> dict:
+    return {
+        "visualization_params": {
+            "score_thres": score_thres,
+            "max_boxes_to_draw": max_boxes,
+        }
+    }
+
+
+def raw_result(count: int, seed: int = 0) -> list[np.ndarray]:
+    """Hailo NMS output: per class, ``(N, 5)`` ``[ymin, xmin, ymax, xmax, score]``."""
+    rng = np.random.default_rng(seed)
+    corners = rng.uniform(0.0, 1.0, (count, 2, 2))
+    rows = np.column_stack(
+        [corners.min(axis=1), corners.max(axis=1), rng.uniform(0.1, 0.6, count)]
+    ).astype(np.float32)
+    class_ids = rng.integers(0, NUM_CLASSES, count)
+    return [rows[class_ids == class_id] for class_id in range(NUM_CLASSES)]
+
+
+def loop_extract(image: np.ndarray, detections: list, config_data: dict):
+    """The per-box Python loop ``extract_detections`` replaced."""
+    score_threshold = config_data["visualization_params"]["score_thres"]
+    max_boxes = config_data["visualization_params"]["max_boxes_to_draw"]
+    img_height, img_width = image.shape[:2]
+    size = max(img_height, img_width)
+    padding_length = int(abs(img_height - img_width) / 2)
+
+    def denormalize_and_rm_pad(box):
+        box = [int(x * size) for x in box]
+        for i in range(4):
+            if i % 2 == 0:
+                if img_height != size:
+                    box[i] -= padding_length
+            else:
+                if img_width != size:
+                    box[i] -= padding_length
+        return [box[1], box[0], box[3], box[2]]
+
+    found = []
+    for class_id, detection in enumerate(detections):
+        for det in detection:
+            if det[4] >= score_threshold:
+                found.append((det[4], class_id, denormalize_and_rm_pad(det[:4])))
+    found.sort(reverse=True, key=lambda x: x[0])
+    return found[:max_boxes]
+
+
+def pixel_boxes(count: int, seed: int = 0) -> np.ndarray:
+    """``(count, 4)`` ``[xmin, ymin, xmax, ymax]`` boxes in a 640x480 frame."""
+    rng = np.random.default_rng(seed)
+    corners = rng.integers(0, 640, (count, 2, 2)) * (1, 0.75)
+    return np.column_stack([corners.min(axis=1), corners.max(axis=1)]).round()
+
+
+@pytest.mark.parametrize("count", [0, 1, 10, 200])
+@pytest.mark.parametrize("shape", [(1080, 1920), (1920, 1080), (640, 640)])
+def test_extract_detections_matches_the_loop(count, shape):
+    image = np.zeros((*shape, 3), np.uint8)
+    result = raw_result(count, seed=count)
+    expected = loop_extract(image, result, config())
+    detections = extract_detections(image, result, config())
+
+    assert len(detections) == len(expected)
+    assert detections.boxes.tolist() == [box for _, _, box in expected]
+    assert detections.classes.tolist() == [class_id for _, class_id, _ in expected]
+    assert np.allclose(detections.scores, [score for score, _, _ in expected])
+
+
+def test_extract_detections_without_boxes_to_draw():
+    image = np.zeros((720, 1280, 3), np.uint8)
+    assert len(extract_detections(image, raw_result(10), config(max_boxes=0))) == 0
+
+
+def test_iou_matrix_matches_compute_iou():
+    boxes_a, boxes_b = pixel_boxes(12, seed=1), pixel_boxes(9, seed=2)
+    boxes_b[0] = boxes_a[0]
+    expected = [[compute_iou(a, b) for b in boxes_b] for a in boxes_a]
+    ious = iou_matrix(boxes_a, boxes_b)
+    assert ious.shape == (12, 9)
+    assert np.allclose(ious, expected)
+    assert ious[0, 0] == pytest.approx(1.0)
+
+
+def test_match_tracks_to_detections_matches_the_loop():
+    tracks, detections = pixel_boxes(15, seed=3), pixel_boxes(20, seed=4)
+    expected = []
+    for track in tracks:
+        ious = [compute_iou(track, detection) for detection in detections]
+        best = int(np.argmax(ious))
+        expected.append(best if ious[best] > 0 else -1)
+    assert match_tracks_to_detections(tracks, detections).tolist() == expected
+
+
+def test_match_tracks_without_overlap_or_detections():
+    track, elsewhere = np.array([[0, 0, 10, 10]]), np.array([[20, 20, 30, 30]])
+    assert match_tracks_to_detections(track, elsewhere).tolist() == [-1]
+    assert match_tracks_to_detections(track, np.empty((0, 4))).tolist() == [-1]
+    assert match_tracks_to_detections(np.empty((0, 4)), track).tolist() == []
+
+
+def greedy_nms(detections: Detections, threshold: float, metric: str) -> list[int]:
+    """Indices kept by pairwise greedy suppression, best score first."""
+
+    def overlap(a, b):
+        width = min(a[2], b[2]) - max(a[0], b[0])
+        height = min(a[3], b[3]) - max(a[1], b[1])
+        inter = max(0, width) * max(0, height)
+        area_a = max(1e-5, (a[2] - a[0]) * (a[3] - a[1]))
+        area_b = max(1e-5, (b[2] - b[0]) * (b[3] - b[1]))
+        if metric == "ios":
+            return inter / min(area_a, area_b)
+        return inter / (area_a + area_b - inter + 1e-5)
+
+    boxes, classes = detections.boxes.tolist(), detections.classes.tolist()
+    kept = []
+    for index, box in enumerate(boxes):
+        if not any(
+            classes[other] == classes[index] and overlap(boxes[other], box) > threshold
+            for other in kept
+        ):
+            kept.append(index)
+    return kept
+
+
+@pytest.mark.parametrize("metric", ["iou", "ios"])
+@pytest.mark.parametrize("seed", range(5))
+def test_non_max_suppression_matches_greedy_pairs(metric, seed):
+    rng = np.random.default_rng(seed)
+    # Boxes crowded into a small area, so most of them overlap.
+    count = 60
+    origins = rng.integers(0, 200, (count, 2))
+    sizes = rng.integers(10, 120, (count, 2))
+    detections = Detections(
+        np.column_stack([origins, origins + sizes]),
+        rng.integers(0, 3, count),
+        np.sort(rng.uniform(0.3, 1.0, count))[::-1],
+    )
+    kept = non_max_suppression(detections, 0.5, metric)
+    expected = greedy_nms(detections, 0.5, metric)
+    assert 0 < len(expected) < count
+    assert kept.boxes.tolist() == detections.boxes[expected].tolist()
+    assert kept.classes.tolist() == detections.classes[expected].tolist()
+
+
+def test_non_max_suppression_keeps_other_classes():
+    box = [100, 100, 200, 200]
+    detections = Detections([box, box], [0, 1], [0.9, 0.8])
+    assert len(non_max_suppression(detections, 0.5, "iou")) == 2
+    with pytest.raises(ValueError, match="metric"):
+        non_max_suppression(detections, 0.5, "giou")
+
+
+def one_piece_chip(image, title, x, bottom, color, style) -> None:
+    """The class/score chip drawn whole, as the renderer did before caching it."""
+    (text_w, text_h), baseline = cv2.getTextSize(title, FONT, style.font_scale, 1)
+    chip_w, chip_h = text_w + 2 * style.pad, text_h + baseline + 2 * style.pad
+    y = bottom - chip_h
+    roi = image[y:bottom, x : x + chip_w]
+    cv2.addWeighted(np.full_like(roi, color), CHIP_ALPHA, roi, 1 - CHIP_ALPHA, 0, roi)
+    origin = (x + style.pad, y + style.pad + text_h)
+    cv2.putText(
+        image, title, origin, FONT, style.font_scale, (255, 255, 255), 1, cv2.LINE_AA
+    )
+    bar = roi[chip_h - max(3, style.thickness + 1) :]
+    cv2.addWeighted(np.zeros_like(bar), 0.75, bar, 0.25, 0, bar)
+    percent = int(title.split()[-1].rstrip("%"))
+    bar[:, : int(chip_w * percent / 100)] = 255
+
+
+@pytest.mark.parametrize("score", [5.2, 42.0, 87.4, 100.0])
+def test_score_chip_matches_the_title_drawn_whole(score):
+    renderer = AnnotationRenderer(640, 480)
+    style = renderer.style
+    color, box = (40, 60, 200), (100, 200, 300, 400)
+    image = np.full((480, 640, 3), 90, np.uint8)
+    expected = image.copy()
+    renderer.draw_detection(image, box, "person", score, color)
+
+    cv2.rectangle(
+        expected, box[:2], box[2:], (0, 0, 0), style.thickness + 1, cv2.LINE_AA
+    )
+    cv2.rectangle(expected, box[:2], box[2:], color, style.thickness - 1, cv2.LINE_AA)
+    _draw_corner_brackets(expected, box, color, style.thickness + 1)
+    one_piece_chip(expected, f"person  {round(score)}%", 100, 200, color, style)
+
+    # Only the edges of the anti-aliased score text may differ, by a few levels.
+    diff = np.abs(image.astype(int) - expected)
+    assert (diff > 2).sum() < 20
+    assert diff.mean() < 0.01
+
+
+def test_scores_share_the_class_chips(monkeypatch):
+    rendered = []
+    render_chip = AnnotationRenderer._render_chip
+
+    def counting(self, text, *args):
+        rendered.append(text)
+        return render_chip(self, text, *args)
+
+    monkeypatch.setattr(AnnotationRenderer, "_render_chip", counting)
+    renderer = AnnotationRenderer(640, 480, chip_cache_size=2)
+    image = np.zeros((480, 640, 3), np.uint8)
+    box = [100, 200, 300, 400]
+    for score in range(101):
+        renderer.draw_detection(image, box, "person", score, (40, 60, 200))
+    # One chip per digit count: "0%", "10%" and "100%".
+    assert rendered == ["person  "] * 3
+
+    # The cache holds the two most recently used chips.
+    renderer.draw_detection(image, box, "person", 50, (40, 60, 200))
+    renderer.draw_detection(image, box, "car", 50, (40, 60, 200))
+    renderer.draw_detection(image, box, "person", 50, (40, 60, 200))
+    assert rendered == ["person  "] * 3 + ["car  "]
@@ -0,0 +1,48 @@
+import cv2
+import numpy as np
+import pytest
+
+from rpi_surveillance.backend.inference.common.fallback import default_preprocess
+from rpi_surveillance.backend.inference.preprocess import PAD_VALUE, Letterboxer
+
+
+def frame(width: int, height: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, 256, (height, width, 3), np.uint8)
+
+
+@pytest.mark.parametrize("size", [(1920, 1080), (1280, 720), (480, 640), (640, 640)])
+def test_matches_default_preprocess(size):
+    image = frame(*size)
+    letterbox = Letterboxer(640, 640, "cubic")
+    expected = default_preprocess(cv2.cvtColor(image, cv2.COLOR_BGR2RGB), 640, 640)
+    assert np.array_equal(letterbox(image), expected)
+
+
+def test_geometry_matches_default_preprocess():
+    geometry = Letterboxer(640, 640).geometry(1920, 1080)
+    assert geometry == (640, 360, 0, 140)
+
+
+def test_reused_buffer_keeps_its_padding():
+    letterbox = Letterboxer(64, 64, "cubic")
+    first = letterbox(frame(128, 64, seed=1))
+    letterbox.release(first)
+    second = letterbox(frame(128, 64, seed=2))
+    assert second is first
+    geometry = letterbox.geometry(128, 64)
+    assert (second[: geometry.y_offset] == PAD_VALUE).all()
+    assert (second[geometry.y_offset + geometry.height :] == PAD_VALUE).all()
+    expected = default_preprocess(
+        cv2.cvtColor(frame(128, 64, seed=2), cv2.COLOR_BGR2RGB), 64, 64
+    )
+    assert np.array_equal(second, expected)
+
+
+def test_leased_buffers_are_never_shared():
+    letterbox = Letterboxer(64, 64)
+    first, second = letterbox(frame(64, 64)), letterbox(frame(64, 64))
+    assert first is not second
+    letterbox.release(first)
+    letterbox.release(first)
+    assert letterbox(frame(64, 64)) is first
+    assert letterbox(frame(64, 64)) is not first
@@ -0,0 +1,139 @@
+import threading
+
+import pytest
+
+from rpi_surveillance.backend import scheduler as scheduler_module
+from rpi_surveillance.backend.scheduler import DeadlineExceeded, FairScheduler, Priority
+
+SERVICE_TIME = 0.5
+
+
+class FakeClock:
+    """Stands in for the ``time`` module; processing an item advances it."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class Detector:
+    """Processes items in ``SERVICE_TIME`` fake seconds, recording their order.
+
+    The item ``"hold"`` keeps the worker busy until :meth:`release`, so the
+    tests can queue everything else behind it first.
+    """
+
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+        self.order: list[str] = []
+        self.holding = threading.Event()
+        self._released = threading.Event()
+
+    def __call__(self, item: str) -> str:
+        if item == "hold":
+            self.holding.set()
+            assert self._released.wait(timeout=5)
+        self.order.append(item)
+        self.clock.now += SERVICE_TIME
+        return item
+
+    def release(self) -> None:
+        self._released.set()
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(scheduler_module, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def detector(clock) -> Detector:
+    return Detector(clock)
+
+
+@pytest.fixture
+def scheduler(detector):
+    scheduler = FairScheduler(detector)
+    yield scheduler
+    scheduler.close()
+
+
+def hold(scheduler: FairScheduler, detector: Detector):
+    future = scheduler.submit("hold", "hold", Priority.LIVE)
+    assert detector.holding.wait(timeout=5)
+    return future
+
+
+def test_higher_priority_is_served_first(scheduler, detector):
+    held = hold(scheduler, detector)
+    futures = [
+        scheduler.submit("gate", "backfill", Priority.BACKFILL),
+        scheduler.submit("gate", "api", Priority.API),
+        scheduler.submit("gate", "trigger", Priority.TRIGGER),
+        scheduler.submit("gate", "live", Priority.LIVE),
+    ]
+    detector.release()
+    assert held.result(timeout=5) == "hold"
+    assert [future.result(timeout=5) for future in futures] == [
+        "backfill",
+        "api",
+        "trigger",
+        "live",
+    ]
+    assert detector.order == ["hold", "live", "trigger", "api", "backfill"]
+    assert scheduler.stats()["served"] == {
+        "live": 2,
+        "trigger": 1,
+        "api": 1,
+        "backfill": 1,
+    }
+
+
+def test_cameras_take_turns_within_a_class(scheduler, detector):
+    held = hold(scheduler, detector)
+    futures = [
+        scheduler.submit(camera, f"{camera}{index}")
+        for camera, count in (("a", 3), ("b", 2), ("c", 1))
+        for index in range(1, count + 1)
+    ]
+    assert scheduler.pending("a") == 3 and scheduler.pending() == 6
+    detector.release()
+    for future in [held, *futures]:
+        future.result(timeout=5)
+    assert detector.order == ["hold", "a1", "b1", "c1", "a2", "b2", "a3"]
+
+
+def test_past_deadline_fails_without_queueing(scheduler, clock, detector):
+    future = scheduler.submit("gate", "late", deadline=clock.now - 1)
+    with pytest.raises(DeadlineExceeded):
+        future.result(timeout=5)
+    assert scheduler.pending() == 0
+    assert scheduler.stats()["expired"]["api"] == 1
+    assert detector.order == []
+
+
+def test_queued_entry_expires_behind_other_work(scheduler, clock, detector):
+    held = hold(scheduler, detector)
+    # Due before the held item can finish, so it is failed rather than served late.
+    late = scheduler.submit("gate", "late", deadline=clock.now + SERVICE_TIME / 2)
+    other = scheduler.submit("yard", "other")
+    detector.release()
+    with pytest.raises(DeadlineExceeded):
+        late.result(timeout=5)
+    assert (held.result(timeout=5), other.result(timeout=5)) == ("hold", "other")
+    assert detector.order == ["hold", "other"]
+    stats = scheduler.stats()
+    assert stats["expired"]["api"] == 1 and stats["served"]["api"] == 1
+    assert stats["service_ms"] == SERVICE_TIME * 1000
+
+
+def test_tight_deadline_is_served_while_idle(scheduler, clock, detector):
+    scheduler.submit("gate", "warmup").result(timeout=5)
+    # Closer than the service time, but nothing else is waiting for the detector.
+    future = scheduler.submit("gate", "late", deadline=clock.now + SERVICE_TIME / 2)
+    assert future.result(timeout=5) == "late"
+    assert scheduler.stats()["expired"]["api"] == 0